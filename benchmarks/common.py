@@ -0,0 +1,155 @@
+import argparse
+import json
+import platform
+import sys
+import timeit
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+
+def measure(func: Callable[[], Any], repeat: int = 5) -> float:
+    """Returns the best time (in seconds) of a single call of `func`"""
+
+    timer = timeit.Timer(func)
+    n_calls, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=n_calls)) / n_calls
+
+
+def gen_records(n: int) -> list[dict]:
+    return [
+        {"id": i, "name": f"record-{i}", "score": i / 7, "tags": ["a", "b", "c"][: i % 4]}
+        for i in range(n)
+    ]
+
+
+def print_table(headers: Sequence[str], rows: Sequence[Sequence[Any]]):
+    columns = [headers, *[[str(value) for value in row] for row in rows]]
+    widths = [max(len(row[i]) for row in columns) for i in range(len(headers))]
+
+    for i, row in enumerate(columns):
+        print(" | ".join(value.rjust(width) for value, width in zip(row, widths)))
+        if i == 0:
+            print("-+-".join("-" * width for width in widths))
+
+
+def load_results(path: Path) -> Optional[dict]:
+    """Returns the results stored in the given file or `None` if no results have been stored"""
+
+    if not path.exists():
+        print(
+            f"\nNo stored results found in: {path} - skipping the comparison (use `--save` first)"
+        )
+        return None
+    return json.loads(path.read_text())
+
+
+@dataclass(frozen=True)
+class Metric:
+    """A measured value of the benchmark results compared with the stored results"""
+
+    key: str
+    header: str
+    fmt: Callable[[Any], str]
+
+
+def add_results_args(
+    parser: argparse.ArgumentParser,
+    default_results_path: Path,
+    default_threshold: float,
+    threshold_help: str,
+):
+    parser.add_argument(
+        "--save", nargs="?", type=Path, const=default_results_path, help="stores the results"
+    )
+    parser.add_argument(
+        "--compare",
+        nargs="?",
+        type=Path,
+        const=default_results_path,
+        help="compares the results with the stored results",
+    )
+    parser.add_argument("--threshold", type=float, default=default_threshold, help=threshold_help)
+
+
+def save_and_compare(
+    args: argparse.Namespace,
+    results: dict,
+    label_headers: Sequence[str],
+    metrics: Sequence[Metric],
+    regression_name: str,
+):
+    """
+    Stores the results (`--save`) and compares them with the stored results (`--compare`).
+    The results are nested dictionaries keyed by the `label_headers` values (e.g. the scenario
+    and the input size) - exits with a non-zero status if any of the compared `metrics`
+    exceeds the stored value by more than the `--threshold`.
+    """
+
+    if args.save:
+        args.save.parent.mkdir(parents=True, exist_ok=True)
+        args.save.write_text(
+            json.dumps({"python": platform.python_version(), "results": results}, indent=2) + "\n"
+        )
+        print(f"\nThe results have been saved to: {args.save}")
+
+    stored = load_results(args.compare) if args.compare else None
+    if stored is None:
+        return
+
+    print(f"\nComparison with: {args.compare} (python {stored['python']})\n")
+    rows, n_regressions = compare(results, stored["results"], metrics, args.threshold)
+    print_table(
+        [
+            *label_headers,
+            *[
+                header
+                for metric in metrics
+                for header in (metric.header, f"stored {metric.header}", "ratio")
+            ],
+            "",
+        ],
+        rows,
+    )
+    if n_regressions:
+        print(f"\nRegressions ({regression_name} > {args.threshold * 100:.0f}%): {n_regressions}")
+        sys.exit(1)
+
+
+def compare(
+    results: dict, stored_results: dict, metrics: Sequence[Metric], threshold: float
+) -> tuple[list[list], int]:
+    rows, n_regressions = list(), 0
+    for labels, result in iter_results(results):
+        stored_result = stored_results
+        for label in labels:
+            stored_result = stored_result.get(label, dict())
+
+        row, regression = list(labels), False
+        for metric in metrics:
+            value, stored_value = result[metric.key], stored_result.get(metric.key)
+            if stored_value is None:
+                row += [metric.fmt(value), "-", "-"]
+                continue
+
+            if stored_value:
+                ratio = value / stored_value
+            else:
+                ratio = 1.0 if value == 0 else float("inf")
+            regression |= ratio > 1 + threshold
+            row += [metric.fmt(value), metric.fmt(stored_value), f"{ratio:.2f}"]
+
+        n_regressions += regression
+        rows.append([*row, "REGRESSION" if regression else ""])
+    return rows, n_regressions
+
+
+def iter_results(results: dict, labels: tuple[str, ...] = ()) -> Iterator[tuple[tuple, dict]]:
+    """Yields the (innermost) results of the nested dictionaries with their keys"""
+
+    for label, result in results.items():
+        if result and all(isinstance(value, dict) for value in result.values()):
+            yield from iter_results(result, (*labels, label))
+        else:
+            yield (*labels, label), result
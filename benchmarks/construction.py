@@ -0,0 +1,97 @@
+"""
+This benchmark measures the time of creating a `PrettyFormatter` (in microseconds) for a set of
+formatting options, e.g. the default, styled and exact type matching options or the options with
+custom formatters, along with the time of the first formatting call of a small object, which
+includes filling the formatter's dispatch caches.
+
+The results can be stored in a JSON file (`--save`) and compared with the previously stored
+results (`--compare`) - the scenarios slower than the stored results by more than the given
+threshold are reported as regressions and the script exits with a non-zero status.
+"""
+
+import argparse
+from collections.abc import Sequence
+from pathlib import Path
+
+from colored import Fore
+from common import Metric, add_results_args, measure, print_table, save_and_compare
+
+import pformat as pf
+
+DEFAULT_RESULTS_PATH = Path(__file__).parent / "results" / "construction_baseline.json"
+DEFAULT_THRESHOLD = 0.25
+
+DATA = {"id": 1, "name": "record", "score": 0.5, "tags": ["a", "b"]}
+
+STYLED_OPTIONS = dict(indent_type=pf.IndentType.LINE(style=Fore.green), text_style=Fore.red)
+FORMATTERS = [
+    pf.make_formatter(float, lambda f, _: f"{f:.2f}"),
+    pf.make_formatter(str, lambda s, _: f's"{s}"'),
+    pf.make_formatter(list, lambda lst, _: f"list of {len(lst)}"),
+]
+
+SCENARIOS = {
+    "default": dict(),
+    "styled": STYLED_OPTIONS,
+    "exact_type_matching": dict(exact_type_matching=True),
+    "hexdump_buffers": dict(hexdump_buffers=True),
+    "projections": dict(projections=[pf.make_projection(float, lambda f: round(f, 2))]),
+    "formatters": dict(formatters=FORMATTERS),
+    "formatters_styled": dict(formatters=FORMATTERS, **STYLED_OPTIONS),
+}
+
+
+def run(scenarios: Sequence[str]) -> dict[str, dict[str, float]]:
+    results = dict()
+    for name in scenarios:
+        options = pf.FormatOptions(**SCENARIOS[name])
+        results[name] = {
+            "init": measure(lambda: pf.PrettyFormatter(options)),
+            "new": measure(lambda: pf.PrettyFormatter.new(**SCENARIOS[name])),
+            "first_call": measure(lambda: pf.PrettyFormatter(options)(DATA)),
+        }
+    return results
+
+
+def fmt_time(seconds: float) -> str:
+    return f"{seconds * 1e6:.2f}"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n\n")[0])
+    parser.add_argument(
+        "-s", "--scenarios", nargs="+", choices=SCENARIOS, help="the names of the run scenarios"
+    )
+    add_results_args(
+        parser,
+        DEFAULT_RESULTS_PATH,
+        DEFAULT_THRESHOLD,
+        threshold_help="the relative slowdown reported as a regression",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    results = run(args.scenarios or list(SCENARIOS))
+    print_table(
+        ["scenario", "init [us]", "new [us]", "init + first call [us]"],
+        [
+            [
+                name,
+                fmt_time(result["init"]),
+                fmt_time(result["new"]),
+                fmt_time(result["first_call"]),
+            ]
+            for name, result in results.items()
+        ],
+    )
+
+    save_and_compare(
+        args,
+        results,
+        ["scenario"],
+        [Metric("init", "init [us]", fmt_time)],
+        regression_name="slowdown",
+    )
@@ -0,0 +1,116 @@
+"""
+This benchmark shows how the formatting time scales with the nesting depth of the formatted data.
+
+Each nesting level of the data contains a few leaf values and the next level, so the number of
+output lines grows linearly with the depth. The time per output line should stay (roughly)
+constant for the `document` layout engine, which emits each line once with its final indentation,
+and grow with the depth for the `recursive` engine, which re-indents all lines at each level.
+The `recursive` engine cannot format the deepest data at all, as it exceeds the recursion limit.
+
+The results can be stored in a JSON file (`--save`) and compared with the previously stored
+results (`--compare`) - the depths with a time per output line larger than the stored one by more
+than the given threshold are reported as regressions and the script exits with a non-zero status.
+"""
+
+import argparse
+from collections.abc import Sequence
+from pathlib import Path
+
+from common import Metric, add_results_args, measure, print_table, save_and_compare
+
+import pformat as pf
+
+DEFAULT_RESULTS_PATH = Path(__file__).parent / "results" / "deep_nesting_baseline.json"
+DEFAULT_THRESHOLD = 0.25
+DEPTHS = [10, 20, 30, 40, 50, 200, 1_000]
+LEAVES_PER_LEVEL = 8
+
+ENGINES = [engine.value for engine in pf.LayoutEngine]
+
+
+def gen_data(depth: int, n_leaves: int) -> list:
+    data = list(range(n_leaves))
+    for _ in range(depth - 1):
+        data = [*range(n_leaves), data]
+    return data
+
+
+def run(engines: Sequence[str], depths: Sequence[int], n_leaves: int) -> dict[str, dict[str, dict]]:
+    # the engines which exceed the recursion limit for a given depth are omitted in the results
+    formatters = {
+        engine: pf.PrettyFormatter.new(
+            indent_type=pf.IndentType.LINE(), layout_engine=pf.LayoutEngine(engine)
+        )
+        for engine in engines
+    }
+
+    results = dict()
+    for depth in depths:
+        data = gen_data(depth, n_leaves)
+        depth_results = results[str(depth)] = dict()
+        for engine, formatter in formatters.items():
+            try:
+                n_lines = formatter(data).count("\n") + 1
+                time = measure(lambda: formatter(data))
+            except RecursionError:
+                continue
+            depth_results[engine] = {"lines": n_lines, "time_per_line": time / n_lines}
+    return results
+
+
+def fmt_time(seconds: float) -> str:
+    return f"{seconds * 1e6:.2f}"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n\n")[0])
+    parser.add_argument(
+        "-e", "--engines", nargs="+", choices=ENGINES, help="the names of the layout engines"
+    )
+    parser.add_argument(
+        "--depths", nargs="+", type=int, default=DEPTHS, help="the nesting depths of the data"
+    )
+    parser.add_argument(
+        "--leaves",
+        type=int,
+        default=LEAVES_PER_LEVEL,
+        help="the number of leaf values at each nesting level",
+    )
+    add_results_args(
+        parser,
+        DEFAULT_RESULTS_PATH,
+        DEFAULT_THRESHOLD,
+        threshold_help="the relative slowdown (per output line) reported as a regression",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    engines = args.engines or ENGINES
+    results = run(engines, args.depths, args.leaves)
+    print_table(
+        ["depth", "lines", *[f"{engine} [us/line]" for engine in engines]],
+        [
+            [
+                depth,
+                next((result["lines"] for result in depth_results.values()), "-"),
+                *[
+                    fmt_time(depth_results[engine]["time_per_line"])
+                    if engine in depth_results
+                    else "RecursionError"
+                    for engine in engines
+                ],
+            ]
+            for depth, depth_results in results.items()
+        ],
+    )
+
+    save_and_compare(
+        args,
+        results,
+        ["depth", "engine"],
+        [Metric("time_per_line", "time [us/line]", fmt_time)],
+        regression_name="slowdown",
+    )
@@ -0,0 +1,157 @@
+"""
+This benchmark measures the memory allocated while formatting the data with the `PrettyFormatter`
+for a set of scenarios (expanded, compact and styled output, streaming) using `tracemalloc`.
+
+For each scenario, the benchmark reports the peak size of the memory traced during a single
+formatting call (including the output string) and its ratio to the size of the output, along with
+the size and the number of the memory blocks allocated by the call, i.e. the difference between
+the `tracemalloc` snapshots taken before and after the call (the output is kept alive until the
+second snapshot is taken, while the temporary objects freed during the call are not included).
+
+The results can be stored in a JSON file (`--save`) and compared with the previously stored
+results (`--compare`) - the scenarios with a peak or a number of allocated blocks larger than the
+stored one by more than the given threshold are reported as regressions and the script exits with
+a non-zero status.
+"""
+
+import argparse
+import gc
+import tracemalloc
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any, Callable
+
+from colored import Fore
+from common import Metric, add_results_args, gen_records, print_table, save_and_compare
+
+import pformat as pf
+
+DEFAULT_RESULTS_PATH = Path(__file__).parent / "results" / "memory_baseline.json"
+DEFAULT_THRESHOLD = 0.1
+SIZES = [1_000, 10_000]
+
+STYLED_OPTIONS = dict(indent_type=pf.IndentType.LINE(style=Fore.green), text_style=Fore.red)
+
+
+def format_func(options: dict) -> Callable[[Any], tuple[Any, int]]:
+    # returns the formatting result (kept alive until the allocations are traced) and its size
+    formatter = pf.PrettyFormatter.new(**options)
+
+    def func(data: Any) -> tuple[Any, int]:
+        output = formatter(data)
+        return output, len(output)
+
+    return func
+
+
+def stream_func(options: dict) -> Callable[[Any], tuple[Any, int]]:
+    # the output is written in chunks to a sink which does not store it
+    formatter = pf.PrettyFormatter.new(**options)
+    return lambda data: (None, sum(len(chunk) for chunk in formatter.iter_chunks(data)))
+
+
+SCENARIOS = {
+    "expanded": format_func(dict()),
+    "compact": format_func(dict(compact=True)),
+    "styled": format_func(STYLED_OPTIONS),
+    "styled_compact": format_func(dict(compact=True, **STYLED_OPTIONS)),
+    "styled_coalesced": format_func(dict(coalesce_styles=True, **STYLED_OPTIONS)),
+    "streamed": stream_func(dict()),
+    "streamed_styled": stream_func(STYLED_OPTIONS),
+}
+
+
+def trace(func: Callable[[Any], tuple[Any, int]], data: Any) -> dict[str, int]:
+    func(data)  # the first call fills the formatter's caches
+    gc.collect()
+
+    tracemalloc.start()
+    try:
+        snapshot_before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        traced_before, _ = tracemalloc.get_traced_memory()
+        output, output_size = func(data)
+        _, peak = tracemalloc.get_traced_memory()
+        snapshot_after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    # the snapshots do not include the memory blocks allocated by `tracemalloc` itself
+    tracemalloc_filter = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    stats = snapshot_after.filter_traces(tracemalloc_filter).compare_to(
+        snapshot_before.filter_traces(tracemalloc_filter), "filename"
+    )
+    del output
+    return {
+        "output_size": output_size,
+        "peak": peak - traced_before,
+        "allocated": sum(stat.size_diff for stat in stats if stat.size_diff > 0),
+        "allocated_blocks": sum(stat.count_diff for stat in stats if stat.count_diff > 0),
+    }
+
+
+def run(scenarios: Sequence[str], sizes: Sequence[int]) -> dict[str, dict[str, dict]]:
+    results = dict()
+    for name in scenarios:
+        results[name] = {str(size): trace(SCENARIOS[name], gen_records(size)) for size in sizes}
+    return results
+
+
+def fmt_size(n_bytes: int) -> str:
+    return f"{n_bytes / 1024:.1f}"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n\n")[0])
+    parser.add_argument(
+        "-s", "--scenarios", nargs="+", choices=SCENARIOS, help="the names of the run scenarios"
+    )
+    parser.add_argument("--sizes", nargs="+", type=int, default=SIZES, help="the input sizes")
+    add_results_args(
+        parser,
+        DEFAULT_RESULTS_PATH,
+        DEFAULT_THRESHOLD,
+        threshold_help="the relative increase of the peak (or blocks) reported as a regression",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    results = run(args.scenarios or list(SCENARIOS), args.sizes)
+    print_table(
+        [
+            "scenario",
+            "size",
+            "output [KiB]",
+            "peak [KiB]",
+            "peak/output",
+            "allocated [KiB]",
+            "allocated blocks",
+        ],
+        [
+            [
+                name,
+                size,
+                fmt_size(result["output_size"]),
+                fmt_size(result["peak"]),
+                f"{result['peak'] / result['output_size']:.2f}",
+                fmt_size(result["allocated"]),
+                result["allocated_blocks"],
+            ]
+            for name, size_results in results.items()
+            for size, result in size_results.items()
+        ],
+    )
+
+    save_and_compare(
+        args,
+        results,
+        ["scenario", "size"],
+        [
+            Metric("peak", "peak [KiB]", fmt_size),
+            Metric("allocated_blocks", "blocks", str),
+        ],
+        regression_name="memory increase",
+    )
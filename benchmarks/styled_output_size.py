@@ -0,0 +1,100 @@
+"""
+This benchmark shows the size reduction of the styled output achieved with the `coalesce_styles`
+option, which removes the redundant style modifiers without changing the output's appearance
+in a terminal, along with the formatting time overhead of the coalescing pass.
+
+The results can be stored in a JSON file (`--save`) and compared with the previously stored
+results (`--compare`) - the configurations with a coalesced output size or formatting time larger
+than the stored one by more than the given threshold are reported as regressions and the script
+exits with a non-zero status.
+"""
+
+import argparse
+from collections.abc import Sequence
+from pathlib import Path
+
+from colored import Back, Fore
+from common import Metric, add_results_args, measure, print_table, save_and_compare
+
+import pformat as pf
+
+DEFAULT_RESULTS_PATH = Path(__file__).parent / "results" / "styled_output_size_baseline.json"
+DEFAULT_THRESHOLD = 0.25
+N_ITEMS = 10_000
+CONFIGS = {
+    "text_style": dict(text_style=Fore.red),
+    "styled_indent": dict(indent_type=pf.IndentType.LINE(style=Fore.green), text_style=Fore.red),
+    "style_entire_text": dict(
+        indent_type=pf.IndentType.LINE(style=Back.green),
+        text_style=pf.TextStyle(Fore.red, pf.TextStyle.Mode.preserve),
+        style_entire_text=True,
+    ),
+}
+
+
+def run(configs: Sequence[str], n_items: int) -> dict[str, dict]:
+    data = [list(range(10)) for _ in range(n_items // 10)]
+
+    results = dict()
+    for name in configs:
+        formatter = pf.PrettyFormatter.new(**CONFIGS[name])
+        coalescing_formatter = pf.PrettyFormatter.new(**CONFIGS[name], coalesce_styles=True)
+        results[name] = {
+            "size": len(formatter(data).encode()),
+            "coalesced_size": len(coalescing_formatter(data).encode()),
+            "time": measure(lambda: formatter(data), repeat=3),
+            "coalesced_time": measure(lambda: coalescing_formatter(data), repeat=3),
+        }
+    return results
+
+
+def fmt_time(seconds: float) -> str:
+    return f"{seconds * 1e3:.1f}"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n\n")[0])
+    parser.add_argument(
+        "-c", "--configs", nargs="+", choices=CONFIGS, help="the names of the style configurations"
+    )
+    parser.add_argument(
+        "--items", type=int, default=N_ITEMS, help="the number of the formatted items"
+    )
+    add_results_args(
+        parser,
+        DEFAULT_RESULTS_PATH,
+        DEFAULT_THRESHOLD,
+        threshold_help="the relative increase of the size (or time) reported as a regression",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    results = run(args.configs or list(CONFIGS), args.items)
+    print_table(
+        ["config", "bytes", "coalesced bytes", "saved [%]", "time [ms]", "coalesced time [ms]"],
+        [
+            [
+                name,
+                result["size"],
+                result["coalesced_size"],
+                f"{(1 - result['coalesced_size'] / result['size']) * 100:.1f}",
+                fmt_time(result["time"]),
+                fmt_time(result["coalesced_time"]),
+            ]
+            for name, result in results.items()
+        ],
+    )
+
+    save_and_compare(
+        args,
+        results,
+        ["config"],
+        [
+            Metric("coalesced_size", "coalesced bytes", str),
+            Metric("coalesced_time", "coalesced time [ms]", fmt_time),
+        ],
+        regression_name="size or time increase",
+    )
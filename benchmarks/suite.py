@@ -0,0 +1,159 @@
+"""
+This benchmark suite measures the formatting time of the `PrettyFormatter` for a set of scenarios
+(wide and deep data, compact and expanded layouts, styled output, projections and custom
+formatters) and increasing input sizes, along with the time of the stdlib `pprint.pformat` call
+for the same data as a baseline.
+
+The results can be stored in a JSON file (`--save`) and compared with the previously stored
+results (`--compare`) - the scenarios slower than the stored results by more than the given
+threshold are reported as regressions and the script exits with a non-zero status.
+"""
+
+import argparse
+import pprint
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from colored import Fore
+from common import (
+    Metric,
+    add_results_args,
+    gen_records,
+    measure,
+    print_table,
+    save_and_compare,
+)
+
+import pformat as pf
+
+DEFAULT_RESULTS_PATH = Path(__file__).parent / "results" / "baseline.json"
+DEFAULT_THRESHOLD = 0.25
+SIZES = [100, 1_000, 10_000]
+
+
+def gen_deep_data(n: int) -> list:
+    # each level contains a few leaf values, so the size is the total number of items
+    data = list(range(10))
+    for _ in range(n // 10 - 1):
+        data = [*range(9), data]
+    return data
+
+
+@dataclass
+class Scenario:
+    name: str
+    gen_data: Callable[[int], Any]
+    options: dict = field(default_factory=dict)
+
+
+SCENARIOS = [
+    Scenario("wide_list", lambda n: list(range(n))),
+    Scenario("wide_list_compact", lambda n: list(range(n)), dict(compact=True)),
+    Scenario("wide_dict", lambda n: {f"key{i}": i for i in range(n)}),
+    Scenario("wide_dict_compact", lambda n: {f"key{i}": i for i in range(n)}, dict(compact=True)),
+    Scenario("records", gen_records),
+    Scenario("records_compact", gen_records, dict(compact=True)),
+    Scenario("deep_nesting", gen_deep_data),
+    Scenario("deep_nesting_compact", gen_deep_data, dict(compact=True)),
+    Scenario(
+        "records_styled",
+        gen_records,
+        dict(indent_type=pf.IndentType.LINE(style=Fore.green), text_style=Fore.red),
+    ),
+    Scenario(
+        "records_styled_compact",
+        gen_records,
+        dict(
+            compact=True,
+            indent_type=pf.IndentType.LINE(style=Fore.green),
+            text_style=Fore.red,
+        ),
+    ),
+    Scenario(
+        "records_projections",
+        gen_records,
+        dict(projections=[pf.make_projection(float, lambda f: round(f, 2))]),
+    ),
+    Scenario(
+        "records_formatters",
+        gen_records,
+        dict(
+            formatters=[
+                pf.make_formatter(float, lambda f, _: f"{f:.2f}"),
+                pf.make_formatter(str, lambda s, _: f's"{s}"'),
+            ]
+        ),
+    ),
+]
+
+
+def measure_pprint(data: Any) -> Optional[float]:
+    try:
+        return measure(lambda: pprint.pformat(data), repeat=3)
+    except RecursionError:
+        return None
+
+
+def run(scenarios: list[Scenario], sizes: list[int]) -> dict[str, dict[str, dict]]:
+    results = dict()
+    for scenario in scenarios:
+        formatter = pf.PrettyFormatter.new(**scenario.options)
+        results[scenario.name] = dict()
+        for size in sizes:
+            data = scenario.gen_data(size)
+            results[scenario.name][str(size)] = {
+                "pformat": measure(lambda: formatter(data), repeat=3),
+                "pprint": measure_pprint(data),
+            }
+    return results
+
+
+def fmt_time(seconds: Optional[float]) -> str:
+    return "RecursionError" if seconds is None else f"{seconds * 1e3:.3f}"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n\n")[0])
+    parser.add_argument("-s", "--scenarios", nargs="+", help="the names of the run scenarios")
+    parser.add_argument("--sizes", nargs="+", type=int, default=SIZES, help="the input sizes")
+    add_results_args(
+        parser,
+        DEFAULT_RESULTS_PATH,
+        DEFAULT_THRESHOLD,
+        threshold_help="the relative slowdown reported as a regression",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    scenarios = SCENARIOS
+    if args.scenarios:
+        scenarios = [scenario for scenario in SCENARIOS if scenario.name in args.scenarios]
+
+    results = run(scenarios, args.sizes)
+    print_table(
+        ["scenario", "size", "pformat [ms]", "pprint [ms]", "pformat/pprint", "us/item"],
+        [
+            [
+                name,
+                size,
+                fmt_time(result["pformat"]),
+                fmt_time(result["pprint"]),
+                "-" if result["pprint"] is None else f"{result['pformat'] / result['pprint']:.2f}",
+                f"{result['pformat'] / int(size) * 1e6:.2f}",
+            ]
+            for name, size_results in results.items()
+            for size, result in size_results.items()
+        ],
+    )
+
+    save_and_compare(
+        args,
+        results,
+        ["scenario", "size"],
+        [Metric("pformat", "time [ms]", fmt_time)],
+        regression_name="slowdown",
+    )
@@ -17,7 +17,7 @@ def display(item: Any, configs: Iterable[Config]):
     print(f"{item = }\n")
 
     for config in configs:
-        formatter = pf.PrettyFormatter(config.fmt_opts)
+        formatter = pf.get_formatter(config.fmt_opts)
         print(f"--- {config.name} ---")
         print(formatter(item), "\n")
 
@@ -1,23 +1,89 @@
-from .format_options import FormatOptions
-from .indentation_utility import IndentMarker, IndentType
-from .named_types import NamedIterable, NamedMapping
-from .pretty_formatter import DefaultFormatter, IterableFormatter, MappingFormatter, PrettyFormatter
-from .text_style import (
-    TextStyle,
-    TextStyleParam,
-    TextStyleValue,
-    rm_style_modifiers,
-    strlen_no_style,
-)
-from .type_formatter import (
-    TypeFormatter,
-    TypeFormatterFunc,
-    make_formatter,
-)
-from .type_projection import (
-    TypeProjection,
-    TypeProjectionFunc,
-    identity_projection_func,
-    make_projection,
-)
-from .type_specific_callable import TypeSpecifcCallable
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .format_options import FormatOptions
+    from .formatter_pool import FormatterPool, get_formatter
+    from .indentation_utility import IndentMarker, IndentType
+    from .layout import LayoutEngine
+    from .logging_utility import BackgroundFormattingHandler, LazyFormat, PrettyLogFormatter, lazy
+    from .named_types import NamedIterable, NamedMapping
+    from .pretty_formatter import (
+        DefaultFormatter,
+        IterableFormatter,
+        MappingFormatter,
+        PrettyFormatter,
+    )
+    from .text_style import (
+        StyleCoalescer,
+        TextStyle,
+        TextStyleParam,
+        TextStyleValue,
+        coalesce_style_modifiers,
+        rm_style_modifiers,
+        strlen_no_style,
+    )
+    from .type_formatter import (
+        TypeFormatter,
+        TypeFormatterFunc,
+        make_formatter,
+    )
+    from .type_projection import (
+        TypeProjection,
+        TypeProjectionFunc,
+        identity_projection_func,
+        make_projection,
+    )
+    from .type_specific_callable import TypeSpecifcCallable
+
+# the package attributes are imported from their modules on the first access,
+# so importing the package does not import the modules which are not used
+_ATTRIBUTE_MODULES = {
+    "FormatOptions": "format_options",
+    "FormatterPool": "formatter_pool",
+    "get_formatter": "formatter_pool",
+    "IndentMarker": "indentation_utility",
+    "IndentType": "indentation_utility",
+    "LayoutEngine": "layout",
+    "BackgroundFormattingHandler": "logging_utility",
+    "LazyFormat": "logging_utility",
+    "PrettyLogFormatter": "logging_utility",
+    "lazy": "logging_utility",
+    "NamedIterable": "named_types",
+    "NamedMapping": "named_types",
+    "DefaultFormatter": "pretty_formatter",
+    "IterableFormatter": "pretty_formatter",
+    "MappingFormatter": "pretty_formatter",
+    "PrettyFormatter": "pretty_formatter",
+    "StyleCoalescer": "text_style",
+    "TextStyle": "text_style",
+    "TextStyleParam": "text_style",
+    "TextStyleValue": "text_style",
+    "coalesce_style_modifiers": "text_style",
+    "rm_style_modifiers": "text_style",
+    "strlen_no_style": "text_style",
+    "TypeFormatter": "type_formatter",
+    "TypeFormatterFunc": "type_formatter",
+    "make_formatter": "type_formatter",
+    "TypeProjection": "type_projection",
+    "TypeProjectionFunc": "type_projection",
+    "identity_projection_func": "type_projection",
+    "make_projection": "type_projection",
+    "TypeSpecifcCallable": "type_specific_callable",
+}
+
+__all__ = list(_ATTRIBUTE_MODULES)
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _ATTRIBUTE_MODULES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    attribute = getattr(import_module(f".{module_name}", __name__), name)
+    globals()[name] = attribute
+    return attribute
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *__all__})
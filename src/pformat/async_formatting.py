@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterable, AsyncIterator, Iterable
+from typing import TYPE_CHECKING, Any, Optional
+
+from .layout import ELLIPSIS, ITEM_SEPARATOR, LINE_SEPARATOR, Doc, Group, LayoutEngine, Text
+from .pretty_formatter import (
+    ROOT_CONTEXT,
+    FormatContext,
+    IterableFormatter,
+    _is_elided,
+    _more_items_marker,
+)
+from .text_style import StyleCoalescer, strlen_no_style
+
+if TYPE_CHECKING:
+    from .pretty_formatter import PrettyFormatter
+
+
+async def aiter_chunks(
+    formatter: PrettyFormatter, obj: Any, depth: int, chunk_size: int, yield_every: int
+) -> AsyncIterator[str]:
+    if formatter.options.layout_engine is LayoutEngine.recursive:
+        # the recursive engine formats the entire object in a single blocking call
+        lines = _to_async_lines(iter([formatter._format_impl(obj, depth)]), yield_every)
+    elif isinstance(obj, AsyncIterable):
+        lines = _aiter_async_iterable_lines(formatter, obj, depth, yield_every)
+    else:
+        doc = formatter._build_doc(obj, depth, formatter._root_context(obj))
+        lines = _to_async_lines(formatter._renderer.iter_lines(doc, depth), yield_every)
+
+    chunks = _join_into_chunks(lines, chunk_size)
+    if not formatter.options.coalesce_styles:
+        async for chunk in chunks:
+            yield chunk
+        return
+
+    coalescer = StyleCoalescer()
+    async for chunk in chunks:
+        yield coalescer(chunk)
+
+
+async def _to_async_lines(lines: Iterable[str], yield_every: int) -> AsyncIterator[str]:
+    # the lines are produced lazily, so the formatting is suspended between the yielded lines
+    for i, line in enumerate(lines, start=1):
+        yield line
+        if i % yield_every == 0:
+            await asyncio.sleep(0)
+
+
+async def _join_into_chunks(lines: AsyncIterator[str], chunk_size: int) -> AsyncIterator[str]:
+    # the lines are joined into chunks in the same way as in `LayoutRenderer.iter_chunks`
+    chunk, chunk_len = list(), 0
+    first_line = True
+    async for line in lines:
+        if not first_line:
+            if chunk_len >= chunk_size:
+                yield "".join(chunk)
+                chunk.clear()
+                chunk_len = 0
+
+            chunk.append(LINE_SEPARATOR)
+            chunk_len += len(LINE_SEPARATOR)
+
+        chunk.append(line)
+        chunk_len += len(line)
+        first_line = False
+
+    yield "".join(chunk)
+
+
+async def _aiter_async_iterable_lines(
+    formatter: PrettyFormatter, aiterable: AsyncIterable, depth: int, yield_every: int
+) -> AsyncIterator[str]:
+    # an async iterable is formatted like a collection with the same items, but the items are
+    # rendered as soon as they are produced once the collection does not fit in a single line
+    options, renderer = formatter.options, formatter._renderer
+
+    opening, closing = IterableFormatter.get_parens(aiterable)
+    if _is_elided(aiterable, ROOT_CONTEXT, options.max_depth):
+        yield f"{opening}{ELLIPSIS}{closing}"
+        return
+
+    items_context = ROOT_CONTEXT.nested(aiterable)
+    budget = options.width - options.indent_type.length(depth) if options.compact else -1
+
+    # the items are buffered only while the collection may still fit in a single line
+    buffered_docs: Optional[list[Doc]] = list()
+    width = strlen_no_style(opening) + strlen_no_style(closing)
+    n_lines = 0
+    async for doc in _aiter_limited_docs(formatter, aiterable, depth, items_context):
+        if buffered_docs is not None:
+            if buffered_docs:
+                width += len(ITEM_SEPARATOR)
+            width += doc.measure(budget - width)
+            buffered_docs.append(doc)
+            if width <= budget:
+                continue
+
+            docs, buffered_docs = buffered_docs, None
+            yield renderer.broken_parens(Group(opening, closing, []))[0]
+        else:
+            docs = [doc]
+
+        for item_doc in docs:
+            for line in renderer.iter_item_lines(item_doc, depth):
+                yield line
+                n_lines += 1
+                if n_lines % yield_every == 0:
+                    await asyncio.sleep(0)
+
+    group = Group(opening, closing, buffered_docs or [])
+    if buffered_docs is not None:
+        for line in renderer.iter_lines(group, depth):
+            yield line
+    else:
+        yield renderer.broken_parens(group)[1]
+
+
+async def _aiter_limited_docs(
+    formatter: PrettyFormatter, aiterable: AsyncIterable, depth: int, context: FormatContext
+) -> AsyncIterator[Doc]:
+    max_items = formatter.options.max_items
+
+    n_items = 0
+    async for item in aiterable:
+        if max_items is not None and n_items == max_items:
+            # the size of an async iterable is unknown, so the elided items are not counted
+            yield Text.new(_more_items_marker(None))
+            return
+
+        yield formatter._build_doc(item, depth, context)
+        n_items += 1
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Iterable, Iterator
+from itertools import islice
+from typing import TYPE_CHECKING, Any, Optional
+
+if TYPE_CHECKING:
+    from .pretty_formatter import PrettyFormatter
+
+DEFAULT_BATCH_SIZE = 64
+# the number of batches submitted to the process pool ahead of the consumed ones (per worker)
+PREFETCHED_BATCHES_PER_WORKER = 2
+
+# the formatter of a worker process - unpickled once per process from the formatter's options
+_worker_formatter: Optional[PrettyFormatter] = None
+
+
+def _init_worker(formatter: PrettyFormatter) -> None:
+    global _worker_formatter
+    _worker_formatter = formatter
+
+
+def _format_batch(objs: list[Any], depth: int) -> list[str]:
+    return [_worker_formatter(obj, depth) for obj in objs]
+
+
+def iter_batches(objs: Iterable[Any], batch_size: int) -> Iterator[list[Any]]:
+    objs = iter(objs)
+    while True:
+        batch = list(islice(objs, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def validate_picklable(formatter: PrettyFormatter) -> None:
+    import pickle
+
+    try:
+        pickle.dumps(formatter)
+    except (pickle.PicklingError, AttributeError, TypeError) as e:
+        raise ValueError(
+            "The format options must be picklable to be sent to the worker processes "
+            f"(the projection and formatter functions must be defined at a module level) - {e}"
+        ) from e
+
+
+def iter_formatted_in_processes(
+    formatter: PrettyFormatter, objs: Iterable[Any], depth: int, workers: int, batch_size: int
+) -> Iterator[str]:
+    # the objects are sent to the workers in batches and only a limited number of batches is
+    # submitted ahead of the consumed results, so the input is consumed lazily (in order)
+    from concurrent.futures import ProcessPoolExecutor
+
+    batches = iter_batches(objs, batch_size)
+    executor = ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(formatter,)
+    )
+    try:
+        pending = deque(
+            executor.submit(_format_batch, batch, depth)
+            for batch in islice(batches, workers * PREFETCHED_BATCHES_PER_WORKER)
+        )
+        while pending:
+            formatted_batch = pending.popleft().result()
+            for batch in islice(batches, 1):
+                pending.append(executor.submit(_format_batch, batch, depth))
+
+            yield from formatted_batch
+    finally:
+        executor.shutdown(cancel_futures=True)
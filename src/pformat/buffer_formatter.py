@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from typing import Any
+
+from .layout import ELLIPSIS, Block, Doc, Text
+from .pretty_formatter import ROOT_CONTEXT, FormatContext, PrettyFormatter
+from .type_formatter import TypeFormatter
+
+OFFSET_WIDTH = 8
+BYTE_GROUP_SIZE = 8
+BYTES_PER_ROW_OPTIONS = (16, 8, 4, 2, 1)
+
+# the non-printable bytes are displayed as dots in the ascii column of a hexdump
+_ASCII_TABLE = bytes(b if 0x20 <= b < 0x7F else ord(".") for b in range(256))
+
+
+def _hex_column_width(bytes_per_row: int) -> int:
+    # 2 digits and a space per byte with an additional space between the byte groups
+    return 3 * bytes_per_row - 1 + (bytes_per_row - 1) // BYTE_GROUP_SIZE
+
+
+def _row_width(bytes_per_row: int) -> int:
+    # offset, hex column and ascii column (within `|` characters) separated with 2 spaces
+    return OFFSET_WIDTH + 2 + _hex_column_width(bytes_per_row) + 2 + bytes_per_row + 2
+
+
+def _as_bytes(view: memoryview, n_bytes: int) -> memoryview:
+    # returns a flat byte view of (at least) the first `n_bytes` bytes of the buffer - the
+    # contiguous buffers are cast without copying, the other ones are copied only up to the limit
+    # (the leading dimension is sliced to the rows which cover the limit)
+    if view.c_contiguous:
+        return view.cast("B")
+
+    row_nbytes = view.nbytes // view.shape[0]
+    n_rows = -(-n_bytes // row_nbytes)
+    return memoryview(view[:n_rows].tobytes())
+
+
+class BufferFormatter(TypeFormatter):
+    def __init__(self, base_formatter: PrettyFormatter, buffer_t: type):
+        super().__init__(buffer_t)
+
+        self._base_formatter = base_formatter
+        self._options = self._base_formatter._options
+
+    def __call__(self, buffer: Any, depth: int = 0) -> str:
+        return self._format_nested(buffer, depth)
+
+    def _format_nested(
+        self, buffer: Any, depth: int = 0, context: FormatContext = ROOT_CONTEXT
+    ) -> str:
+        return self._base_formatter._renderer.render(self._build_doc(buffer, depth, context), depth)
+
+    def _build_doc(self, buffer: Any, depth: int = 0, context: FormatContext = ROOT_CONTEXT) -> Doc:
+        self._validate_type(buffer, self._options.exact_type_matching)
+
+        view = memoryview(buffer)
+        opening, closing = f"{type(buffer).__name__}(", ")"
+        if view.nbytes == 0:
+            return Text.new(f"{opening}{closing}")
+
+        max_string_length = self._options.max_string_length
+        n_bytes = view.nbytes if max_string_length is None else min(view.nbytes, max_string_length)
+        return Block(
+            opening,
+            closing,
+            self.__iter_lines(view, n_bytes, self.__bytes_per_row(depth + context.level + 1)),
+        )
+
+    def __bytes_per_row(self, level: int) -> int:
+        budget = self._options.width - self._options.indent_type.length(level)
+        return next(
+            (n for n in BYTES_PER_ROW_OPTIONS if _row_width(n) <= budget),
+            BYTES_PER_ROW_OPTIONS[-1],
+        )
+
+    def __iter_lines(self, view: memoryview, n_bytes: int, bytes_per_row: int) -> Iterator[str]:
+        text_style = self._options.text_style
+
+        if view.format != "B" or view.ndim != 1:
+            yield text_style.apply_to(f"format={view.format!r}, shape={view.shape}")
+
+        # the rows are zero-copy slices of the byte view, which is released once it is exhausted
+        with _as_bytes(view, n_bytes) as bytes_view:
+            for offset in range(0, n_bytes, bytes_per_row):
+                row = bytes_view[offset : min(offset + bytes_per_row, n_bytes)]
+                yield text_style.apply_to(self.__format_row(offset, row, bytes_per_row))
+
+        n_more = view.nbytes - n_bytes
+        if n_more > 0:
+            yield text_style.apply_to(f"{ELLIPSIS} {n_more} more byte{'s' if n_more > 1 else ''}")
+
+    @staticmethod
+    def __format_row(offset: int, row: memoryview, bytes_per_row: int) -> str:
+        hex_column = "  ".join(
+            row[i : i + BYTE_GROUP_SIZE].hex(" ") for i in range(0, len(row), BYTE_GROUP_SIZE)
+        )
+        ascii_column = row.tobytes().translate(_ASCII_TABLE).decode("ascii")
+        return (
+            f"{offset:0{OFFSET_WIDTH}x}  "
+            f"{hex_column.ljust(_hex_column_width(bytes_per_row))}  |{ascii_column}|"
+        )
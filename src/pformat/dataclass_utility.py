@@ -0,0 +1,54 @@
+from dataclasses import FrozenInstanceError, dataclass, fields
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+
+def _getstate(self) -> tuple:
+    return tuple(getattr(self, name) for name in self.__slots__)
+
+
+def _setstate(self, state: tuple) -> None:
+    for name, value in zip(self.__slots__, state):
+        object.__setattr__(self, name, value)
+
+
+def _frozen_setattr(self, name: str, value: Any) -> None:
+    raise FrozenInstanceError(f"cannot assign to field '{name}'")
+
+
+def _frozen_delattr(self, name: str) -> None:
+    raise FrozenInstanceError(f"cannot delete field '{name}'")
+
+
+def frozen_dataclass(cls: type = None, /, **kwargs: Any):
+    """
+    Creates a frozen dataclass with `__slots__` - an equivalent of
+    `@dataclass(frozen=True, slots=True)`, which is not available in python 3.9.
+    """
+
+    def wrap(cls: type[T]) -> type[T]:
+        cls = dataclass(cls, frozen=True, **kwargs)
+
+        # the slots cannot be added to an existing class, so the class is recreated with the slots
+        # in place of the fields' class attributes (the default values are kept by the `__init__`)
+        field_names = tuple(field.name for field in fields(cls))
+        cls_dict = {
+            name: value
+            for name, value in cls.__dict__.items()
+            if name not in (*field_names, "__dict__", "__weakref__")
+        }
+        cls_dict["__slots__"] = field_names
+        # the frozen instances are unpickled/copied without the (raising) `__setattr__` method
+        cls_dict["__getstate__"] = _getstate
+        cls_dict["__setstate__"] = _setstate
+        # the methods generated by `dataclass` refer to the original class, which is not a base
+        # of the recreated one, so they are replaced with the ones which always raise
+        cls_dict["__setattr__"] = _frozen_setattr
+        cls_dict["__delattr__"] = _frozen_delattr
+
+        slotted_cls = type(cls)(cls.__name__, cls.__bases__, cls_dict)
+        slotted_cls.__qualname__ = cls.__qualname__
+        return slotted_cls
+
+    return wrap if cls is None else wrap(cls)
@@ -1,14 +1,48 @@
-from dataclasses import MISSING, asdict, dataclass, field, fields
+from __future__ import annotations
+
+from dataclasses import MISSING, asdict, field, fields, replace
 from functools import cmp_to_key
-from typing import Any, Iterable, MutableSequence, Optional
+from typing import Any, Optional, Sequence
 
+from .dataclass_utility import frozen_dataclass
 from .indentation_utility import IndentType
+from .layout import LayoutEngine
 from .text_style import TextStyle
 from .type_formatter import TypeFormatter
 from .type_projection import TypeProjection
+from .type_specific_callable import TypeSpecifcCallable
+
+
+def _callables_key(callables: Optional[Sequence[TypeSpecifcCallable]]) -> Optional[tuple]:
+    # the type specific callables are compared only by their types, so the projections and
+    # formatters are compared by their classes and attributes (e.g. the formatting functions)
+    if callables is None:
+        return None
+    return tuple(_callable_key(c) for c in callables)
+
+
+def _callable_key(c: TypeSpecifcCallable) -> tuple:
+    key = (type(c), *_callable_attributes(c).items())
+    try:
+        hash(key)
+    except TypeError:
+        # the callables with unhashable attributes are compared by identity
+        return (type(c), id(c))
+    return key
+
+
+def _callable_attributes(c: TypeSpecifcCallable) -> dict[str, Any]:
+    # the attributes of the callables can be stored both in `__dict__` and in `__slots__`
+    attributes = dict(getattr(c, "__dict__", {}))
+    for base in type(c).__mro__:
+        slots = base.__dict__.get("__slots__", ())
+        for name in (slots,) if isinstance(slots, str) else slots:
+            if name not in ("__dict__", "__weakref__") and hasattr(c, name):
+                attributes[name] = getattr(c, name)
+    return attributes
 
 
-@dataclass
+@frozen_dataclass(eq=False)
 class FormatOptions:
     compact: bool = False
     width: int = 50
@@ -16,18 +50,79 @@ class FormatOptions:
     text_style: TextStyle = field(default_factory=TextStyle)
     style_entire_text: bool = False
     exact_type_matching: bool = False
-    projections: Optional[Iterable[TypeProjection]] = None
-    formatters: Optional[MutableSequence[TypeFormatter]] = None
+    projections: Optional[Sequence[TypeProjection]] = None
+    formatters: Optional[Sequence[TypeFormatter]] = None
+    layout_engine: LayoutEngine = LayoutEngine.document
+    coalesce_styles: bool = False
+    max_depth: Optional[int] = None
+    max_items: Optional[int] = None
+    max_string_length: Optional[int] = None
+    anchor_shared_references: bool = False
+    hexdump_buffers: bool = False
+    parallel_threads: Optional[int] = None
 
     def __post_init__(self):
+        if self.anchor_shared_references and self.layout_engine is LayoutEngine.recursive:
+            raise ValueError(
+                "The `anchor_shared_references` option is not supported by the recursive layout engine"
+            )
+
+        if self.parallel_threads is not None:
+            if self.parallel_threads < 1:
+                raise ValueError(
+                    f"The `parallel_threads` option must be positive - got `{self.parallel_threads}`"
+                )
+            if self.layout_engine is LayoutEngine.recursive:
+                raise ValueError(
+                    "The `parallel_threads` option is not supported by the recursive layout engine"
+                )
+            if self.anchor_shared_references:
+                # the anchors are labeled in the order of their occurrence in the output
+                raise ValueError(
+                    "The `parallel_threads` option cannot be used with `anchor_shared_references`"
+                )
+
+        for limit_name in ("max_depth", "max_items", "max_string_length"):
+            limit = getattr(self, limit_name)
+            if limit is not None and limit < 0:
+                raise ValueError(f"The `{limit_name}` option must be non-negative - got `{limit}`")
+
         if not isinstance(self.text_style, TextStyle):
-            self.text_style = TextStyle.new(self.text_style)
+            object.__setattr__(self, "text_style", TextStyle.new(self.text_style))
 
+        # the projections and formatters are stored as (sorted) tuples, so that the options are hashable
         if self.projections is not None:
-            self.projections = sorted(self.projections, key=cmp_to_key(TypeProjection.cmp))
+            object.__setattr__(
+                self,
+                "projections",
+                tuple(sorted(self.projections, key=cmp_to_key(TypeProjection.cmp))),
+            )
 
         if self.formatters is not None:
-            self.formatters = sorted(self.formatters, key=cmp_to_key(TypeFormatter.cmp))
+            object.__setattr__(
+                self,
+                "formatters",
+                tuple(sorted(self.formatters, key=cmp_to_key(TypeFormatter.cmp))),
+            )
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, FormatOptions):
+            return NotImplemented
+        return self.__key() == other.__key()
+
+    def __hash__(self) -> int:
+        return hash(self.__key())
+
+    def __key(self) -> tuple:
+        return tuple(
+            _callables_key(getattr(self, name))
+            if name in ("projections", "formatters")
+            else getattr(self, name)
+            for name in self.__slots__
+        )
+
+    def replace(self, **changes: Any) -> FormatOptions:
+        return replace(self, **changes)
 
     def asdict(self, shallow: bool = True) -> dict:
         if shallow:
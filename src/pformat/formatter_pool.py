@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from threading import Lock
+
+from .format_options import FormatOptions
+from .pretty_formatter import PrettyFormatter
+
+DEFAULT_POOL_SIZE = 128
+
+
+class FormatterPool:
+    def __init__(self, max_size: int = DEFAULT_POOL_SIZE):
+        if max_size < 1:
+            raise ValueError(
+                f"The maximum size of a formatter pool must be positive - got `{max_size}`"
+            )
+
+        self._max_size = max_size
+        self._formatters: OrderedDict[FormatOptions, PrettyFormatter] = OrderedDict()
+        self._lock = Lock()
+
+    @property
+    def max_size(self) -> int:
+        return self._max_size
+
+    def __len__(self) -> int:
+        return len(self._formatters)
+
+    def __contains__(self, options: FormatOptions) -> bool:
+        with self._lock:
+            return options in self._formatters
+
+    def get(self, options: FormatOptions) -> PrettyFormatter:
+        try:
+            hash(options)
+        except TypeError:
+            # the options with unhashable values (e.g. a custom indentation type) cannot be pooled
+            return PrettyFormatter(options)
+
+        with self._lock:
+            formatter = self._formatters.get(options)
+            if formatter is not None:
+                self._formatters.move_to_end(options)
+                return formatter
+
+            # the formatter is created within the lock (which is cheap), so that
+            # a single formatter is shared by all threads using equal options
+            formatter = PrettyFormatter(options)
+            self._formatters[options] = formatter
+            if len(self._formatters) > self._max_size:
+                self._formatters.popitem(last=False)
+            return formatter
+
+    def clear(self) -> None:
+        with self._lock:
+            self._formatters.clear()
+
+
+_default_pool = FormatterPool()
+
+
+def get_formatter(options: FormatOptions = FormatOptions()) -> PrettyFormatter:
+    """
+    Returns a `PrettyFormatter` for the given options from a shared pool - the formatters are
+    created once for equal options and reused (with their dispatch caches) until they are evicted
+    by the least recently used pooled formatters.
+
+    The returned formatters are shared, so they must not be modified (e.g. using the `options`
+    setter or by enabling the instrumentation).
+    """
+
+    return _default_pool.get(options)
@@ -1,15 +1,18 @@
 from __future__ import annotations
 
 from collections.abc import Iterable
-from dataclasses import dataclass, field
+from dataclasses import field, replace
+from functools import lru_cache
+from typing import Any
 
-from .text_style import TextStyle, TextStyleParam
+from .dataclass_utility import frozen_dataclass
+from .text_style import TextStyle, TextStyleParam, TextStyleValue
 
 DEFAULT_INDENT_CHARACTER = " "
 DEFAULT_INDENT_WIDTH = 4
 
 
-@dataclass
+@frozen_dataclass
 class IndentMarker:
     character: str = DEFAULT_INDENT_CHARACTER
     fill: bool = True
@@ -21,7 +24,30 @@ class IndentMarker:
             )
 
 
-@dataclass
+@lru_cache(maxsize=1024)
+def _indent_string(
+    width: int,
+    character: str,
+    fill: bool,
+    style_value: TextStyleValue,
+    style_mode: TextStyle.Mode,
+    depth: int,
+    nested: bool,
+) -> str:
+    # the indentation strings are cached by the values (not the identity) of the indentation
+    # type's parameters, so that they are shared by all equal `IndentType` objects
+    if nested:
+        return _indent_string(width, character, fill, style_value, style_mode, 1, False) * depth
+
+    if fill:
+        indent = character * (width * depth)
+    else:
+        indent = f"{character}{DEFAULT_INDENT_CHARACTER * (width - 1)}" * depth
+
+    return TextStyle(style_value, style_mode).apply_to(indent)
+
+
+@frozen_dataclass
 class IndentType:
     width: int = DEFAULT_INDENT_WIDTH
     marker: IndentMarker = field(default_factory=IndentMarker)
@@ -29,25 +55,48 @@ class IndentType:
 
     def __post_init__(self):
         if not isinstance(self.style, TextStyle):
-            self.style = TextStyle.new(self.style)
+            object.__setattr__(self, "style", TextStyle.new(self.style))
+
+    def replace(self, **changes: Any) -> IndentType:
+        return replace(self, **changes)
 
     def length(self, depth: int) -> int:
         return self.width * depth
 
     def string(self, depth: int) -> str:
-        return self.style.apply_to(self.__string(depth))
+        return _indent_string(
+            self.width,
+            self.marker.character,
+            self.marker.fill,
+            self.style.value,
+            self.style.mode,
+            depth,
+            nested=False,
+        )
+
+    def nested_string(self, depth: int) -> str:
+        """
+        Returns the indentation of a line nested in `depth` indented blocks, i.e. the indentation
+        string of a single level repeated `depth` times (which is not equivalent to
+        `string(depth)` for a styled indentation type).
+        """
+
+        return _indent_string(
+            self.width,
+            self.marker.character,
+            self.marker.fill,
+            self.style.value,
+            self.style.mode,
+            depth,
+            nested=True,
+        )
 
     def add_to(self, s: str, depth: int = 1) -> str:
         return f"{self.string(depth)}{s}"
 
     def add_to_each(self, s_collection: Iterable[str], depth: int = 1) -> list[str]:
-        return [self.add_to(s, depth) for s in s_collection]
-
-    def __string(self, depth: int) -> str:
-        if self.marker.fill:
-            return self.marker.character * self.length(depth)
-
-        return f"{self.marker.character}{DEFAULT_INDENT_CHARACTER * (self.width - 1)}" * depth
+        indent = self.string(depth)
+        return [f"{indent}{s}" for s in s_collection]
 
     @staticmethod
     def new(
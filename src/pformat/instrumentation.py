@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+import threading
+from collections.abc import AsyncIterator, Iterable, Iterator
+from dataclasses import dataclass, field, replace
+from time import perf_counter
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+from .format_options import FormatOptions
+from .layout import Block, Group, LayoutRenderer, Text
+
+if TYPE_CHECKING:
+    from .pretty_formatter import DispatchPlan
+
+# the callbacks called before and after each call of a formatter or a projection
+# with the formatter/projection and the processed object (and the call's duration in seconds)
+EnterCallback = Callable[[Any, Any], None]
+ExitCallback = Callable[[Any, Any, float], None]
+
+
+@dataclass
+class CallStats:
+    n_calls: int = 0
+    # the cumulative time of the calls (in seconds) with and without the time of the nested calls
+    total_time: float = 0.0
+    self_time: float = 0.0
+
+
+@dataclass
+class FormatStats:
+    # the number of top-level formatting calls and their cumulative time (in seconds)
+    n_calls: int = 0
+    total_time: float = 0.0
+    # the number of characters emitted by the top-level formatting calls and their size in bytes
+    # (encoded in UTF-8)
+    n_emitted_chars: int = 0
+    n_emitted_bytes: int = 0
+    # the number of groups which were (not) rendered in a single line in the `compact` mode
+    n_compact_attempts: int = 0
+    n_compact_fallbacks: int = 0
+    formatters: dict[str, CallStats] = field(default_factory=dict)
+    projections: dict[str, CallStats] = field(default_factory=dict)
+
+    @property
+    def n_nodes(self) -> int:
+        return sum(stats.n_calls for stats in self.formatters.values())
+
+    def reset(self) -> None:
+        # the call stats are reset in place, as they are referenced by the dispatch plans
+        self.n_calls = self.n_emitted_chars = self.n_emitted_bytes = 0
+        self.n_compact_attempts = self.n_compact_fallbacks = 0
+        self.total_time = 0.0
+        for stats in (*self.formatters.values(), *self.projections.values()):
+            stats.n_calls = 0
+            stats.total_time = stats.self_time = 0.0
+
+    def summary(self) -> str:
+        lines = [
+            f"calls: {self.n_calls}, time: {self.total_time * 1e3:.3f} ms, "
+            f"nodes: {self.n_nodes}, emitted chars: {self.n_emitted_chars}, "
+            f"emitted bytes: {self.n_emitted_bytes}",
+            f"compact attempts: {self.n_compact_attempts}, "
+            f"compact fallbacks: {self.n_compact_fallbacks}",
+        ]
+        for kind, call_stats in (("formatter", self.formatters), ("projection", self.projections)):
+            for name, stats in sorted(call_stats.items(), key=lambda item: -item[1].self_time):
+                lines.append(
+                    f"{kind} {name}: calls: {stats.n_calls}, "
+                    f"total time: {stats.total_time * 1e3:.3f} ms, "
+                    f"self time: {stats.self_time * 1e3:.3f} ms"
+                )
+        return "\n".join(lines)
+
+
+class Instrumentation:
+    def __init__(
+        self, on_enter: Optional[EnterCallback] = None, on_exit: Optional[ExitCallback] = None
+    ):
+        self.stats = FormatStats()
+        self._on_enter = on_enter
+        self._on_exit = on_exit
+        self._lock = threading.Lock()
+        self._targets_stats: dict[int, tuple[Any, CallStats]] = dict()
+        self._local = threading.local()
+
+    def instrument_plan(
+        self, plan: DispatchPlan, build_leaf_doc: Callable[[Callable, Any, int], Text]
+    ) -> DispatchPlan:
+        formatter = plan.formatter
+        formatter_stats = self.__call_stats(self.stats.formatters, formatter)
+        projection = self.__timed_projection(plan.projection)
+
+        if plan.doc_builder is None:
+            # the leaf formatters are called through the doc builders and nested formatters - the
+            # formatter calls are timed on their own, as a leaf can be formatted again when it is
+            # rendered (see `PrettyFormatter._build_leaf_doc`)
+            timed_formatter = self.__timed(formatter, formatter, formatter_stats)
+            return replace(
+                plan,
+                projection=projection,
+                nested_formatter=lambda obj, depth, context: timed_formatter(obj, depth),
+                doc_builder=lambda obj, depth, context: build_leaf_doc(timed_formatter, obj, depth),
+            )
+
+        nested_formatter = plan.nested_formatter or (
+            lambda obj, depth, context: formatter(obj, depth)
+        )
+        return replace(
+            plan,
+            projection=projection,
+            nested_formatter=self.__timed(nested_formatter, formatter, formatter_stats),
+            doc_builder=self.__timed(plan.doc_builder, formatter, formatter_stats, builds_doc=True),
+        )
+
+    def timed_format(self, format_func: Callable[[Any, int], str], obj: Any, depth: int) -> str:
+        start = perf_counter()
+        obj_fmt = format_func(obj, depth)
+        elapsed = perf_counter() - start
+
+        with self._lock:
+            self.stats.n_calls += 1
+            self.stats.total_time += elapsed
+            self.__count_emitted(obj_fmt)
+        return obj_fmt
+
+    def counted_chunks(self, chunks: Iterator[str]) -> Iterator[str]:
+        with self._lock:
+            self.stats.n_calls += 1
+
+        for chunk in chunks:
+            with self._lock:
+                self.__count_emitted(chunk)
+            yield chunk
+
+    async def acounted_chunks(self, chunks: AsyncIterator[str]) -> AsyncIterator[str]:
+        with self._lock:
+            self.stats.n_calls += 1
+
+        async for chunk in chunks:
+            with self._lock:
+                self.__count_emitted(chunk)
+            yield chunk
+
+    def record_compact_attempt(self, fits: bool) -> None:
+        with self._lock:
+            self.stats.n_compact_attempts += 1
+            self.stats.n_compact_fallbacks += not fits
+
+    def __count_emitted(self, s: str) -> None:
+        self.stats.n_emitted_chars += len(s)
+        self.stats.n_emitted_bytes += len(s.encode("utf-8", "surrogateescape"))
+
+    def __call_stats(self, call_stats: dict[str, CallStats], target: Any) -> CallStats:
+        # the stats are collected per callable - the distinct callables with the same
+        # representation (e.g. the custom formatters of the same type) are numbered
+        with self._lock:
+            entry = self._targets_stats.get(id(target))
+            if entry is not None:
+                return entry[1]
+
+            name, n = repr(target), 1
+            while name in call_stats:
+                n += 1
+                name = f"{repr(target)} #{n}"
+
+            stats = call_stats[name] = CallStats()
+            # the targets are kept alive, so that their ids are not reused
+            self._targets_stats[id(target)] = (target, stats)
+            return stats
+
+    def __timed_projection(self, projection: Optional[Callable]) -> Optional[Callable]:
+        if projection is None:
+            return None
+
+        projection_stats = self.__call_stats(self.stats.projections, projection)
+        return self.__timed(projection, projection, projection_stats)
+
+    def __timed(
+        self, func: Callable, target: Any, stats: CallStats, builds_doc: bool = False
+    ) -> Callable:
+        def timed_func(obj: Any, *args) -> Any:
+            call = _TimedCall(target, obj, stats, self.__active_frames())
+            if self._on_enter is not None:
+                self._on_enter(target, obj)
+
+            result = self.__run(call, func, obj, *args)
+            with self._lock:
+                stats.n_calls += 1
+
+            # the items of the groups and the lines of the blocks built by the document engine are
+            # produced lazily (while the output is rendered) - the call lasts until they are consumed
+            if builds_doc and isinstance(result, Group):
+                return Group(result.opening, result.closing, self.__timed_items(call, result.items))
+            if builds_doc and isinstance(result, Block):
+                return Block(result.opening, result.closing, self.__timed_items(call, result.lines))
+
+            self.__exit(call)
+            return result
+
+        return timed_func
+
+    def __timed_items(self, call: _TimedCall, items: Iterable) -> Iterator:
+        items = iter(items)
+        while True:
+            item = self.__run(call, next, items, _END)
+            if item is _END:
+                break
+            yield item
+
+        self.__exit(call)
+
+    def __run(self, call: _TimedCall, func: Callable, *args) -> Any:
+        # runs a part of a call - the nested calls are subtracted from the self time of the call
+        frames = self.__active_frames()
+        frame = [call, 0.0]
+        frames.append(frame)
+        start = perf_counter()
+        try:
+            return func(*args)
+        finally:
+            elapsed = perf_counter() - start
+            frames.pop()
+            if frames:
+                frames[-1][1] += elapsed
+
+            # the time of the lazily consumed items is also added to the enclosing calls which
+            # are not running at the moment (the running calls include it in their own time)
+            active_calls = [active_call for active_call, _ in frames]
+            enclosing_calls = list()
+            parent = call.parent
+            while parent is not None and not any(parent is c for c in active_calls):
+                enclosing_calls.append(parent)
+                parent = parent.parent
+
+            with self._lock:
+                call.elapsed += elapsed
+                call.stats.total_time += elapsed
+                call.stats.self_time += elapsed - frame[1]
+                for enclosing_call in enclosing_calls:
+                    enclosing_call.elapsed += elapsed
+                    enclosing_call.stats.total_time += elapsed
+
+    def __exit(self, call: _TimedCall) -> None:
+        if self._on_exit is not None:
+            self._on_exit(call.target, call.obj, call.elapsed)
+
+    def __active_frames(self) -> list[list]:
+        # the `[call, nested time]` frames of the currently running calls (per thread)
+        frames = getattr(self._local, "frames", None)
+        if frames is None:
+            frames = self._local.frames = list()
+        return frames
+
+
+_END = object()
+
+
+class _TimedCall:
+    __slots__ = ("target", "obj", "stats", "parent", "elapsed")
+
+    def __init__(self, target: Any, obj: Any, stats: CallStats, frames: list[list]):
+        self.target = target
+        self.obj = obj
+        self.stats = stats
+        # the call which was running when this call started (e.g. the formatter of the enclosing
+        # collection) - it may finish later, when its remaining items are consumed
+        self.parent = frames[-1][0] if frames else None
+        self.elapsed = 0.0
+
+
+class InstrumentedLayoutRenderer(LayoutRenderer):
+    def __init__(self, options: FormatOptions, instrumentation: Instrumentation):
+        super().__init__(options)
+        self._instrumentation = instrumentation
+
+    def fits(self, group: Group, depth: int = 0) -> bool:
+        fits = super().fits(group, depth)
+        if self._options.compact:
+            self._instrumentation.record_compact_attempt(fits)
+        return fits
@@ -0,0 +1,386 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from enum import Enum
+from typing import TYPE_CHECKING, Callable, Optional, Union
+
+from .text_style import strlen_no_style
+
+if TYPE_CHECKING:
+    from .format_options import FormatOptions
+
+
+class LayoutEngine(Enum):
+    recursive = "recursive"
+    document = "document"
+
+
+ITEM_SEPARATOR = ", "
+ITEM_TERMINATOR = ","
+KEY_SEPARATOR = ": "
+LINE_SEPARATOR = "\n"
+ELLIPSIS = "..."
+
+DEFAULT_CHUNK_SIZE = 8192
+# the number of lines after which the async formatting yields the control back to the event loop
+DEFAULT_YIELD_EVERY = 100
+UNBOUNDED = float("inf")
+
+
+@dataclass
+class Text:
+    value: str
+    width: int
+    # produces the value of a leaf which is not rendered within a single-line group - only set
+    # for the leaves whose value depends on the formatting depth (see `PrettyFormatter`)
+    format_broken: Optional[Callable[[], str]] = None
+
+    @staticmethod
+    def new(value: str, format_broken: Optional[Callable[[], str]] = None) -> Text:
+        return Text(value, strlen_no_style(value), format_broken)
+
+    def broken_value(self) -> str:
+        return self.value if self.format_broken is None else self.format_broken()
+
+    def measure(self, budget: float = UNBOUNDED) -> int:
+        return self.width
+
+
+@dataclass
+class Entry:
+    key: Doc
+    value: Doc
+
+    @property
+    def width(self) -> int:
+        return self.measure()
+
+    def measure(self, budget: float = UNBOUNDED) -> int:
+        return _measure(self, budget)
+
+
+class Group:
+    def __init__(self, opening: str, closing: str, items: Iterable[Union[Doc, Entry]]):
+        self.opening = opening
+        self.closing = closing
+
+        # the items are produced lazily and memoized only when they are measured
+        self._measured_items: list[Union[Doc, Entry]] = list()
+        self._pending_items = iter(items)
+        self._parens_width = strlen_no_style(opening) + strlen_no_style(closing)
+        self._width: Optional[int] = None
+        self._min_width = self._parens_width
+
+    @property
+    def items(self) -> Iterator[Union[Doc, Entry]]:
+        yield from self._measured_items
+        yield from self._pending_items
+
+    @property
+    def width(self) -> int:
+        return self.measure()
+
+    def measure(self, budget: float = UNBOUNDED) -> int:
+        """
+        Returns the width of the group's single-line representation if it does not exceed the
+        budget. Otherwise returns a lower bound of the width which exceeds the budget - the
+        measurement stops as soon as the budget is exceeded.
+        """
+
+        if self._width is not None:
+            return self._width
+        if self._min_width > budget:
+            return self._min_width
+        return _measure(self, budget)
+
+    def _iter_measured_items(self) -> Iterator[Union[Doc, Entry]]:
+        yield from self._measured_items
+        for item in self._pending_items:
+            self._measured_items.append(item)
+            yield item
+
+
+class Block:
+    def __init__(self, opening: str, closing: str, lines: Iterable[str]):
+        # a block of preformatted lines which are produced lazily and never rendered in a single line
+        self.opening = opening
+        self.closing = closing
+        self.lines = lines
+
+    def measure(self, budget: float = UNBOUNDED) -> float:
+        return UNBOUNDED
+
+
+Doc = Union[Text, Group, Block]
+
+
+def _measure(doc: Union[Group, Entry], budget: float) -> int:
+    # the nested documents are measured using an explicit stack of frames instead of recursion,
+    # so the measured nesting depth is not limited by the interpreter's recursion limit
+    frames = [_MeasurementFrame(doc, budget)]
+    nested_width = 0
+    while True:
+        frame = frames[-1]
+        width, budget = frame.width + nested_width, frame.budget
+        separator_width, item_separator_width = frame.separator_width, frame.item_separator_width
+
+        nested_doc = None
+        if width <= budget:
+            for item in frame.items:
+                width += separator_width
+                separator_width = item_separator_width
+                if width > budget:
+                    break
+
+                if isinstance(item, Entry) and isinstance(item.key, Text):
+                    # an entry with a leaf key is measured in place up to its value
+                    width += item.key.width + len(KEY_SEPARATOR)
+                    if width > budget:
+                        break
+                    item = item.value
+
+                if isinstance(item, Text):
+                    width += item.width
+                elif isinstance(item, Entry) or (
+                    isinstance(item, Group)
+                    and item._width is None
+                    and item._min_width <= budget - width
+                ):
+                    nested_doc = item
+                    break
+                else:
+                    width += item.measure(budget - width)
+
+                if width > budget:
+                    break
+
+        if nested_doc is not None:
+            frame.width, frame.separator_width = width, separator_width
+            frames.append(_MeasurementFrame(nested_doc, budget - width))
+            nested_width = 0
+            continue
+
+        frames.pop()
+        if isinstance(frame.doc, Group):
+            if width > budget:
+                frame.doc._min_width = width
+            else:
+                frame.doc._width = width
+
+        if not frames:
+            return width
+        nested_width = width
+
+
+class _MeasurementFrame:
+    __slots__ = ("doc", "items", "width", "budget", "separator_width", "item_separator_width")
+
+    def __init__(self, doc: Union[Group, Entry], budget: float):
+        self.doc = doc
+        self.budget = budget
+        self.separator_width = 0
+
+        if isinstance(doc, Group):
+            self.items = doc._iter_measured_items()
+            self.width = doc._parens_width
+            self.item_separator_width = len(ITEM_SEPARATOR)
+        else:
+            self.items = iter((doc.key, doc.value))
+            self.width = 0
+            self.item_separator_width = len(KEY_SEPARATOR)
+
+
+class _FlatRenderFrame:
+    __slots__ = ("items", "separator", "item_separator", "closing", "styled_from")
+
+    def __init__(self, doc: Union[Group, Entry], parts: list[str], style_groups: bool):
+        self.separator = ""
+        if isinstance(doc, Group):
+            # the position of the group's opening within the rendered parts (if it is styled)
+            self.styled_from = len(parts) if style_groups else None
+            parts.append(doc.opening)
+
+            self.items = doc.items
+            self.item_separator = ITEM_SEPARATOR
+            self.closing = doc.closing
+        else:
+            self.styled_from = None
+            self.items = iter((doc.key, doc.value))
+            self.item_separator = KEY_SEPARATOR
+            self.closing = ""
+
+
+class LayoutRenderer:
+    def __init__(self, options: FormatOptions):
+        self._options = options
+
+    def render(self, doc: Doc, depth: int = 0) -> str:
+        return LINE_SEPARATOR.join(self.iter_lines(doc, depth))
+
+    def iter_lines(self, doc: Doc, depth: int = 0) -> Iterator[str]:
+        for level, line in self._iter_leveled_lines(doc, 0, depth):
+            yield self._emit_line(level, line)
+
+    def iter_chunks(
+        self, doc: Doc, depth: int = 0, chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> Iterator[str]:
+        lines = self.iter_lines(doc, depth)
+
+        chunk = [next(lines)]
+        chunk_len = len(chunk[0])
+        for line in lines:
+            if chunk_len >= chunk_size:
+                yield "".join(chunk)
+                chunk.clear()
+                chunk_len = 0
+
+            chunk.append(LINE_SEPARATOR)
+            chunk.append(line)
+            chunk_len += len(line) + len(LINE_SEPARATOR)
+
+        yield "".join(chunk)
+
+    def fits(self, group: Group, depth: int = 0) -> bool:
+        if not self._options.compact:
+            return False
+
+        budget = self._options.width - self._options.indent_type.length(depth)
+        return group.measure(budget) <= budget
+
+    def render_flat(self, doc: Union[Doc, Entry]) -> str:
+        if isinstance(doc, Text):
+            return doc.value
+
+        # the nested documents are rendered using an explicit stack of frames instead of recursion
+        style_groups = self._options.style_entire_text
+        parts = list()
+        frames = [_FlatRenderFrame(doc, parts, style_groups)]
+        while frames:
+            frame = frames[-1]
+            separator, item_separator = frame.separator, frame.item_separator
+
+            nested_doc = None
+            for item in frame.items:
+                parts.append(separator)
+                separator = item_separator
+
+                if isinstance(item, Entry) and isinstance(item.key, Text):
+                    parts += (item.key.value, KEY_SEPARATOR)
+                    item = item.value
+
+                if isinstance(item, Text):
+                    parts.append(item.value)
+                else:
+                    nested_doc = item
+                    break
+
+            if nested_doc is not None:
+                frame.separator = separator
+                frames.append(_FlatRenderFrame(nested_doc, parts, style_groups))
+                continue
+
+            frames.pop()
+            parts.append(frame.closing)
+            if frame.styled_from is not None:
+                group_str = "".join(parts[frame.styled_from :])
+                del parts[frame.styled_from :]
+                parts.append(self._options.text_style.apply_to(group_str))
+
+        return "".join(parts)
+
+    def render_broken(
+        self,
+        group: Group,
+        depth: int = 0,
+        map_func: Callable[[Callable[[Union[Doc, Entry]], str], Iterable], Iterable[str]] = map,
+    ) -> str:
+        # renders a group in the multiline layout - the items are rendered independently of each
+        # other with the `map_func` function, which does not have to call the renderer in order
+        opening_line, closing_line = self.broken_parens(group)
+        items = map_func(
+            lambda item: LINE_SEPARATOR.join(self.iter_item_lines(item, depth)), group.items
+        )
+        return LINE_SEPARATOR.join((opening_line, *items, closing_line))
+
+    def broken_parens(self, group: Group) -> tuple[str, str]:
+        # the opening and closing lines of a top-level group rendered in the multiline layout
+        return (
+            self._emit_line(0, self._style(group.opening)),
+            self._emit_line(0, self._style(group.closing)),
+        )
+
+    def iter_item_lines(self, item: Union[Doc, Entry], depth: int = 0) -> Iterator[str]:
+        # yields the lines of an item of a top-level group rendered in the multiline layout
+        doc, prefix = self._item_doc(item)
+        for level, line in self._iter_leveled_lines(doc, 1, depth, prefix, ITEM_TERMINATOR):
+            yield self._emit_line(level, line)
+
+    def _item_doc(self, item: Union[Doc, Entry]) -> tuple[Doc, str]:
+        if isinstance(item, Entry):
+            # a multiline key is embedded in the first line of the entry (like in the recursive engine)
+            return item.value, f"{self.render(item.key)}{KEY_SEPARATOR}"
+        return item, ""
+
+    def _iter_leveled_lines(
+        self, doc: Doc, level: int, depth: int, prefix: str = "", suffix: str = ""
+    ) -> Iterator[tuple[int, str]]:
+        # yields the lines of a document with their absolute nesting levels - the open groups are
+        # kept on an explicit stack so that each line is produced once, regardless of its depth
+        open_groups = list()
+
+        while True:
+            if isinstance(doc, Block):
+                yield level, f"{prefix}{self._style(doc.opening)}"
+                for line in doc.lines:
+                    yield level + 1, line
+                yield level, f"{self._style(doc.closing)}{suffix}"
+            elif isinstance(doc, Group) and not self.fits(doc, depth):
+                yield level, f"{prefix}{self._style(doc.opening)}"
+                open_groups.append((iter(doc.items), level, doc.closing, suffix))
+            else:
+                lines = (
+                    doc.broken_value() if isinstance(doc, Text) else self.render_flat(doc)
+                ).split(LINE_SEPARATOR)
+                lines[0] = f"{prefix}{lines[0]}"
+                lines[-1] = f"{lines[-1]}{suffix}"
+                for line in lines:
+                    yield level, line
+
+            while open_groups:
+                items, group_level, closing, group_suffix = open_groups[-1]
+                item = next(items, None)
+                if item is not None:
+                    break
+
+                open_groups.pop()
+                yield group_level, f"{self._style(closing)}{group_suffix}"
+            else:
+                return
+
+            level, suffix = group_level + 1, ITEM_TERMINATOR
+            doc, prefix = self._item_doc(item)
+
+    def _style(self, s: str) -> str:
+        if self._options.style_entire_text:
+            return self._options.text_style.apply_to(s)
+        return s
+
+    def _emit_line(self, level: int, line: str) -> str:
+        if LINE_SEPARATOR in line:
+            # an entry with an embedded multiline key: the indentation (and style) of the entry's
+            # own level is applied to the whole entry and the outer levels are applied to each line
+            return LINE_SEPARATOR.join(
+                self._emit_line(level - 1, entry_line)
+                for entry_line in self._indent_line(line, 1).split(LINE_SEPARATOR)
+            )
+
+        return self._indent_line(line, level)
+
+    def _indent_line(self, line: str, level: int) -> str:
+        if not self._options.style_entire_text:
+            return f"{self._options.indent_type.nested_string(level)}{line}"
+
+        return self._options.text_style.apply_to_nested(
+            line, self._options.indent_type.string(1), level
+        )
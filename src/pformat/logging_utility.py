@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import logging
+from collections.abc import Mapping
+from copy import copy
+from functools import lru_cache
+from logging.handlers import QueueListener
+from queue import Full, Queue
+from typing import Any, Optional
+
+from .pretty_formatter import PrettyFormatter
+
+# the types of the log record arguments which are not pretty-formatted, so that they can be
+# used with the numeric conversion specifiers (e.g. `%d`) of the log messages
+_PLAIN_ARG_TYPES = (str, bytes, int, float, complex, type(None))
+
+
+@lru_cache(maxsize=None)
+def _default_formatter() -> PrettyFormatter:
+    return PrettyFormatter()
+
+
+class LazyFormat:
+    def __init__(self, obj: Any, formatter: Optional[PrettyFormatter] = None, depth: int = 0):
+        self.obj = obj
+        self.formatter = formatter
+        self.depth = depth
+        self._formatted: Optional[str] = None
+
+    def __str__(self) -> str:
+        if self._formatted is None:
+            formatter = self.formatter or _default_formatter()
+            self._formatted = formatter(self.obj, self.depth)
+        return self._formatted
+
+    def __repr__(self) -> str:
+        return str(self)
+
+    def __format__(self, format_spec: str) -> str:
+        return format(str(self), format_spec)
+
+
+def lazy(obj: Any, formatter: Optional[PrettyFormatter] = None, depth: int = 0) -> LazyFormat:
+    """
+    Returns a wrapper of the object which is formatted only when it is converted to a string,
+    e.g. `logger.debug("data: %s", pf.lazy(data))` formats the data only if the record is emitted.
+    """
+
+    return LazyFormat(obj, formatter, depth)
+
+
+class _MappingArgs(dict):
+    # the mapping arguments of a log record, which can be referenced either by the keys
+    # (e.g. `%(key)s`) or as a whole (e.g. `logger.info("%s", mapping)`)
+    def __init__(self, args: Mapping, formatter: PrettyFormatter):
+        super().__init__({key: _lazy_arg(arg, formatter) for key, arg in args.items()})
+        self.__formatted = LazyFormat(args, formatter)
+
+    def __str__(self) -> str:
+        return str(self.__formatted)
+
+    def __repr__(self) -> str:
+        return str(self.__formatted)
+
+
+def _lazy_arg(arg: Any, formatter: PrettyFormatter) -> Any:
+    if isinstance(arg, (_PLAIN_ARG_TYPES, LazyFormat)):
+        return arg
+    return LazyFormat(arg, formatter)
+
+
+class PrettyLogFormatter(logging.Formatter):
+    def __init__(self, *args, formatter: Optional[PrettyFormatter] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pretty_formatter = formatter or _default_formatter()
+
+    def format(self, record: logging.LogRecord) -> str:
+        if record.args:
+            # the record is copied, as it can be shared by multiple handlers
+            record = copy(record)
+            if isinstance(record.args, Mapping):
+                record.args = _MappingArgs(record.args, self.pretty_formatter)
+            else:
+                record.args = tuple(_lazy_arg(arg, self.pretty_formatter) for arg in record.args)
+
+        return super().format(record)
+
+
+class _DrainingQueueListener(QueueListener):
+    def enqueue_sentinel(self) -> None:
+        # the sentinel is put after the queued records (the default non-blocking put raises
+        # `queue.Full` if a bounded queue is full), so the listener handles them before stopping
+        self.queue.put(self._sentinel)
+
+
+class BackgroundFormattingHandler(logging.Handler):
+    """
+    Passes the log records to the target handlers in a background thread, so that the records
+    are formatted (e.g. with the `PrettyLogFormatter`) outside of the logging thread.
+    The logged objects must not be modified after logging, as they are formatted asynchronously.
+    """
+
+    def __init__(
+        self, *handlers: logging.Handler, level: int = logging.NOTSET, queue_size: int = 0
+    ):
+        super().__init__(level)
+
+        self._queue = Queue(queue_size)
+        self._listener = _DrainingQueueListener(self._queue, *handlers, respect_handler_level=True)
+        self._listener.start()
+        self._listener_running = True
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self._queue.put_nowait(record)
+        except Full:
+            self.handleError(record)
+
+    def flush(self) -> None:
+        # waits until all queued records are handled by the target handlers
+        self._queue.join()
+        for handler in self._listener.handlers:
+            handler.flush()
+
+    def close(self) -> None:
+        # the listener's thread can be stopped only once, while the handler can be closed repeatedly
+        if self._listener_running:
+            self._listener_running = False
+            self._listener.stop()
+        super().close()
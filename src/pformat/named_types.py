@@ -1,9 +1,10 @@
 from collections.abc import Iterable, Mapping
-from dataclasses import dataclass
 from typing import Any, Iterator, Optional, Tuple
 
+from .dataclass_utility import frozen_dataclass
 
-@dataclass
+
+@frozen_dataclass
 class NamedIterable(Iterable):
     name: str
     iterable: Iterable
@@ -16,7 +17,7 @@ class NamedIterable(Iterable):
         return self.parens or (f"{self.name}([", "])")
 
 
-@dataclass
+@frozen_dataclass
 class NamedMapping(Mapping):
     name: str
     mapping: Mapping
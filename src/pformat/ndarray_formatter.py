@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+from typing import Any, Callable
+
+from .layout import ELLIPSIS, Doc, Group, Text
+from .pretty_formatter import (
+    ROOT_CONTEXT,
+    FormatContext,
+    PrettyFormatter,
+    _is_elided,
+    _more_items_marker,
+)
+from .type_formatter import TypeFormatter
+
+# the representation of the masked elements of `numpy.ma.MaskedArray` objects (as in numpy)
+MASKED_VALUE = "--"
+
+
+class NDArrayFormatter(TypeFormatter):
+    # the kinds of dtypes which are converted to strings in a vectorized way:
+    # bool, signed/unsigned integer, floating-point and complex numbers
+    _VECTORIZED_KINDS = frozenset("biufc")
+
+    def __init__(self, base_formatter: PrettyFormatter, ndarray_t: type):
+        super().__init__(ndarray_t)
+
+        self._base_formatter = base_formatter
+        self._options = self._base_formatter._options
+
+    def __call__(self, array: Any, depth: int = 0) -> str:
+        return self._format_nested(array, depth)
+
+    def _format_nested(
+        self, array: Any, depth: int = 0, context: FormatContext = ROOT_CONTEXT
+    ) -> str:
+        return self._base_formatter._renderer.render(self._build_doc(array, depth, context), depth)
+
+    def _build_doc(self, array: Any, depth: int = 0, context: FormatContext = ROOT_CONTEXT) -> Doc:
+        self._validate_type(array, self._options.exact_type_matching)
+
+        # the subclasses (e.g. `matrix` or `MaskedArray`) are formatted as views of plain arrays
+        # with the masked elements (if any) displayed as the `MASKED_VALUE` string
+        data = array.view(self.type)
+        mask = _get_mask(array)
+
+        opening, closing = f"{type(array).__name__}(", ")"
+        if data.ndim == 0:
+            if mask is not None:
+                item_doc = self.__masked_value_doc()
+            else:
+                item_doc = self._base_formatter._build_doc(data.item(), depth, context)
+            if isinstance(item_doc, Text):
+                return Text(
+                    f"{opening}{item_doc.value}{closing}",
+                    len(opening) + item_doc.width + len(closing),
+                )
+            return Group(opening, closing, [item_doc])
+
+        opening, closing = f"{opening}[", f"]{closing}"
+        if _is_elided(array, context, self._options.max_depth):
+            return Text.new(f"{opening}{ELLIPSIS}{closing}")
+
+        max_items = self._options.max_items
+        # a view of the array limited along each axis - the elided elements are never converted
+        array_view, mask_view = data, mask
+        if max_items is not None:
+            limited_slices = (slice(max_items),) * data.ndim
+            array_view = data[limited_slices]
+            mask_view = None if mask is None else mask[limited_slices]
+
+        if data.dtype.kind in NDArrayFormatter._VECTORIZED_KINDS:
+            text_style = self._options.text_style
+
+            def build_items(row: Any) -> list[Doc]:
+                return [Text(*text_style.apply_to_with_width(s)) for s in row.tolist()]
+
+            array_view = array_view.astype(str)
+        else:
+            items_context = context
+            for _ in range(data.ndim):
+                items_context = items_context.nested(array)
+
+            def build_items(row: Any) -> list[Doc]:
+                return [
+                    self._base_formatter._build_doc(item, depth, items_context)
+                    for item in row.tolist()
+                ]
+
+        return self.__build_group(
+            data.shape, array_view, mask_view, opening, closing, context.level, build_items
+        )
+
+    def __build_group(
+        self,
+        shape: tuple[int, ...],
+        array_view: Any,
+        mask_view: Any,
+        opening: str,
+        closing: str,
+        level: int,
+        build_items: Callable[[Any], list[Doc]],
+    ) -> Doc:
+        max_depth = self._options.max_depth
+        if max_depth is not None and level >= max_depth and shape[0] > 0:
+            return Text.new(f"{opening}{ELLIPSIS}{closing}")
+
+        if len(shape) == 1:
+            items = build_items(array_view)
+            if mask_view is not None:
+                items = [
+                    self.__masked_value_doc() if masked else item
+                    for item, masked in zip(items, mask_view.tolist())
+                ]
+        else:
+            mask_rows = [None] * len(array_view) if mask_view is None else mask_view
+            items = [
+                self.__build_group(shape[1:], row, mask_row, "[", "]", level + 1, build_items)
+                for row, mask_row in zip(array_view, mask_rows)
+            ]
+
+        if len(items) < shape[0]:
+            items.append(Text.new(_more_items_marker(shape[0] - len(items))))
+        return Group(opening, closing, items)
+
+    def __masked_value_doc(self) -> Text:
+        return Text(*self._options.text_style.apply_to_with_width(MASKED_VALUE))
+
+
+def _get_mask(array: Any) -> Any:
+    # returns the mask of a `numpy.ma.MaskedArray` or `None` if no element is masked
+    mask = getattr(array, "mask", None)
+    if mask is None or not mask.any():
+        return None
+    return mask
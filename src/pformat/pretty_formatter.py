@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import sys
 from collections import (
     ChainMap,
     Counter,
@@ -10,18 +11,47 @@ from collections import (
     defaultdict,
     deque,
 )
-from collections.abc import Iterable, Mapping
-from copy import deepcopy
+from collections.abc import AsyncIterator, Iterable, Iterator, Mapping, Sized
 from dataclasses import dataclass
-from functools import cmp_to_key
-from types import MappingProxyType
-from typing import Any, MutableSequence, Optional, Union
-
+from functools import lru_cache
+from io import BufferedIOBase, RawIOBase
+from itertools import chain, islice
+from operator import methodcaller
+from types import FunctionType, MappingProxyType, ModuleType
+from typing import IO, TYPE_CHECKING, Any, Callable, Optional, Sequence, TypeVar, Union
+
+from .batch_formatting import DEFAULT_BATCH_SIZE, iter_batches
 from .format_options import FormatOptions
+from .layout import (
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_YIELD_EVERY,
+    ELLIPSIS,
+    ITEM_SEPARATOR,
+    Doc,
+    Entry,
+    Group,
+    LayoutEngine,
+    LayoutRenderer,
+    Text,
+)
 from .named_types import NamedIterable, NamedMapping
-from .text_style import TextStyle, TextStyleParam, strlen_no_style
+from .text_style import (
+    StyleCoalescer,
+    TextStyle,
+    TextStyleParam,
+    coalesce_style_modifiers,
+    strlen_no_style,
+)
 from .type_formatter import TypeFormatter
 from .type_projection import TypeProjection
+from .type_specific_callable import TypeSpecifcCallable
+from .typing_utility import Ordering, is_subclass, type_cmp
+
+if TYPE_CHECKING:
+    from .instrumentation import EnterCallback, ExitCallback, FormatStats, Instrumentation
+
+T = TypeVar("T")
+_NO_ITEM = object()
 
 
 @dataclass(frozen=True)
@@ -30,14 +60,208 @@ class PFMagicMethod:
     FORMAT: str = "__pf_format__"
 
 
+_MAGIC_METHOD_NAMES = (PFMagicMethod.PROJECT, PFMagicMethod.FORMAT)
+_project_with_magic_method = methodcaller(PFMagicMethod.PROJECT)
+
+
+@dataclass(frozen=True)
+class DispatchPlan:
+    formattable: bool
+    projection: Optional[Callable[[Any], Any]]
+    formatter: TypeFormatter
+    nested_formatter: Optional[Callable[[Any, int, FormatContext], str]]
+    doc_builder: Optional[Callable[[Any, int, FormatContext], Doc]]
+    # whether the plan was resolved with the `has_valid_type` checks of the formatted object
+    instance_dependent: bool = False
+
+
+class ReferenceAnchors:
+    def __init__(self, shared_objects: dict[int, Any], projections: dict[int, tuple]):
+        # the shared objects (and the sources of the projected objects) are kept by reference
+        # so that their ids remain unique
+        self._shared_objects = shared_objects
+        self._projections = projections
+        self._labels: dict[int, int] = dict()
+
+    def project(self, obj: Any, projection: Callable[[Any], Any]) -> Any:
+        # the objects projected while searching for the shared references are not projected again
+        entry = self._projections.get(id(obj))
+        return projection(obj) if entry is None else entry[1]
+
+    def get(self, obj: Any) -> Optional[str]:
+        """
+        Returns the anchor (`&n`) for the first occurrence of a shared object, the alias (`*n`)
+        for its subsequent occurrences and `None` for objects which are not shared.
+        """
+
+        obj_id = id(obj)
+        if obj_id not in self._shared_objects:
+            return None
+
+        label = self._labels.get(obj_id)
+        if label is not None:
+            return f"*{label}"
+
+        label = self._labels[obj_id] = len(self._labels) + 1
+        return f"&{label}"
+
+
+@dataclass(frozen=True)
+class FormatContext:
+    level: int = 0
+    # the (unprojected) collections enclosing the formatted object - a linked list of
+    # `(collection, outer ancestors)` pairs, so that nesting a context does not copy the ancestors
+    ancestors: Optional[tuple] = None
+    anchors: Optional[ReferenceAnchors] = None
+    # the unprojected source of the formatted object
+    source: Any = _NO_ITEM
+    # the ids of all collections nested so far (a superset of the ancestors' ids)
+    nested_ids: Optional[set[int]] = None
+
+    def projected_from(self, source: Any) -> FormatContext:
+        return FormatContext(self.level, self.ancestors, self.anchors, source, self.nested_ids)
+
+    def nested(self, collection: Iterable) -> FormatContext:
+        source = self.__source(collection)
+        nested_ids = set() if self.nested_ids is None else self.nested_ids
+        nested_ids.add(id(source))
+        return FormatContext(
+            self.level + 1, (source, self.ancestors), self.anchors, nested_ids=nested_ids
+        )
+
+    def is_recursive(self, collection: Iterable) -> bool:
+        source = self.__source(collection)
+        if self.nested_ids is None or id(source) not in self.nested_ids:
+            # a collection which has not been nested so far cannot be its own ancestor
+            return False
+
+        ancestors = self.ancestors
+        while ancestors is not None:
+            ancestor, ancestors = ancestors
+            if ancestor is source:
+                return True
+        return False
+
+    def __source(self, obj: Any) -> Any:
+        return obj if self.source is _NO_ITEM else self.source
+
+
+ROOT_CONTEXT = FormatContext()
+
+
+def _has_dynamic_attributes(t: type) -> bool:
+    return (
+        hasattr(t, "__getattr__")
+        or isinstance(t.__getattribute__, FunctionType)
+        or issubclass(t, (type, ModuleType))
+        or any(_is_dynamic_class_attribute(t, name) for name in _MAGIC_METHOD_NAMES)
+    )
+
+
+def _is_dynamic_class_attribute(t: type, name: str) -> bool:
+    # the descriptors other than methods (e.g. properties) may not be available for all instances
+    for base in t.__mro__:
+        if name in base.__dict__:
+            return not isinstance(base.__dict__[name], (FunctionType, staticmethod, classmethod))
+    return False
+
+
+def _has_instance_magic_methods(obj: Any) -> bool:
+    # the magic methods can also be assigned to the instances of the types with `__dict__`
+    obj_dict = getattr(obj, "__dict__", None)
+    return obj_dict is not None and any(name in obj_dict for name in _MAGIC_METHOD_NAMES)
+
+
+def _join_within_width(
+    opening: str, closing: str, items: Iterable[str], budget: int
+) -> Optional[str]:
+    # the items are consumed (formatted) only until the budget is exceeded
+    width = strlen_no_style(opening) + strlen_no_style(closing)
+    if width > budget:
+        return None
+
+    parts = list()
+    for item in items:
+        width += strlen_no_style(item) + (len(ITEM_SEPARATOR) if parts else 0)
+        if width > budget:
+            return None
+        parts.append(item)
+
+    return opening + ITEM_SEPARATOR.join(parts) + closing
+
+
+def _n_items(collection: Iterable) -> Optional[int]:
+    return len(collection) if isinstance(collection, Sized) else None
+
+
+def _is_elided(collection: Iterable, context: FormatContext, max_depth: Optional[int]) -> bool:
+    if context.is_recursive(collection):
+        return True
+
+    # the empty collections are not elided as they have no content to hide
+    return max_depth is not None and context.level >= max_depth and _n_items(collection) != 0
+
+
+def _anchored(doc: Doc, anchor: str) -> Doc:
+    if isinstance(doc, Text):
+        return Text(f"{anchor} {doc.value}", len(anchor) + 1 + doc.width)
+    return Group(f"{anchor} {doc.opening}", doc.closing, doc.items)
+
+
+def _more_items_marker(n_more: Optional[int]) -> str:
+    if n_more is None:
+        return ELLIPSIS
+    return f"{ELLIPSIS} {n_more} more item{'s' if n_more > 1 else ''}"
+
+
+def _iter_limited(
+    items: Iterable[T],
+    n_items: Optional[int],
+    max_items: Optional[int],
+    marker_func: Callable[[str], T],
+) -> Iterator[T]:
+    # yields at most `max_items` items and a marker of the elided items (if any) - the items
+    # are consumed lazily, so the cost does not depend on the size of the input collection
+    if max_items is None:
+        yield from items
+        return
+
+    items = iter(items)
+    yield from islice(items, max_items)
+
+    if n_items is not None:
+        if n_items > max_items:
+            yield marker_func(_more_items_marker(n_items - max_items))
+    elif next(items, _NO_ITEM) is not _NO_ITEM:
+        yield marker_func(_more_items_marker(None))
+
+
+# the number of top-level items rendered by a single task with the `parallel_threads` option
+PARALLEL_BATCH_SIZE = 16
+
+
 class PrettyFormatter:
     def __init__(
         self,
         options: FormatOptions = FormatOptions(),
     ):
         self._options: FormatOptions = options
+        self._instrumentation: Optional[Instrumentation] = None
         self.__setup_formatters()
 
+    @property
+    def options(self) -> FormatOptions:
+        return self._options
+
+    @options.setter
+    def options(self, options: FormatOptions):
+        self._options = options
+        self.__setup_formatters()
+
+    def __reduce__(self):
+        # only the options are pickled - the formatters and caches are recreated when unpickled
+        return PrettyFormatter, (self._options,)
+
     @staticmethod
     def new(
         compact: bool = FormatOptions.default("compact"),
@@ -47,7 +271,15 @@ class PrettyFormatter:
         style_entire_text: bool = FormatOptions.default("style_entire_text"),
         exact_type_matching: bool = FormatOptions.default("exact_type_matching"),
         projections: Optional[Iterable[TypeProjection]] = FormatOptions.default("projections"),
-        formatters: Optional[MutableSequence[TypeFormatter]] = FormatOptions.default("formatters"),
+        formatters: Optional[Sequence[TypeFormatter]] = FormatOptions.default("formatters"),
+        layout_engine: LayoutEngine = FormatOptions.default("layout_engine"),
+        coalesce_styles: bool = FormatOptions.default("coalesce_styles"),
+        max_depth: Optional[int] = FormatOptions.default("max_depth"),
+        max_items: Optional[int] = FormatOptions.default("max_items"),
+        max_string_length: Optional[int] = FormatOptions.default("max_string_length"),
+        anchor_shared_references: bool = FormatOptions.default("anchor_shared_references"),
+        hexdump_buffers: bool = FormatOptions.default("hexdump_buffers"),
+        parallel_threads: Optional[int] = FormatOptions.default("parallel_threads"),
     ) -> PrettyFormatter:
         return PrettyFormatter(
             options=FormatOptions(
@@ -59,88 +291,486 @@ class PrettyFormatter:
                 exact_type_matching=exact_type_matching,
                 projections=projections,
                 formatters=formatters,
+                layout_engine=layout_engine,
+                coalesce_styles=coalesce_styles,
+                max_depth=max_depth,
+                max_items=max_items,
+                max_string_length=max_string_length,
+                anchor_shared_references=anchor_shared_references,
+                hexdump_buffers=hexdump_buffers,
+                parallel_threads=parallel_threads,
             )
         )
 
     def __call__(self, obj: Any, depth: int = 0) -> str:
-        return self._format_impl(obj, depth)
+        if self._instrumentation is not None:
+            return self._instrumentation.timed_format(self.__format, obj, depth)
+        return self.__format(obj, depth)
+
+    def __format(self, obj: Any, depth: int) -> str:
+        if self._options.layout_engine is LayoutEngine.recursive:
+            obj_fmt = self._format_impl(obj, depth)
+        else:
+            doc = self._build_doc(obj, depth, self._root_context(obj))
+            if self._options.parallel_threads is None:
+                obj_fmt = self._renderer.render(doc, depth)
+            else:
+                obj_fmt = self.__render_in_threads(doc, depth)
+
+        if self._options.coalesce_styles:
+            return coalesce_style_modifiers(obj_fmt)
+        return obj_fmt
 
     def format(self, obj: Any, depth: int = 0) -> str:
         return self(obj, depth)
 
-    def _format_impl(self, obj: Any, depth: int = 0) -> list[str]:
-        if hasattr(obj, PFMagicMethod.FORMAT):
-            formatted_obj = getattr(obj, PFMagicMethod.FORMAT)(self._options)
-            if not isinstance(formatted_obj, str):
-                raise ValueError(
-                    f"The `{PFMagicMethod.FORMAT}` method of an object `{repr(obj)}` of type `{type(obj)}` returned "
-                    f"an object of type `{type(formatted_obj)}` - expected `str`"
-                )
-            return formatted_obj
+    def iter_chunks(
+        self, obj: Any, depth: int = 0, chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> Iterator[str]:
+        if self._options.layout_engine is LayoutEngine.recursive:
+            chunks = iter([self._format_impl(obj, depth)])
+        else:
+            chunks = self._renderer.iter_chunks(
+                self._build_doc(obj, depth, self._root_context(obj)), depth, chunk_size
+            )
 
-        projected_obj = self._project(obj)
+        if self._options.coalesce_styles:
+            chunks = map(StyleCoalescer(), chunks)
+        if self._instrumentation is not None:
+            chunks = self._instrumentation.counted_chunks(chunks)
+        yield from chunks
 
-        for formatter in self._formatters:
-            if formatter.has_valid_type(projected_obj, self._options.exact_type_matching):
-                return formatter(projected_obj, depth)
+    def write(
+        self,
+        obj: Any,
+        fp: IO,
+        depth: int = 0,
+        encoding: str = "utf-8",
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> None:
+        # the stream-like objects may define a `mode` attribute which is not a file mode string
+        mode = getattr(fp, "mode", None)
+        binary = isinstance(fp, (RawIOBase, BufferedIOBase)) or (
+            isinstance(mode, str) and "b" in mode
+        )
+        for chunk in self.iter_chunks(obj, depth, chunk_size):
+            fp.write(chunk.encode(encoding) if binary else chunk)
+
+    async def aformat(
+        self, obj: Any, depth: int = 0, yield_every: int = DEFAULT_YIELD_EVERY
+    ) -> str:
+        return "".join(
+            [chunk async for chunk in self.aiter_chunks(obj, depth, yield_every=yield_every)]
+        )
 
-        return self._default_formatter(projected_obj, depth)
+    async def aiter_chunks(
+        self,
+        obj: Any,
+        depth: int = 0,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        yield_every: int = DEFAULT_YIELD_EVERY,
+    ) -> AsyncIterator[str]:
+        if yield_every < 1:
+            raise ValueError(f"The `yield_every` parameter must be positive - got `{yield_every}`")
+
+        from .async_formatting import aiter_chunks
+
+        chunks = aiter_chunks(self, obj, depth, chunk_size, yield_every)
+        if self._instrumentation is not None:
+            chunks = self._instrumentation.acounted_chunks(chunks)
+        async for chunk in chunks:
+            yield chunk
+
+    def format_many(
+        self,
+        objs: Iterable[Any],
+        depth: int = 0,
+        workers: Optional[int] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ) -> Iterator[str]:
+        if workers is not None and workers < 1:
+            raise ValueError(f"The number of workers must be positive - got `{workers}`")
+        if batch_size < 1:
+            raise ValueError(f"The batch size must be positive - got `{batch_size}`")
+
+        if workers is None or workers == 1:
+            # the dispatch plans of the formatted types are reused for the entire sequence
+            return (self(obj, depth) for obj in objs)
+
+        from .batch_formatting import iter_formatted_in_processes, validate_picklable
+
+        validate_picklable(self)
+        return iter_formatted_in_processes(self, objs, depth, workers, batch_size)
+
+    def warm_up(self, *types: type) -> None:
+        for t in types:
+            if t not in self._dispatch_plans and not _has_dynamic_attributes(t):
+                plan = self.__make_dispatch_plan(t, t)
+                if not plan.instance_dependent:
+                    self._dispatch_plans[t] = plan
+
+    def clear_cache(self) -> None:
+        self._dispatch_plans.clear()
+
+    @property
+    def stats(self) -> Optional[FormatStats]:
+        return None if self._instrumentation is None else self._instrumentation.stats
+
+    def enable_instrumentation(
+        self, on_enter: Optional[EnterCallback] = None, on_exit: Optional[ExitCallback] = None
+    ) -> FormatStats:
+        from .instrumentation import Instrumentation
+
+        # the dispatch plans are recreated with the instrumented formatters and projections
+        self._instrumentation = Instrumentation(on_enter, on_exit)
+        self.__setup_formatters()
+        return self._instrumentation.stats
 
-    def _project(self, obj: Any) -> Any:
-        if hasattr(obj, PFMagicMethod.PROJECT):
-            return getattr(obj, PFMagicMethod.PROJECT)()
+    def disable_instrumentation(self) -> None:
+        self._instrumentation = None
+        self.__setup_formatters()
 
-        if self._options.projections is None:
-            return obj
+    def _format_impl(self, obj: Any, depth: int = 0, context: FormatContext = ROOT_CONTEXT) -> str:
+        plan = self._dispatch_plan(obj)
+        if plan.formattable:
+            return self._format_with_magic_method(obj)
+
+        if plan.projection is not None:
+            context = context.projected_from(obj)
+            obj = plan.projection(obj)
+            plan = self._dispatch_plan(obj)
+
+        if plan.nested_formatter is not None:
+            return plan.nested_formatter(obj, depth, context)
+        return plan.formatter(obj, depth)
+
+    def _build_doc(self, obj: Any, depth: int = 0, context: FormatContext = ROOT_CONTEXT) -> Doc:
+        plan = self._dispatch_plan(obj)
+        if plan.formattable:
+            return Text.new(self._format_with_magic_method(obj))
+
+        source = obj
+        if plan.projection is not None:
+            context = context.projected_from(obj)
+            if context.anchors is None:
+                obj = plan.projection(obj)
+            else:
+                obj = context.anchors.project(obj, plan.projection)
+            plan = self._dispatch_plan(obj)
+
+        if plan.doc_builder is None:
+            return self._build_leaf_doc(plan.formatter, obj, depth)
+
+        anchor = None if context.anchors is None else context.anchors.get(source)
+        if anchor is None:
+            return plan.doc_builder(obj, depth, context)
+        if anchor.startswith("*"):
+            return Text.new(anchor)
+        return _anchored(plan.doc_builder(obj, depth, context), anchor)
+
+    def _build_leaf_doc(self, format_func: Callable[[Any, int], str], obj: Any, depth: int) -> Text:
+        if not self._options.compact or depth == 0:
+            return Text.new(format_func(obj, depth))
+
+        # like in the recursive engine, the leaves of the single-line groups are formatted with
+        # depth 0 and only the leaves rendered in the multiline layout use the actual depth
+        return Text.new(format_func(obj, 0), lambda: format_func(obj, depth))
+
+    def _root_context(self, obj: Any) -> FormatContext:
+        if not self._options.anchor_shared_references:
+            return ROOT_CONTEXT
+        return FormatContext(anchors=ReferenceAnchors(*self._find_shared_references(obj)))
+
+    def _find_shared_references(self, obj: Any) -> tuple[dict[int, Any], dict[int, tuple]]:
+        # finds the collections referenced more than once within the formatted object - each
+        # collection is traversed once, so the cost is bounded by the size of the object graph;
+        # the projected objects are returned with their sources, so that each object is
+        # projected only once (the projections may be expensive or have side effects)
+        max_depth, max_items = self._options.max_depth, self._options.max_items
+        visited, shared, projections = dict(), dict(), dict()
+
+        objects = [(obj, 0)]
+        while objects:
+            obj, level = objects.pop()
+            plan = self._dispatch_plan(obj)
+            if plan.formattable:
+                continue
+
+            source = obj
+            if plan.projection is not None:
+                entry = projections.get(id(source))
+                if entry is None:
+                    entry = projections[id(source)] = (source, plan.projection(source))
+                obj = entry[1]
+                plan = self._dispatch_plan(obj)
+
+            if (
+                not isinstance(plan.formatter, (IterableFormatter, MappingFormatter))
+                or iter(obj) is obj  # the iterators cannot be traversed more than once
+                or (max_depth is not None and level >= max_depth)
+                # the empty (e.g. interned immutable) collections are not considered shared
+                or (isinstance(obj, Sized) and len(obj) == 0)
+            ):
+                continue
+
+            if id(source) in visited:
+                shared[id(source)] = source
+                continue
+            visited[id(source)] = source
+
+            items = islice(obj.items() if isinstance(obj, Mapping) else obj, max_items)
+            if isinstance(obj, Mapping):
+                items = chain.from_iterable(items)
+            objects.extend((item, level + 1) for item in items)
+
+        return shared, projections
+
+    def __render_in_threads(self, doc: Doc, depth: int) -> str:
+        # the top-level items of a multiline collection are rendered independently of each other,
+        # so they are rendered in parallel threads (in batches) and joined in order
+        if not isinstance(doc, Group) or self._renderer.fits(doc, depth):
+            return self._renderer.render(doc, depth)
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=self._options.parallel_threads) as executor:
+
+            def map_in_threads(func: Callable[[Any], str], items: Iterable) -> Iterator[str]:
+                batches = executor.map(
+                    lambda batch: [func(item) for item in batch],
+                    iter_batches(items, PARALLEL_BATCH_SIZE),
+                )
+                return chain.from_iterable(batches)
 
-        for projection in self._options.projections:
-            if projection.has_valid_type(obj, exact_match=self._options.exact_type_matching):
-                return projection(obj)
+            return self._renderer.render_broken(doc, depth, map_in_threads)
 
-        return obj
+    def _format_with_magic_method(self, obj: Any) -> str:
+        formatted_obj = getattr(obj, PFMagicMethod.FORMAT)(self._options)
+        if not isinstance(formatted_obj, str):
+            raise ValueError(
+                f"The `{PFMagicMethod.FORMAT}` method of an object `{repr(obj)}` of type `{type(obj)}` returned "
+                f"an object of type `{type(formatted_obj)}` - expected `str`"
+            )
+        return formatted_obj
+
+    def _dispatch_plan(self, obj: Any) -> DispatchPlan:
+        obj_t = type(obj)
+        if obj_t.__dictoffset__ and _has_instance_magic_methods(obj):
+            return self.__make_dispatch_plan(obj_t, obj, obj)
+
+        plan = self._dispatch_plans.get(obj_t)
+        if plan is not None:
+            return plan
+
+        if _has_dynamic_attributes(obj_t):
+            # the magic methods of such objects can only be resolved per instance
+            return self.__make_dispatch_plan(obj_t, obj, obj)
+
+        plan = self.__make_dispatch_plan(obj_t, obj_t, obj)
+        if not plan.instance_dependent:
+            self._dispatch_plans[obj_t] = plan
+        return plan
+
+    def __make_dispatch_plan(
+        self, obj_t: type, attr_source: Any, obj: Any = _NO_ITEM
+    ) -> DispatchPlan:
+        if not self._ndarray_formatter_registered:
+            self.__register_ndarray_formatter()
+
+        instance_dependent = False
+
+        def matches(callable: TypeSpecifcCallable) -> bool:
+            # the callables with custom `has_valid_type` checks are matched against the object
+            # itself - the plans resolved with such a check are not cached
+            nonlocal instance_dependent
+            if callable.has_instance_type_check:
+                instance_dependent = True
+                if obj is not _NO_ITEM:
+                    return callable.has_valid_type(obj, self._options.exact_type_matching)
+            return callable.has_valid_type_for(obj_t, self._options.exact_type_matching)
+
+        projection = None
+        if hasattr(attr_source, PFMagicMethod.PROJECT):
+            projection = _project_with_magic_method
+        elif self._options.projections is not None:
+            projection = next(filter(matches, self._options.projections), None)
+
+        formatter = next(filter(matches, self._formatters), self._default_formatter)
+
+        plan = DispatchPlan(
+            formattable=hasattr(attr_source, PFMagicMethod.FORMAT),
+            projection=projection,
+            formatter=formatter,
+            nested_formatter=getattr(formatter, "_format_nested", None),
+            doc_builder=getattr(formatter, "_build_doc", None),
+            instance_dependent=instance_dependent,
+        )
+        if self._instrumentation is not None:
+            return self._instrumentation.instrument_plan(plan, self._build_leaf_doc)
+        return plan
 
     def __setup_formatters(self):
-        if self._options.formatters is None:
-            self._formatters = self.__predefined_formatters()
+        self._ndarray_formatter_registered = False
+        self.__set_formatters(self.__predefined_formatters())
+        self._default_formatter = DefaultFormatter.shared(Any, self._options)
+        if self._instrumentation is None:
+            self._renderer = LayoutRenderer(self._options)
         else:
-            self._formatters = deepcopy(self._options.formatters)
-            not_covered_predefined_formatters = [
-                pre_fmt
-                for pre_fmt in self.__predefined_formatters()
-                if not any(
-                    fmt.covers(pre_fmt, exact_match=self._options.exact_type_matching)
-                    for fmt in self._formatters
-                )
-            ]
-            self._formatters.extend(not_covered_predefined_formatters)
+            from .instrumentation import InstrumentedLayoutRenderer
+
+            self._renderer = InstrumentedLayoutRenderer(self._options, self._instrumentation)
+
+    def __set_formatters(self, predefined_formatters: list[TypeFormatter]):
+        # the options are immutable, so the custom formatters are shared instead of being copied
+        formatters = (*(self._options.formatters or ()), *predefined_formatters)
+        formatters_order = _formatters_order(
+            tuple(fmt.type for fmt in formatters),
+            len(self._options.formatters or ()),
+            self._options.exact_type_matching,
+        )
+        ordered_formatters = [formatters[i] for i in formatters_order]
+
+        # the formatters are published before the (empty) plans, so that the plans created
+        # concurrently from the replaced formatters are discarded with the replaced plans
+        self._predefined_formatters = predefined_formatters
+        self._formatters = ordered_formatters
+        self._dispatch_plans: dict[type, DispatchPlan] = dict()
 
-        self._formatters = sorted(self._formatters, key=cmp_to_key(TypeFormatter.cmp))
-        self._default_formatter = DefaultFormatter(Any, self._options)
+    def __register_ndarray_formatter(self):
+        # numpy is an optional dependency which is never imported by the package - an array
+        # cannot exist unless numpy has already been imported, so the ndarray formatter is
+        # registered when the first dispatch plan is created after numpy has been imported
+        ndarray_t = getattr(sys.modules.get("numpy"), "ndarray", None)
+        if ndarray_t is None:
+            return
+
+        from .ndarray_formatter import NDArrayFormatter
+
+        self.__set_formatters([*self._predefined_formatters, NDArrayFormatter(self, ndarray_t)])
+        # the flag is set only once the formatters are replaced - until then the concurrent
+        # threads register the formatter on their own instead of using the replaced formatters
+        self._ndarray_formatter_registered = True
 
     def __predefined_formatters(self) -> list[TypeFormatter]:
+        from .buffer_formatter import BufferFormatter
+
+        if self._options.hexdump_buffers:
+            buffer_formatters = [
+                BufferFormatter(self, buffer_t) for buffer_t in (bytes, bytearray, memoryview)
+            ]
+        else:
+            buffer_formatters = [
+                DefaultFormatter.shared(bytes, self._options),
+                DefaultFormatter.shared(bytearray, self._options),
+            ]
+
         return [
-            DefaultFormatter(Union[str, UserString], self._options),
-            DefaultFormatter(bytes, self._options),
-            DefaultFormatter(bytearray, self._options),
+            DefaultFormatter.shared(Union[str, UserString], self._options),
+            *buffer_formatters,
             MappingFormatter(self),
             IterableFormatter(self),
         ]
 
 
+@lru_cache(maxsize=1024)
+def _formatters_order(types: tuple[type, ...], n_custom: int, exact_match: bool) -> tuple[int, ...]:
+    # returns the indices of the formatters (the custom ones followed by the predefined ones) in the
+    # dispatch order - without the predefined formatters covered by the custom ones (see
+    # `TypeSpecifcCallable.covers`) and sorted in the inheritance-wise order (see `type_cmp`)
+    custom_types = types[:n_custom]
+    indices = [
+        i
+        for i, t in enumerate(types)
+        if i < n_custom
+        or not any(
+            t is custom_t if exact_match else is_subclass(t, custom_t) for custom_t in custom_types
+        )
+    ]
+
+    # `type_cmp` is only a partial order (the unrelated types are equal), so a comparison sort
+    # could place a subclass after its base class depending on the order of the ties - instead
+    # the formatters are sorted topologically, keeping the order of indices among unrelated types
+    ordered = list()
+    while indices:
+        first = next(
+            (
+                i
+                for i in indices
+                if not any(type_cmp(types[j], types[i]) == Ordering.LT for j in indices)
+            ),
+            indices[0],
+        )
+        indices.remove(first)
+        ordered.append(first)
+    return tuple(ordered)
+
+
 class DefaultFormatter(TypeFormatter):
+    _STRING_TYPES = (str, UserString, bytes, bytearray)
+
     def __init__(self, t: type, options: FormatOptions):
         super().__init__(t)
 
         self._exact_type_matching = options.exact_type_matching
-        self._text_style = deepcopy(options.text_style)
+        self._text_style = options.text_style
+        self._max_string_length = options.max_string_length
+
+    @staticmethod
+    def shared(t: type, options: FormatOptions) -> DefaultFormatter:
+        # the default formatters are stateless, so the formatters created for the same type
+        # and options are shared between the pretty formatters
+        return _shared_default_formatter(
+            t, options.exact_type_matching, options.text_style, options.max_string_length
+        )
 
     def __call__(self, obj: Any, depth: int = 0) -> str:
         self._validate_type(obj, self._exact_type_matching)
-        return self._text_style.apply_to(repr(obj))
+        return self._text_style.apply_to(self._repr(obj))
+
+    def _build_doc(self, obj: Any, depth: int = 0, context: FormatContext = ROOT_CONTEXT) -> Text:
+        self._validate_type(obj, self._exact_type_matching)
+        return Text(*self._text_style.apply_to_with_width(self._repr(obj)))
+
+    def _repr(self, obj: Any) -> str:
+        if (
+            self._max_string_length is None
+            or not isinstance(obj, DefaultFormatter._STRING_TYPES)
+            or len(obj) <= self._max_string_length
+        ):
+            return repr(obj)
+
+        n_more = len(obj) - self._max_string_length
+        unit = "character" if isinstance(obj, (str, UserString)) else "byte"
+        return (
+            f"{repr(obj[: self._max_string_length])}{ELLIPSIS} "
+            f"{n_more} more {unit}{'s' if n_more > 1 else ''}"
+        )
+
+
+@lru_cache(maxsize=1024)
+def _shared_default_formatter(
+    t: type, exact_type_matching: bool, text_style: TextStyle, max_string_length: Optional[int]
+) -> DefaultFormatter:
+    return DefaultFormatter(
+        t,
+        FormatOptions(
+            exact_type_matching=exact_type_matching,
+            text_style=text_style,
+            max_string_length=max_string_length,
+        ),
+    )
 
 
 class IterableFormatter(TypeFormatter):
     _TYPES = Union[list, UserList, set, frozenset, tuple, range, deque, memoryview, NamedIterable]
+    _PARENS = {
+        list: ("[", "]"),
+        UserList: ("[", "]"),
+        set: ("{", "}"),
+        frozenset: ("frozenset({", "})"),
+        tuple: ("(", ")"),
+        range: ("(", ")"),
+    }
 
     def __init__(self, base_formatter: PrettyFormatter):
         self._base_formatter = base_formatter
@@ -152,25 +782,48 @@ class IterableFormatter(TypeFormatter):
             super().__init__(Iterable)
 
     def __call__(self, collection: Iterable, depth: int = 0) -> str:
+        if self._options.layout_engine is not LayoutEngine.recursive:
+            return self._base_formatter._renderer.render(self._build_doc(collection, depth), depth)
+        return self._format_nested(collection, depth)
+
+    def _format_nested(
+        self, collection: Iterable, depth: int = 0, context: FormatContext = ROOT_CONTEXT
+    ) -> str:
         self._validate_type(collection, self._options.exact_type_matching)
 
         opening, closing = IterableFormatter.get_parens(collection)
+        if _is_elided(collection, context, self._options.max_depth):
+            return f"{opening}{ELLIPSIS}{closing}"
+
+        items_context = context.nested(collection)
 
         if self._options.compact:
-            collecion_str = (
-                opening + ", ".join(self._base_formatter(value) for value in collection) + closing
-            )
-            collecion_str_len = strlen_no_style(collecion_str) + self._options.indent_type.length(
-                depth
+            collecion_str = _join_within_width(
+                opening,
+                closing,
+                self.__iter_limited(
+                    collection,
+                    (
+                        self._base_formatter._format_impl(value, 0, items_context)
+                        for value in collection
+                    ),
+                ),
+                self._options.width - self._options.indent_type.length(depth),
             )
-            if collecion_str_len <= self._options.width:
+            if collecion_str is not None:
                 if self._options.style_entire_text:
                     return self._options.text_style.apply_to(collecion_str)
                 return collecion_str
 
         values = list()
-        for value in collection:
-            v_fmt = self._base_formatter._format_impl(value, depth).split("\n")
+        for value_fmt in self.__iter_limited(
+            collection,
+            (
+                self._base_formatter._format_impl(value, depth, items_context)
+                for value in collection
+            ),
+        ):
+            v_fmt = value_fmt.split("\n")
             v_fmt[-1] += ","
             values.extend(v_fmt)
 
@@ -181,26 +834,53 @@ class IterableFormatter(TypeFormatter):
             lines_fmt = self._options.text_style.apply_to_each(lines_fmt)
         return "\n".join(lines_fmt)
 
+    def _build_doc(
+        self, collection: Iterable, depth: int = 0, context: FormatContext = ROOT_CONTEXT
+    ) -> Doc:
+        self._validate_type(collection, self._options.exact_type_matching)
+
+        opening, closing = IterableFormatter.get_parens(collection)
+        if _is_elided(collection, context, self._options.max_depth):
+            return Text.new(f"{opening}{ELLIPSIS}{closing}")
+
+        items_context = context.nested(collection)
+
+        return Group(
+            opening,
+            closing,
+            _iter_limited(
+                (
+                    self._base_formatter._build_doc(value, depth, items_context)
+                    for value in collection
+                ),
+                _n_items(collection),
+                self._options.max_items,
+                Text.new,
+            ),
+        )
+
     @staticmethod
     def get_parens(collection: Iterable) -> tuple[str, str]:
-        if type(collection) in (list, UserList):
-            return "[", "]"
-        if type(collection) is set:
-            return "{", "}"
-        if type(collection) is frozenset:
-            return "frozenset({", "})"
-        if type(collection) in (tuple, range):
-            return "(", ")"
+        parens = IterableFormatter._PARENS.get(type(collection))
+        if parens is not None:
+            return parens
         if type(collection) is NamedIterable:
             return collection.get_parens()
 
         return f"{type(collection).__name__}([", "])"
 
+    def __iter_limited(self, collection: Iterable, values_fmt: Iterable[str]) -> Iterator[str]:
+        return _iter_limited(values_fmt, _n_items(collection), self._options.max_items, str)
+
 
 class MappingFormatter(TypeFormatter):
     _TYPES = Union[
         dict, defaultdict, UserDict, OrderedDict, ChainMap, MappingProxyType, Counter, NamedMapping
     ]
+    _PARENS = {
+        dict: ("{", "}"),
+        UserDict: ("{", "}"),
+    }
 
     def __init__(self, base_formatter: PrettyFormatter):
         self._base_formatter = base_formatter
@@ -212,30 +892,52 @@ class MappingFormatter(TypeFormatter):
             super().__init__(Mapping)
 
     def __call__(self, mapping: Mapping, depth: int = 0) -> str:
+        if self._options.layout_engine is not LayoutEngine.recursive:
+            return self._base_formatter._renderer.render(self._build_doc(mapping, depth), depth)
+        return self._format_nested(mapping, depth)
+
+    def _format_nested(
+        self, mapping: Mapping, depth: int = 0, context: FormatContext = ROOT_CONTEXT
+    ) -> str:
         self._validate_type(mapping, self._options.exact_type_matching)
 
         opening, closing = MappingFormatter.get_parens(mapping)
+        if _is_elided(mapping, context, self._options.max_depth):
+            return f"{opening}{ELLIPSIS}{closing}"
+
+        items_context = context.nested(mapping)
 
         if self._options.compact:
-            mapping_str = (
-                opening
-                + ", ".join(
-                    f"{self._base_formatter(key)}: {self._base_formatter(value)}"
-                    for key, value in mapping.items()
-                )
-                + closing
+            mapping_str = _join_within_width(
+                opening,
+                closing,
+                _iter_limited(
+                    (
+                        f"{self._base_formatter._format_impl(key, 0, items_context)}: "
+                        f"{self._base_formatter._format_impl(value, 0, items_context)}"
+                        for key, value in mapping.items()
+                    ),
+                    len(mapping),
+                    self._options.max_items,
+                    str,
+                ),
+                self._options.width - self._options.indent_type.length(depth),
             )
-            mapping_str_len = strlen_no_style(mapping_str) + self._options.indent_type.length(depth)
-            if mapping_str_len <= self._options.width:
+            if mapping_str is not None:
                 if self._options.style_entire_text:
                     return self._options.text_style.apply_to(mapping_str)
                 return mapping_str
 
         values = list()
-        for key, value in mapping.items():
-            key_fmt = self._base_formatter(key)
-            item_values_fmt = self._base_formatter._format_impl(value, depth).split("\n")
-            item_values_fmt[0] = f"{key_fmt}: {item_values_fmt[0]}"
+        for item_values_fmt in _iter_limited(
+            (
+                self.__format_item(key, value, depth, items_context)
+                for key, value in mapping.items()
+            ),
+            len(mapping),
+            self._options.max_items,
+            lambda marker: [marker],
+        ):
             item_values_fmt[-1] += ","
             values.extend(item_values_fmt)
 
@@ -246,10 +948,47 @@ class MappingFormatter(TypeFormatter):
             lines_fmt = self._options.text_style.apply_to_each(lines_fmt)
         return "\n".join(lines_fmt)
 
+    def _build_doc(
+        self, mapping: Mapping, depth: int = 0, context: FormatContext = ROOT_CONTEXT
+    ) -> Doc:
+        self._validate_type(mapping, self._options.exact_type_matching)
+
+        opening, closing = MappingFormatter.get_parens(mapping)
+        if _is_elided(mapping, context, self._options.max_depth):
+            return Text.new(f"{opening}{ELLIPSIS}{closing}")
+
+        items_context = context.nested(mapping)
+
+        return Group(
+            opening,
+            closing,
+            _iter_limited(
+                (
+                    Entry(
+                        self._base_formatter._build_doc(key, 0, items_context),
+                        self._base_formatter._build_doc(value, depth, items_context),
+                    )
+                    for key, value in mapping.items()
+                ),
+                len(mapping),
+                self._options.max_items,
+                Text.new,
+            ),
+        )
+
+    def __format_item(
+        self, key: Any, value: Any, depth: int, items_context: FormatContext
+    ) -> list[str]:
+        key_fmt = self._base_formatter._format_impl(key, 0, items_context)
+        item_values_fmt = self._base_formatter._format_impl(value, depth, items_context).split("\n")
+        item_values_fmt[0] = f"{key_fmt}: {item_values_fmt[0]}"
+        return item_values_fmt
+
     @staticmethod
     def get_parens(mapping: Mapping) -> tuple[str, str]:
-        if type(mapping) in (dict, UserDict):
-            return "{", "}"
+        parens = MappingFormatter._PARENS.get(type(mapping))
+        if parens is not None:
+            return parens
 
         if isinstance(mapping, defaultdict):
             return f"defaultdict({mapping.default_factory}, {{", "})"
@@ -2,14 +2,18 @@ from __future__ import annotations
 
 import re
 from collections.abc import Iterable
-from dataclasses import dataclass
+from dataclasses import replace
 from enum import Enum
-from typing import Callable, Optional, Union
+from functools import lru_cache
+from typing import Any, Callable, Optional, Union
 
-from colored import Style
+from .dataclass_utility import frozen_dataclass
 
+ANSI_ESCAPE_CHARACTER = "\x1b"
+# the reset sequence used by the `colored` package (`colored.Style.reset`)
+ANSI_STYLE_RESET = "\x1b[0m"
 ANSI_ESCAPE_PATTERN = r"\x1b\[[0-9;]*[mGK]"
-ANSI_ESCAPE_RESET_PATTERN = re.escape(Style.reset)
+ANSI_ESCAPE_RESET_PATTERN = re.escape(ANSI_STYLE_RESET)
 
 
 def rm_style_modifiers(s: str) -> str:
@@ -17,11 +21,18 @@ def rm_style_modifiers(s: str) -> str:
 
 
 def strlen_no_style(s: str) -> int:
+    if ANSI_ESCAPE_CHARACTER not in s:
+        return len(s)
     return len(rm_style_modifiers(s))
 
 
+@lru_cache(maxsize=None)
+def _is_zero_width(style: str) -> bool:
+    return strlen_no_style(style) == 0
+
+
 def _apply_style_normal(s: str, style: str) -> str:
-    return f"{Style.reset}{style}{s}{Style.reset}"
+    return f"{ANSI_STYLE_RESET}{style}{s}{ANSI_STYLE_RESET}"
 
 
 def _apply_style_override(s: str, style: str) -> str:
@@ -29,36 +40,122 @@ def _apply_style_override(s: str, style: str) -> str:
 
 
 def _apply_style_preserve(s: str, style: str) -> str:
-    s_aligned = re.sub(ANSI_ESCAPE_RESET_PATTERN, f"{Style.reset}{style}", s)
+    s_aligned = re.sub(ANSI_ESCAPE_RESET_PATTERN, f"{ANSI_STYLE_RESET}{style}", s)
     return _apply_style_normal(s_aligned, style)
 
 
+# the nested variants of the style callbacks produce the same result as applying the style
+# `depth` times, each time with the `indent` prepended to the string, but the escape sequences
+# of the outer levels are composited once (and cached per depth) instead of being re-applied
+
+
+def _apply_style_repeatedly(
+    s: str, style: str, indent: str, depth: int, callback: Callable[[str, str], str]
+) -> str:
+    for _ in range(depth):
+        s = callback(f"{indent}{s}", style)
+    return s
+
+
+@lru_cache(maxsize=1024)
+def _nested_style_affixes_normal(style: str, indent: str, depth: int) -> tuple[str, str]:
+    return f"{ANSI_STYLE_RESET}{style}{indent}" * depth, ANSI_STYLE_RESET * depth
+
+
+def _apply_style_nested_normal(s: str, style: str, indent: str, depth: int) -> str:
+    opening, closing = _nested_style_affixes_normal(style, indent, depth)
+    return f"{opening}{s}{closing}"
+
+
+@lru_cache(maxsize=1024)
+def _nested_style_affixes_override(style: str, indent: str, depth: int) -> tuple[str, str]:
+    return f"{ANSI_STYLE_RESET}{style}{rm_style_modifiers(indent) * depth}", ANSI_STYLE_RESET
+
+
+def _apply_style_nested_override(s: str, style: str, indent: str, depth: int) -> str:
+    if not _is_zero_width(style):
+        return _apply_style_repeatedly(s, style, indent, depth, _apply_style_override)
+
+    opening, closing = _nested_style_affixes_override(style, indent, depth)
+    return f"{opening}{rm_style_modifiers(s)}{closing}"
+
+
+@lru_cache(maxsize=1024)
+def _nested_style_affixes_preserve(style: str, indent: str, depth: int) -> tuple[str, str]:
+    # each application of the style appends the style to all resets found within the string
+    opening = "".join(
+        f"{ANSI_STYLE_RESET}{style * i}{indent.replace(ANSI_STYLE_RESET, ANSI_STYLE_RESET + style * i)}"
+        for i in range(1, depth + 1)
+    )
+    closing = "".join(f"{ANSI_STYLE_RESET}{style * i}" for i in reversed(range(depth)))
+    return opening, closing
+
+
+def _apply_style_nested_preserve(s: str, style: str, indent: str, depth: int) -> str:
+    if ANSI_STYLE_RESET in style:
+        return _apply_style_repeatedly(s, style, indent, depth, _apply_style_preserve)
+
+    opening, closing = _nested_style_affixes_preserve(style, indent, depth)
+    return f"{opening}{s.replace(ANSI_STYLE_RESET, ANSI_STYLE_RESET + style * depth)}{closing}"
+
+
 TextStyleValue = Optional[str]
 TextStyleParam = Union["TextStyle", TextStyleValue]
 
 
-@dataclass
+@frozen_dataclass
 class TextStyle:
     class Mode(Enum):
-        normal = ("normal", _apply_style_normal)
-        override = ("override", _apply_style_override)
-        preserve = ("preserve", _apply_style_preserve)
-
-        def __new__(cls, name: str, callback: Callable[[str, str], str]):
+        normal = ("normal", _apply_style_normal, _apply_style_nested_normal)
+        override = ("override", _apply_style_override, _apply_style_nested_override)
+        preserve = ("preserve", _apply_style_preserve, _apply_style_nested_preserve)
+
+        def __new__(
+            cls,
+            name: str,
+            callback: Callable[[str, str], str],
+            nested_callback: Callable[[str, str, str, int], str],
+        ):
             obj = object.__new__(cls)
             obj._value_ = name
             obj.callback = callback
+            obj.nested_callback = nested_callback
             return obj
 
     value: TextStyleValue = None
     mode: Mode = Mode.preserve
 
+    def replace(self, **changes: Any) -> TextStyle:
+        return replace(self, **changes)
+
     def apply_to(self, s: str) -> str:
         if self.value is None:
             return s
 
         return self.mode.callback(s, self.value)
 
+    def apply_to_with_width(self, s: str) -> tuple[str, int]:
+        # the style modifiers do not change the visible width of a string, so it can be
+        # measured on the unstyled string without scanning for the escape sequences
+        if self.value is None or not _is_zero_width(self.value):
+            styled_s = self.apply_to(s)
+            return styled_s, strlen_no_style(styled_s)
+
+        return self.mode.callback(s, self.value), strlen_no_style(s)
+
+    def apply_to_nested(self, s: str, indent: str, depth: int) -> str:
+        """
+        Returns the same string as `depth` consecutive applications of the style,
+        each to the previous result prepended with `indent`.
+        """
+
+        if self.value is None:
+            return f"{indent * depth}{s}"
+        if depth == 0:
+            return s
+
+        return self.mode.nested_callback(s, self.value, indent, depth)
+
     def apply_to_each(self, s_collection: Iterable[str]) -> list[str]:
         return [self.apply_to(s) for s in s_collection]
 
@@ -77,3 +174,73 @@ class TextStyle:
             if isinstance(style, str)
             else TextStyle(style.value, mode=_mode(mode, style.mode))
         )
+
+
+ANSI_ESCAPE_TOKEN_PATTERN = re.compile(f"({ANSI_ESCAPE_PATTERN})")
+_RESET_SEQUENCES = frozenset((ANSI_STYLE_RESET, "\x1b[m"))
+
+
+class StyleCoalescer:
+    """
+    Removes the redundant style modifiers (SGR escape sequences) from the consecutive pieces
+    of a styled text without changing its appearance in a terminal: the modifiers are emitted
+    only before visible characters and only if the active style actually changes.
+    """
+
+    def __init__(self):
+        # (style modifiers active since the last reset, whether any reset was applied)
+        self._emitted: tuple[list[str], bool] = (list(), False)
+        self._requested: tuple[list[str], bool] = (list(), False)
+        self._pending = list()
+
+    def __call__(self, s: str) -> str:
+        if ANSI_ESCAPE_CHARACTER not in s and not self._pending:
+            return s
+
+        out = list()
+        for i, token in enumerate(ANSI_ESCAPE_TOKEN_PATTERN.split(s)):
+            if i % 2 == 0:
+                if token:
+                    self.__sync(out)
+                    out.append(token)
+            elif token in _RESET_SEQUENCES:
+                self._requested = (list(), True)
+                self._pending.append(token)
+            elif token.endswith("m"):
+                modifiers = self._requested[0]
+                if token in modifiers:
+                    # a repeated modifier overrides all attributes set by its previous occurrence
+                    modifiers.remove(token)
+                modifiers.append(token)
+                self._pending.append(token)
+            else:
+                # non-style escape sequences (e.g. cursor movement) are kept as is
+                self.__sync(out)
+                out.append(token)
+
+        self.__sync(out)
+        return "".join(out)
+
+    def __sync(self, out: list[str]) -> None:
+        if not self._pending:
+            return
+
+        emitted_modifiers, emitted_reset = self._emitted
+        requested_modifiers, requested_reset = self._requested
+        if requested_reset == emitted_reset and (
+            requested_modifiers[: len(emitted_modifiers)] == emitted_modifiers
+        ):
+            out.extend(requested_modifiers[len(emitted_modifiers) :])
+        elif requested_reset:
+            out.append(ANSI_STYLE_RESET)
+            out.extend(requested_modifiers)
+        else:
+            # the initial style of the output is unknown, so the original modifiers are kept
+            out.extend(self._pending)
+
+        self._emitted = (list(requested_modifiers), requested_reset)
+        self._pending.clear()
+
+
+def coalesce_style_modifiers(s: str) -> str:
+    return StyleCoalescer()(s)
@@ -3,7 +3,7 @@ from __future__ import annotations
 from abc import ABC, abstractmethod
 from typing import Any
 
-from .typing_utility import has_valid_type, is_subclass, type_cmp
+from .typing_utility import has_valid_type, is_subclass, is_valid_type, type_cmp, type_name
 
 
 class TypeSpecifcCallable(ABC):
@@ -25,11 +25,21 @@ class TypeSpecifcCallable(ABC):
         raise NotImplementedError(f"{repr(self)}.__call__ is not implemented")
 
     def __repr__(self) -> str:
-        return f"{self.__class__.__name__}({self.type.__name__})"
+        return f"{self.__class__.__name__}({type_name(self.type)})"
 
     def has_valid_type(self, obj: Any, exact_match: bool = False) -> bool:
         return has_valid_type(obj, self.type, exact_match)
 
+    def has_valid_type_for(self, obj_t: type, exact_match: bool = False) -> bool:
+        return is_valid_type(obj_t, self.type, exact_match)
+
+    @property
+    def has_instance_type_check(self) -> bool:
+        # the callables which override `has_valid_type` can accept objects depending on their
+        # values, so whether such a callable handles an object cannot be resolved per type
+        overrides_check = type(self).has_valid_type is not TypeSpecifcCallable.has_valid_type
+        return overrides_check or "has_valid_type" in getattr(self, "__dict__", ())
+
     def _validate_type(self, obj: Any, exact_match: bool = False) -> None:
         if not self.has_valid_type(obj, exact_match):
             raise TypeError(
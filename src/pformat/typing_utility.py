@@ -24,18 +24,41 @@ def is_union(t: type) -> bool:
     )
 
 
+def type_name(t: type) -> str:
+    """
+    Returns the name of a type, which does not depend on the Python version - e.g. the typing
+    constructs are named `Any` and `Union[str, UserString]` (for both `Union` and `|` unions).
+    """
+
+    if t is Any:
+        return "Any"
+
+    if is_union(t):
+        return f"Union[{', '.join(type_name(_t) for _t in t.__args__)}]"
+
+    args = getattr(t, "__args__", None)
+    if get_origin(t) is not None and args:
+        return f"{type_name(get_origin(t))}[{', '.join(type_name(_t) for _t in args)}]"
+
+    return getattr(t, "__name__", repr(t))
+
+
 def has_valid_type(obj: Any, t: type, exact_match: bool = False) -> bool:
+    return is_valid_type(type(obj), t, exact_match)
+
+
+def is_valid_type(obj_t: type, t: type, exact_match: bool = False) -> bool:
     if t in BASE_TYPES:
         return True
 
     if is_union(t):
-        return any(has_valid_type(obj, _t, exact_match) for _t in t.__args__)
+        return any(is_valid_type(obj_t, _t, exact_match) for _t in t.__args__)
 
-    if isinstance(obj, GenericAlias):
+    if issubclass(obj_t, GenericAlias):
         return t is GenericAlias
 
     try:
-        return type(obj) is t if exact_match else is_subclass(type(obj), t)
+        return obj_t is t if exact_match else is_subclass(obj_t, t)
     except TypeError:
         return False
 
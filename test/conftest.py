@@ -1,7 +1,18 @@
-from typing import Callable
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Callable
 
 import pytest
 
+import pformat
+from pformat.layout import LayoutEngine
+from pformat.text_style import ANSI_ESCAPE_PATTERN
+
+LAYOUT_ENGINE_VALS = list(LayoutEngine)
+
 
 def pytest_itemcollected(item: pytest.Item):
     if isinstance(item, pytest.Function):
@@ -9,6 +20,24 @@ def pytest_itemcollected(item: pytest.Item):
         item._nodeid = item.nodeid.replace("-", ",")
 
 
+@pytest.fixture(
+    params=LAYOUT_ENGINE_VALS, ids=[f"engine={engine}" for engine in LAYOUT_ENGINE_VALS]
+)
+def layout_engine(request: pytest.FixtureRequest) -> LayoutEngine:
+    return request.param
+
+
+class CountingFormatFunc:
+    """A type formatter function which counts its calls"""
+
+    def __init__(self):
+        self.n_calls = 0
+
+    def __call__(self, value: Any, _depth: int) -> str:
+        self.n_calls += 1
+        return repr(value)
+
+
 def assert_does_not_throw(func: Callable, *args, **kwargs):
     try:
         func(*args, **kwargs)
@@ -21,3 +50,47 @@ def gen_derived_type(t: type) -> type:
         pass
 
     return Derived
+
+
+def render_in_terminal(s: str) -> tuple[list[tuple], tuple]:
+    """
+    Simulates the SGR handling of a terminal - returns the visible characters of a string
+    along with their (foreground, background, attributes) styles and the final style
+    """
+
+    fg, bg, attrs = None, None, frozenset()
+    chars = list()
+    for i, token in enumerate(re.split(f"({ANSI_ESCAPE_PATTERN})", s)):
+        if i % 2 == 0:
+            chars.extend((c, fg, bg, attrs) for c in token)
+            continue
+
+        params = [int(param) if param else 0 for param in token[2:-1].split(";")]
+        while params:
+            param = params.pop(0)
+            if param == 0:
+                fg, bg, attrs = None, None, frozenset()
+            elif param in (38, 48):
+                color = (params.pop(0), params.pop(0))
+                fg, bg = (color, bg) if param == 38 else (fg, color)
+            elif 30 <= param <= 37 or 90 <= param <= 97:
+                fg = param
+            elif 40 <= param <= 47 or 100 <= param <= 107:
+                bg = param
+            elif param == 39:
+                fg = None
+            elif param == 49:
+                bg = None
+            elif 21 <= param <= 29:
+                attrs = attrs - {param - 20}
+            else:
+                attrs = attrs | {param}
+
+    return chars, (fg, bg, attrs)
+
+
+def run_python(code: str) -> str:
+    env = dict(os.environ, PYTHONPATH=str(Path(pformat.__file__).parent.parent))
+    return subprocess.run(
+        [sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True
+    ).stdout
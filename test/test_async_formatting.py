@@ -0,0 +1,126 @@
+import asyncio
+from collections.abc import AsyncIterator, Iterator
+
+import pytest
+from colored import Fore
+
+from pformat.indentation_utility import IndentType
+from pformat.layout import LayoutEngine
+from pformat.pretty_formatter import PrettyFormatter
+
+
+def gen_records(n: int) -> Iterator[dict]:
+    for i in range(n):
+        yield {"id": i, "values": list(range(i % 5))}
+
+
+class AsyncRecords:
+    # an async iterable formatted with the same parens as the `Records` iterable
+    def __init__(self, n: int):
+        self.n = n
+        self.n_consumed = 0
+
+    async def __aiter__(self) -> AsyncIterator[dict]:
+        for record in gen_records(self.n):
+            await asyncio.sleep(0)
+            self.n_consumed += 1
+            yield record
+
+
+class Records:
+    def __init__(self, n: int):
+        self.n = n
+
+    def __iter__(self) -> Iterator[dict]:
+        return gen_records(self.n)
+
+
+async def collect(chunks: AsyncIterator[str]) -> list[str]:
+    return [chunk async for chunk in chunks]
+
+
+def formatted_records(sut: PrettyFormatter, n: int) -> str:
+    return sut(Records(n)).replace("Records", "AsyncRecords")
+
+
+class TestAsyncFormatting:
+    def test_aformat(self, layout_engine: LayoutEngine):
+        sut = PrettyFormatter.new(
+            compact=True,
+            indent_type=IndentType.LINE(style=Fore.green),
+            text_style=Fore.red,
+            layout_engine=layout_engine,
+        )
+        data = {f"key{i}": list(gen_records(i)) for i in range(20)}
+
+        assert asyncio.run(sut.aformat(data)) == sut(data)
+
+    @pytest.mark.parametrize("chunk_size", [1, 10, 100])
+    def test_aiter_chunks(self, chunk_size: int):
+        sut = PrettyFormatter.new(compact=True, coalesce_styles=True, text_style=Fore.red)
+        data = list(gen_records(50))
+
+        chunks = asyncio.run(collect(sut.aiter_chunks(data, chunk_size=chunk_size)))
+        assert chunks == list(sut.iter_chunks(data, chunk_size=chunk_size))
+
+    def test_aformat_yields_to_event_loop(self):
+        sut = PrettyFormatter()
+        data = list(gen_records(1000))
+        n_ticks = 0
+
+        async def ticker():
+            nonlocal n_ticks
+            while True:
+                n_ticks += 1
+                await asyncio.sleep(0)
+
+        async def format_with_ticker() -> tuple[str, int]:
+            ticker_task = asyncio.create_task(ticker())
+            await asyncio.sleep(0)
+            n_ticks_before = n_ticks
+
+            formatted_data = await sut.aformat(data, yield_every=10)
+            ticker_task.cancel()
+            return formatted_data, n_ticks - n_ticks_before
+
+        formatted_data, n_ticks_during_formatting = asyncio.run(format_with_ticker())
+        assert formatted_data == sut(data)
+        assert n_ticks_during_formatting >= formatted_data.count("\n") // 10
+
+    def test_aformat_with_invalid_yield_every(self):
+        with pytest.raises(ValueError):
+            asyncio.run(PrettyFormatter().aformat([1], yield_every=0))
+
+    COMPACT_PARAMS = [(False, 50), (True, 50), (True, 1000)]
+
+    @pytest.mark.parametrize(
+        "compact,width",
+        COMPACT_PARAMS,
+        ids=[f"{compact=},{width=}" for compact, width in COMPACT_PARAMS],
+    )
+    @pytest.mark.parametrize("n_items", [0, 1, 20])
+    def test_format_async_iterable(self, compact: bool, width: int, n_items: int):
+        sut = PrettyFormatter.new(compact=compact, width=width)
+        assert asyncio.run(sut.aformat(AsyncRecords(n_items))) == formatted_records(sut, n_items)
+
+    def test_format_async_iterable_with_limits(self):
+        sut = PrettyFormatter.new(compact=True, width=100, max_items=2)
+        assert asyncio.run(sut.aformat(AsyncRecords(10))) == formatted_records(sut, 10)
+
+        sut = PrettyFormatter.new(max_depth=0)
+        assert asyncio.run(sut.aformat(AsyncRecords(10))) == "AsyncRecords([...])"
+
+    def test_async_iterable_items_are_streamed(self):
+        sut = PrettyFormatter.new(compact=True)
+        records = AsyncRecords(100)
+
+        async def first_chunks() -> list[str]:
+            chunks = sut.aiter_chunks(records, chunk_size=1)
+            return [await chunks.__anext__() for _ in range(3)]
+
+        assert asyncio.run(first_chunks()) == [
+            "AsyncRecords([",
+            "\n    {'id': 0, 'values': []},",
+            "\n    {'id': 1, 'values': [0]},",
+        ]
+        assert records.n_consumed < 10
@@ -0,0 +1,136 @@
+import array
+
+import pytest
+from colored import Fore, Style
+
+from pformat.buffer_formatter import BufferFormatter, _as_bytes
+from pformat.indentation_utility import IndentType
+from pformat.layout import LayoutEngine
+from pformat.pretty_formatter import DefaultFormatter, PrettyFormatter
+
+HELLO_BYTES = b"Hello\x00world\n"
+HELLO_HEXDUMP_ROW = "00000000  48 65 6c 6c 6f 00 77 6f  72 6c 64 0a              |Hello.world.|"
+
+
+class TestBufferFormatter:
+    @pytest.mark.parametrize("buffer", [b"", bytearray(), memoryview(b"")], ids=["b", "ba", "mv"])
+    def test_buffer_formatter_is_predefined(self, buffer):
+        sut = PrettyFormatter.new(hexdump_buffers=True)
+        assert isinstance(sut._dispatch_plan(buffer).formatter, BufferFormatter)
+
+    def test_buffer_formatter_is_not_used_by_default(self):
+        sut = PrettyFormatter()
+        assert isinstance(sut._dispatch_plan(b"").formatter, DefaultFormatter)
+        assert not isinstance(sut._dispatch_plan(memoryview(b"")).formatter, BufferFormatter)
+
+    def test_format_empty_buffer(self, layout_engine: LayoutEngine):
+        sut = PrettyFormatter.new(hexdump_buffers=True, layout_engine=layout_engine)
+
+        assert sut(b"") == "bytes()"
+        assert sut(bytearray()) == "bytearray()"
+        assert sut(memoryview(b"")) == "memoryview()"
+
+    @pytest.mark.parametrize(
+        "buffer", [HELLO_BYTES, bytearray(HELLO_BYTES), memoryview(HELLO_BYTES)]
+    )
+    def test_format_buffer(self, buffer, layout_engine: LayoutEngine):
+        sut = PrettyFormatter.new(width=100, hexdump_buffers=True, layout_engine=layout_engine)
+        assert sut(buffer) == "\n".join(
+            [f"{type(buffer).__name__}(", f"    {HELLO_HEXDUMP_ROW}", ")"]
+        )
+
+    def test_bytes_per_row_depends_on_width(self):
+        sut = PrettyFormatter.new(hexdump_buffers=True)
+        assert sut(HELLO_BYTES) == "\n".join(
+            [
+                "bytes(",
+                "    00000000  48 65 6c 6c 6f 00 77 6f  |Hello.wo|",
+                "    00000008  72 6c 64 0a              |rld.|",
+                ")",
+            ]
+        )
+
+        sut = PrettyFormatter.new(width=33, hexdump_buffers=True)
+        assert sut(HELLO_BYTES[:6]) == "\n".join(
+            [
+                "bytes(",
+                "    00000000  48 65 6c 6c  |Hell|",
+                "    00000004  6f 00        |o.|",
+                ")",
+            ]
+        )
+
+    def test_format_nested_buffer(self, layout_engine: LayoutEngine):
+        sut = PrettyFormatter.new(
+            width=100,
+            indent_type=IndentType.DOTS(width=2),
+            hexdump_buffers=True,
+            layout_engine=layout_engine,
+        )
+        assert sut([HELLO_BYTES, 1]) == "\n".join(
+            ["[", "··bytes(", f"····{HELLO_HEXDUMP_ROW}", "··),", "··1,", "]"]
+        )
+
+    def test_format_multidimensional_memoryview(self):
+        view = memoryview(array.array("i", range(4))).cast("B").cast("i", (2, 2))
+        expected_bytes = view.tobytes()
+
+        sut = PrettyFormatter.new(width=100, hexdump_buffers=True)
+        assert sut(view).split("\n")[:3] == [
+            "memoryview(",
+            "    format='i', shape=(2, 2)",
+            f"    00000000  {expected_bytes[:8].hex(' ')}  {expected_bytes[8:].hex(' ')}  |................|",
+        ]
+
+    def test_format_non_contiguous_memoryview(self):
+        sut = PrettyFormatter.new(hexdump_buffers=True)
+        assert sut(memoryview(b"abcdef")[::2]) == "\n".join(
+            ["memoryview(", "    00000000  61 63 65                 |ace|", ")"]
+        )
+
+    def test_format_non_contiguous_multidimensional_memoryview(self):
+        view = memoryview(bytes(range(32))).cast("i", (4, 2))[::2]
+        assert not view.c_contiguous
+
+        sut = PrettyFormatter.new(width=100, hexdump_buffers=True, max_string_length=4)
+        assert sut(view).split("\n")[2].split() == ["00000000", "00", "01", "02", "03", "|....|"]
+        assert _as_bytes(view, 4).nbytes == 8
+
+    def test_max_string_length(self, layout_engine: LayoutEngine):
+        sut = PrettyFormatter.new(
+            hexdump_buffers=True, max_string_length=2, layout_engine=layout_engine
+        )
+
+        assert sut(bytes(1_000_000)) == "\n".join(
+            [
+                "bytes(",
+                "    00000000  00 00                    |..|",
+                "    ... 999998 more bytes",
+                ")",
+            ]
+        )
+        assert sut(b"ab") == "\n".join(
+            ["bytes(", "    00000000  61 62                    |ab|", ")"]
+        )
+
+    def test_iter_chunks_streams_rows(self):
+        sut = PrettyFormatter.new(hexdump_buffers=True)
+        buffer = bytes(range(256)) * 64
+
+        chunks = sut.iter_chunks(buffer, chunk_size=64)
+        assert len(next(chunks)) < 200
+        assert "".join([next(chunks), *chunks]) != ""
+        assert "".join(sut.iter_chunks(buffer, chunk_size=64)) == sut(buffer)
+
+    def test_buffer_is_released_after_formatting(self):
+        buffer = bytearray(b"abc")
+        PrettyFormatter.new(hexdump_buffers=True)(buffer)
+
+        buffer.extend(b"d")  # raises a BufferError if any export of the buffer is still alive
+        assert buffer == bytearray(b"abcd")
+
+    def test_text_style(self):
+        sut = PrettyFormatter.new(width=100, hexdump_buffers=True, text_style=Fore.red)
+        assert sut(HELLO_BYTES) == "\n".join(
+            ["bytes(", f"    {Style.reset}{Fore.red}{HELLO_HEXDUMP_ROW}{Style.reset}", ")"]
+        )
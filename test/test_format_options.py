@@ -1,8 +1,15 @@
-from dataclasses import asdict, fields
+import pickle
+from collections.abc import Callable
+from dataclasses import FrozenInstanceError, asdict, fields
+
+import pytest
 
 from pformat.format_options import FormatOptions
 from pformat.indentation_utility import IndentType
+from pformat.layout import LayoutEngine
 from pformat.text_style import TextStyle
+from pformat.type_formatter import TypeFormatter, make_formatter
+from pformat.type_projection import make_projection
 
 
 def test_default():
@@ -14,6 +21,14 @@ def test_default():
     assert FormatOptions.default("exact_type_matching") == False
     assert FormatOptions.default("projections") is None
     assert FormatOptions.default("formatters") is None
+    assert FormatOptions.default("layout_engine") is LayoutEngine.document
+    assert FormatOptions.default("coalesce_styles") == False
+    assert FormatOptions.default("max_depth") is None
+    assert FormatOptions.default("max_items") is None
+    assert FormatOptions.default("max_string_length") is None
+    assert FormatOptions.default("anchor_shared_references") == False
+    assert FormatOptions.default("hexdump_buffers") == False
+    assert FormatOptions.default("parallel_threads") is None
 
 
 def test_init_with_none_text_style():
@@ -21,6 +36,33 @@ def test_init_with_none_text_style():
     assert sut.text_style == TextStyle()
 
 
+@pytest.mark.parametrize("limit_name", ["max_depth", "max_items", "max_string_length"])
+def test_init_with_negative_limit(limit_name: str):
+    with pytest.raises(ValueError):
+        FormatOptions(**{limit_name: -1})
+
+
+def test_init_with_anchor_shared_references_for_recursive_engine():
+    with pytest.raises(ValueError):
+        FormatOptions(anchor_shared_references=True, layout_engine=LayoutEngine.recursive)
+
+
+@pytest.mark.parametrize("parallel_threads", [0, -1])
+def test_init_with_non_positive_parallel_threads(parallel_threads: int):
+    with pytest.raises(ValueError):
+        FormatOptions(parallel_threads=parallel_threads)
+
+
+def test_init_with_parallel_threads_for_recursive_engine():
+    with pytest.raises(ValueError):
+        FormatOptions(parallel_threads=2, layout_engine=LayoutEngine.recursive)
+
+
+def test_init_with_parallel_threads_and_anchor_shared_references():
+    with pytest.raises(ValueError):
+        FormatOptions(parallel_threads=2, anchor_shared_references=True)
+
+
 def test_asdict_shallow():
     sut = FormatOptions()
     assert sut.asdict() == sut.asdict(shallow=True)
@@ -32,3 +74,86 @@ def test_asdict_shallow():
 def test_asdict_deep():
     sut = FormatOptions()
     assert sut.asdict(shallow=False) == asdict(sut)
+
+
+def test_frozen():
+    sut = FormatOptions()
+    with pytest.raises(FrozenInstanceError):
+        sut.width = 100
+    with pytest.raises(FrozenInstanceError):
+        sut.unknown_option = 100
+    with pytest.raises(FrozenInstanceError):
+        del sut.width
+
+    assert not hasattr(sut, "__dict__")
+
+
+def test_replace():
+    sut = FormatOptions(width=100)
+    replaced_sut = sut.replace(compact=True, text_style=None)
+
+    assert replaced_sut == FormatOptions(width=100, compact=True)
+    assert sut == FormatOptions(width=100)
+
+    with pytest.raises(ValueError):
+        sut.replace(max_depth=-1)
+
+
+def test_eq_and_hash():
+    assert FormatOptions() == FormatOptions()
+    assert hash(FormatOptions(width=10, text_style="x")) == hash(
+        FormatOptions(width=10, text_style="x")
+    )
+    assert FormatOptions(width=10) != FormatOptions(width=20)
+    assert len({FormatOptions(), FormatOptions(), FormatOptions(compact=True)}) == 2
+
+
+def format_int(value: int, _depth: int) -> str:
+    return f"int({value})"
+
+
+def test_eq_and_hash_with_formatters():
+    sut = FormatOptions(
+        projections=[make_projection(float, round)], formatters=[make_formatter(int, format_int)]
+    )
+
+    assert isinstance(sut.projections, tuple) and isinstance(sut.formatters, tuple)
+    assert sut == FormatOptions(
+        projections=(make_projection(float, round),), formatters=(make_formatter(int, format_int),)
+    )
+    assert hash(sut) == hash(sut.replace())
+    assert pickle.loads(pickle.dumps(sut)) == sut
+
+    # the type specific callables of the same types but with different functions are not equal
+    assert sut != sut.replace(formatters=[make_formatter(int, lambda value, _: str(value))])
+    assert sut != sut.replace(projections=[make_projection(float, int)])
+
+
+class SlottedFormatter(TypeFormatter):
+    __slots__ = ("fmt_func",)
+
+    def __init__(self, fmt_func: Callable[[int, int], str]):
+        super().__init__(int)
+        self.fmt_func = fmt_func
+
+    def __call__(self, obj: int, depth: int = 0) -> str:
+        return self.fmt_func(obj, depth)
+
+
+def test_eq_and_hash_with_slotted_formatters():
+    sut = FormatOptions(formatters=[SlottedFormatter(format_int)])
+
+    assert hash(sut) == hash(FormatOptions(formatters=[SlottedFormatter(format_int)]))
+    assert sut in {FormatOptions(formatters=[SlottedFormatter(format_int)])}
+    assert sut != FormatOptions(formatters=[SlottedFormatter(lambda value, _: str(value))])
+
+
+def test_eq_and_hash_with_unhashable_formatter_attributes():
+    formatter = SlottedFormatter(format_int)
+    formatter.calls = list()
+    sut = FormatOptions(formatters=[formatter])
+
+    # the formatters with unhashable attributes are compared by identity
+    assert hash(sut) == hash(sut.replace())
+    assert sut in {sut.replace()}
+    assert sut != FormatOptions(formatters=[SlottedFormatter(format_int)])
@@ -0,0 +1,107 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from colored import Fore
+
+from pformat.format_options import FormatOptions
+from pformat.formatter_pool import DEFAULT_POOL_SIZE, FormatterPool, get_formatter
+from pformat.pretty_formatter import PrettyFormatter
+from pformat.type_formatter import TypeFormatter, make_formatter
+
+POOL_SIZE = 3
+
+
+def format_int(i: int, depth: int) -> str:
+    return f"int({i})"
+
+
+class UnhashableFormatter(TypeFormatter):
+    def __init__(self):
+        super().__init__(int)
+        self.calls = list()
+
+    def __call__(self, obj: int, depth: int = 0) -> str:
+        return "int"
+
+
+class TestFormatterPool:
+    @pytest.fixture
+    def sut(self) -> FormatterPool:
+        return FormatterPool(max_size=POOL_SIZE)
+
+    def test_default_init(self):
+        sut = FormatterPool()
+        assert sut.max_size == DEFAULT_POOL_SIZE
+        assert len(sut) == 0
+
+    @pytest.mark.parametrize("max_size", [0, -1], ids=["zero", "negative"])
+    def test_init_with_invalid_max_size(self, max_size: int):
+        with pytest.raises(ValueError):
+            FormatterPool(max_size)
+
+    def test_get_returns_formatter_for_options(self, sut: FormatterPool):
+        options = FormatOptions(width=20, compact=True, text_style=Fore.red)
+
+        formatter = sut.get(options)
+        assert isinstance(formatter, PrettyFormatter)
+        assert formatter.options is options
+        assert options in sut
+
+    def test_get_returns_shared_formatter_for_equal_options(self, sut: FormatterPool):
+        options = FormatOptions(width=20, formatters=[make_formatter(int, format_int)])
+        equal_options = FormatOptions(width=20, formatters=[make_formatter(int, format_int)])
+
+        formatter = sut.get(options)
+        assert sut.get(options) is formatter
+        assert sut.get(equal_options) is formatter
+        assert sut.get(options.replace(width=30)) is not formatter
+        assert len(sut) == 2
+
+    def test_least_recently_used_formatter_eviction(self, sut: FormatterPool):
+        options = [FormatOptions(width=width) for width in range(10, 10 + POOL_SIZE + 1)]
+        formatters = [sut.get(opts) for opts in options[:POOL_SIZE]]
+
+        sut.get(options[0])
+        sut.get(options[POOL_SIZE])
+
+        assert len(sut) == POOL_SIZE
+        assert options[1] not in sut
+        assert all(opts in sut for opts in [options[0], *options[2:]])
+        assert sut.get(options[0]) is formatters[0]
+        assert sut.get(options[1]) is not formatters[1]
+
+    def test_options_with_unhashable_formatters_are_pooled_by_identity(self, sut: FormatterPool):
+        unhashable_formatter = UnhashableFormatter()
+        options = FormatOptions(formatters=[unhashable_formatter])
+
+        formatter = sut.get(options)
+        assert formatter(1) == "int"
+        assert sut.get(options.replace()) is formatter
+        assert sut.get(FormatOptions(formatters=[UnhashableFormatter()])) is not formatter
+        assert len(sut) == 2
+
+    def test_clear(self, sut: FormatterPool):
+        formatter = sut.get(FormatOptions())
+
+        sut.clear()
+        assert len(sut) == 0
+        assert sut.get(FormatOptions()) is not formatter
+
+    def test_concurrent_get(self, sut: FormatterPool):
+        options = [FormatOptions(width=width) for width in range(10, 10 + POOL_SIZE)]
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            formatters = list(executor.map(sut.get, options * 50))
+
+        assert len(sut) == POOL_SIZE
+        for i, formatter in enumerate(formatters):
+            assert formatter is formatters[i % POOL_SIZE]
+
+
+def test_get_formatter():
+    options = FormatOptions(width=15, compact=True)
+
+    formatter = get_formatter(options)
+    assert formatter.options == options
+    assert get_formatter(FormatOptions(width=15, compact=True)) is formatter
+    assert get_formatter() is get_formatter(FormatOptions())
@@ -1,6 +1,8 @@
+from dataclasses import FrozenInstanceError
 from itertools import product
 
 import pytest
+from colored import Fore
 
 from pformat.indentation_utility import (
     DEFAULT_INDENT_CHARACTER,
@@ -8,6 +10,7 @@ from pformat.indentation_utility import (
     IndentMarker,
     IndentType,
 )
+from pformat.text_style import TextStyle
 
 from .conftest import assert_does_not_throw
 
@@ -108,6 +111,39 @@ class TestIndentType:
 
         assert sut.string(depth) == f"{character}{DEFAULT_INDENT_CHARACTER * (width - 1)}" * depth
 
+    @pytest.mark.parametrize("width,depth", WD_PARAMS, ids=WD_IDS)
+    def test_string_styled(self, width: int, depth: int):
+        style = TextStyle(Fore.green)
+        sut = IndentType.new(width, character="|", fill=False, style=style)
+
+        assert sut.string(depth) == style.apply_to(IndentType.LINE(width).string(depth))
+
+    @pytest.mark.parametrize("depth", DEPTH_VASL, ids=[f"depth={d}" for d in DEPTH_VASL])
+    def test_nested_string(self, sut: IndentType, depth: int):
+        assert sut.nested_string(depth) == sut.string(depth=1) * depth
+
+        sut = sut.replace(style=TextStyle(Fore.green))
+        assert sut.nested_string(depth) == sut.string(depth=1) * depth
+
+    def test_string_after_replace(self, sut: IndentType):
+        indent_str = sut.string(depth=2)
+
+        wide_sut = sut.replace(width=sut.width + 1)
+        assert wide_sut.string(depth=2) == IndentType(sut.width + 1, sut.marker).string(depth=2)
+        assert sut.string(depth=2) == indent_str
+
+        styled_sut = wide_sut.replace(style=TextStyle(Fore.green, TextStyle.Mode.normal))
+        assert styled_sut.string(depth=2) == styled_sut.style.apply_to(wide_sut.string(depth=2))
+
+    def test_frozen(self, sut: IndentType):
+        with pytest.raises(FrozenInstanceError):
+            sut.width = 1
+        with pytest.raises(FrozenInstanceError):
+            sut.marker.character = "|"
+
+        assert hash(sut) == hash(IndentType(sut.width, sut.marker))
+        assert not hasattr(sut, "__dict__")
+
     def test_add_to_default_depth(self, sut: IndentType):
         assert sut.add_to(self.dummy_str) == f"{sut.string(depth=1)}{self.dummy_str}"
 
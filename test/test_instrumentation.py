@@ -0,0 +1,230 @@
+import asyncio
+
+import pytest
+
+from pformat.instrumentation import InstrumentedLayoutRenderer
+from pformat.layout import LayoutEngine, LayoutRenderer
+from pformat.pretty_formatter import PrettyFormatter
+from pformat.type_formatter import make_formatter
+from pformat.type_projection import make_projection
+
+DATA = [{"value": 1.25, "name": "a"}, {"value": 2.5, "name": "b"}]
+
+
+def make_sut(**kwargs) -> PrettyFormatter:
+    return PrettyFormatter.new(
+        projections=[make_projection(float, lambda f: round(f, 1))],
+        formatters=[make_formatter(str, lambda s, _: f"'{s.upper()}'")],
+        **kwargs,
+    )
+
+
+class TestInstrumentation:
+    def test_instrumentation_is_disabled_by_default(self):
+        sut = make_sut()
+
+        assert sut.stats is None
+        assert type(sut._renderer) is LayoutRenderer
+        assert sut._dispatch_plan(1).doc_builder == sut._default_formatter._build_doc
+
+    def test_enable_and_disable_instrumentation(self):
+        sut = make_sut()
+        expected_output = sut(DATA)
+
+        stats = sut.enable_instrumentation()
+        assert sut.stats is stats
+        assert isinstance(sut._renderer, InstrumentedLayoutRenderer)
+        assert sut(DATA) == expected_output
+
+        sut.disable_instrumentation()
+        assert sut.stats is None
+        assert type(sut._renderer) is LayoutRenderer
+        assert sut(DATA) == expected_output
+        assert stats.n_calls == 1
+
+    def test_call_stats(self, layout_engine: LayoutEngine):
+        sut = make_sut(layout_engine=layout_engine)
+        stats = sut.enable_instrumentation()
+
+        output = sut(DATA)
+        sut(DATA)
+
+        assert stats.n_calls == 2
+        assert stats.n_emitted_chars == stats.n_emitted_bytes == 2 * len(output)
+        assert stats.total_time > 0.0
+
+        assert stats.projections.keys() == {"TypeProjection(float)"}
+        assert stats.projections["TypeProjection(float)"].n_calls == 4
+
+        assert stats.formatters["IterableFormatter(Iterable)"].n_calls == 2
+        assert stats.formatters["MappingFormatter(Mapping)"].n_calls == 4
+        assert stats.formatters["CustomFormatter(str)"].n_calls == 12
+        assert stats.formatters["DefaultFormatter(Any)"].n_calls == 4
+        assert stats.n_nodes == 22
+
+        for call_stats in [*stats.formatters.values(), *stats.projections.values()]:
+            assert 0.0 < call_stats.self_time <= call_stats.total_time
+
+    def test_default_formatters_stats(self, layout_engine: LayoutEngine):
+        sut = PrettyFormatter.new(layout_engine=layout_engine)
+        stats = sut.enable_instrumentation()
+
+        sut(["a", 1.5, b"bytes", {"key": None}])
+        assert stats.n_nodes == 7
+        assert stats.formatters["DefaultFormatter(Any)"].n_calls == 2
+        assert stats.formatters["DefaultFormatter(Union[str, UserString])"].n_calls == 2
+        assert stats.formatters["DefaultFormatter(bytes)"].n_calls == 1
+
+    def test_stats_keys_of_union_types(self):
+        sut = PrettyFormatter.new(exact_type_matching=True)
+        stats = sut.enable_instrumentation()
+
+        sut(["a", {"key": None}])
+        assert {
+            "IterableFormatter(Union[list, UserList, set, frozenset, tuple, range, deque, "
+            "memoryview, NamedIterable])",
+            "MappingFormatter(Union[dict, defaultdict, UserDict, OrderedDict, ChainMap, "
+            "mappingproxy, Counter, NamedMapping])",
+            "DefaultFormatter(Union[str, UserString])",
+            "DefaultFormatter(Any)",
+        } == stats.formatters.keys()
+
+    @pytest.mark.parametrize("compact", [True, False])
+    def test_nested_time(self, layout_engine: LayoutEngine, compact: bool):
+        sut = make_sut(layout_engine=layout_engine, compact=compact, width=40)
+        stats = sut.enable_instrumentation()
+
+        sut(DATA)
+        for name in ["IterableFormatter(Iterable)", "MappingFormatter(Mapping)"]:
+            call_stats = stats.formatters[name]
+            assert call_stats.self_time < call_stats.total_time
+
+        iterable_time = stats.formatters["IterableFormatter(Iterable)"].total_time
+        assert all(
+            call_stats.total_time <= iterable_time for call_stats in stats.formatters.values()
+        )
+
+    def test_emitted_bytes(self):
+        sut = PrettyFormatter.new()
+        stats = sut.enable_instrumentation()
+
+        output = sut(["zażółć"])
+        assert stats.n_emitted_chars == len(output)
+        assert stats.n_emitted_bytes == len(output.encode("utf-8"))
+
+    def test_distinct_callables_with_the_same_representation(self):
+        def gen_type() -> type:
+            class Record:
+                pass
+
+            return Record
+
+        record_t1, record_t2 = gen_type(), gen_type()
+        sut = PrettyFormatter.new(
+            formatters=[
+                make_formatter(record_t1, lambda r, _: "record1"),
+                make_formatter(record_t2, lambda r, _: "record2"),
+            ]
+        )
+        stats = sut.enable_instrumentation()
+
+        sut([record_t1(), record_t2(), record_t2()])
+        assert stats.formatters["CustomFormatter(Record)"].n_calls == 1
+        assert stats.formatters["CustomFormatter(Record) #2"].n_calls == 2
+
+    def test_iter_chunks_stats(self):
+        sut = make_sut()
+        stats = sut.enable_instrumentation()
+
+        output = "".join(sut.iter_chunks(DATA, chunk_size=8))
+        assert output == sut(DATA)
+        assert stats.n_calls == 2
+        assert stats.n_emitted_chars == 2 * len(output)
+
+    def test_aiter_chunks_stats(self, layout_engine: LayoutEngine):
+        sut = make_sut(layout_engine=layout_engine)
+        stats = sut.enable_instrumentation()
+
+        output = asyncio.run(sut.aformat(DATA))
+        assert output == sut(DATA)
+        assert stats.n_calls == 2
+        assert stats.n_emitted_chars == 2 * len(output)
+
+    @pytest.mark.parametrize(
+        "width,n_attempts,n_fallbacks",
+        [(100, 1, 0), (40, 3, 1), (10, 3, 3)],
+        ids=["all_fit", "outer_broken", "all_broken"],
+    )
+    def test_compact_attempts(self, width: int, n_attempts: int, n_fallbacks: int):
+        sut = make_sut(compact=True, width=width)
+        stats = sut.enable_instrumentation()
+
+        sut(DATA)
+        assert stats.n_compact_attempts == n_attempts
+        assert stats.n_compact_fallbacks == n_fallbacks
+
+    def test_no_compact_attempts_in_non_compact_mode(self):
+        sut = make_sut()
+        stats = sut.enable_instrumentation()
+
+        sut(DATA)
+        assert stats.n_compact_attempts == stats.n_compact_fallbacks == 0
+
+    def test_enter_and_exit_callbacks(self, layout_engine: LayoutEngine):
+        events = list()
+        sut = make_sut(layout_engine=layout_engine)
+        sut.enable_instrumentation(
+            on_enter=lambda target, obj: events.append(("enter", repr(target), obj)),
+            on_exit=lambda target, obj, elapsed: events.append(("exit", repr(target), obj)),
+        )
+
+        sut([1.25])
+        assert events == [
+            ("enter", "IterableFormatter(Iterable)", [1.25]),
+            ("enter", "TypeProjection(float)", 1.25),
+            ("exit", "TypeProjection(float)", 1.25),
+            ("enter", "DefaultFormatter(Any)", 1.2),
+            ("exit", "DefaultFormatter(Any)", 1.2),
+            ("exit", "IterableFormatter(Iterable)", [1.25]),
+        ]
+
+    @pytest.mark.parametrize("compact", [True, False])
+    def test_callbacks_are_nested(self, layout_engine: LayoutEngine, compact: bool):
+        calls, elapsed_times = list(), dict()
+
+        def on_exit(target, obj, elapsed: float):
+            assert calls.pop() == (target, obj)
+            elapsed_times[id(obj)] = elapsed
+
+        sut = make_sut(layout_engine=layout_engine, compact=compact, width=40)
+        sut.enable_instrumentation(
+            on_enter=lambda target, obj: calls.append((target, obj)), on_exit=on_exit
+        )
+
+        data = [DATA, {"nested": DATA}]
+        sut(data)
+        assert calls == []
+        assert elapsed_times[id(data)] >= elapsed_times[id(DATA)] > 0.0
+
+    def test_reset(self):
+        sut = make_sut()
+        stats = sut.enable_instrumentation()
+
+        sut(DATA)
+        stats.reset()
+        assert stats.n_calls == stats.n_nodes == stats.n_emitted_chars == stats.n_emitted_bytes == 0
+        assert all(call_stats.total_time == 0.0 for call_stats in stats.formatters.values())
+
+        sut(DATA)
+        assert stats.n_calls == 1
+        assert stats.n_nodes == 11
+
+    def test_summary(self):
+        sut = make_sut()
+        stats = sut.enable_instrumentation()
+
+        sut(DATA)
+        summary = stats.summary()
+        assert summary.startswith("calls: 1, time: ")
+        assert "formatter CustomFormatter(str): calls: 6" in summary
+        assert "projection TypeProjection(float): calls: 2" in summary
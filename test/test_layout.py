@@ -0,0 +1,195 @@
+import sys
+
+import pytest
+from colored import Fore, Style
+
+from pformat.format_options import FormatOptions
+from pformat.indentation_utility import IndentType
+from pformat.layout import Block, Entry, Group, LayoutRenderer, Text
+from pformat.text_style import TextStyle
+
+SIMPLE_STR = "string"
+STYLED_STR = f"{Style.reset}{Fore.green}{SIMPLE_STR}{Style.reset}"
+
+
+def gen_group(n_items: int) -> Group:
+    return Group("[", "]", [Text.new(str(i)) for i in range(n_items)])
+
+
+class TestDocWidth:
+    def test_text_width(self):
+        assert Text.new(SIMPLE_STR).width == len(SIMPLE_STR)
+        assert Text.new(STYLED_STR).width == len(SIMPLE_STR)
+
+    def test_entry_width(self):
+        entry = Entry(Text.new(SIMPLE_STR), Text.new(STYLED_STR))
+        assert entry.width == len(f"{SIMPLE_STR}: {SIMPLE_STR}")
+
+    @pytest.mark.parametrize("n_items", [0, 1, 5])
+    def test_group_width(self, n_items: int):
+        group = gen_group(n_items)
+        expected_str = "[" + ", ".join(str(i) for i in range(n_items)) + "]"
+
+        assert group.width == len(expected_str)
+
+    def test_nested_group_width(self):
+        group = Group("{", "}", [Entry(Text.new("'key'"), gen_group(3))])
+        assert group.width == len("{'key': [0, 1, 2]}")
+
+    def test_group_measure_within_budget(self):
+        group = gen_group(3)  # [0, 1, 2]
+        assert group.measure(budget=group.width) == group.width
+
+    def test_group_measure_stops_when_budget_is_exceeded(self):
+        consumed = list()
+
+        def gen_items():
+            for i in range(100):
+                consumed.append(i)
+                yield Text.new(str(i))
+
+        group = Group("[", "]", gen_items())
+        assert group.measure(budget=5) > 5  # [0, 1]
+        assert consumed == [0, 1]
+
+        assert [item.value for item in group.items] == [str(i) for i in range(100)]
+
+    def test_measure_data_nested_beyond_recursion_limit(self):
+        depth = sys.getrecursionlimit() * 2
+
+        doc = Text.new("0")
+        for i in range(depth):
+            doc = Group("[", "]", [doc]) if i % 2 else Group("{", "}", [Entry(Text.new("k"), doc)])
+
+        assert doc.width == 1 + depth * 2 + (depth // 2) * len("k: ")
+
+    def test_entry_measure_stops_when_budget_is_exceeded(self):
+        entry = Entry(Text.new(SIMPLE_STR), Group("[", "]", (Text.new(str(i)) for i in range(100))))
+        assert entry.measure(budget=len(SIMPLE_STR)) == len(f"{SIMPLE_STR}: ")
+
+
+class TestLayoutRenderer:
+    def test_render_text(self):
+        sut = LayoutRenderer(FormatOptions())
+        assert sut.render(Text.new(STYLED_STR)) == STYLED_STR
+
+    def test_fits(self):
+        group = gen_group(3)  # [0, 1, 2]
+
+        assert not LayoutRenderer(FormatOptions(width=100)).fits(group)
+        assert LayoutRenderer(FormatOptions(compact=True, width=group.width)).fits(group)
+        assert not LayoutRenderer(FormatOptions(compact=True, width=group.width - 1)).fits(group)
+
+        sut = LayoutRenderer(
+            FormatOptions(compact=True, width=group.width + 4, indent_type=IndentType.NONE(width=4))
+        )
+        assert sut.fits(group, depth=1)
+        assert not sut.fits(group, depth=2)
+
+    def test_render_flat(self):
+        sut = LayoutRenderer(FormatOptions(compact=True, width=100))
+        group = Group("{", "}", [Entry(Text.new("'key'"), gen_group(3))])
+
+        assert sut.render(group) == "{'key': [0, 1, 2]}"
+
+    def test_render_flat_style_entire_text(self):
+        text_style = TextStyle(Fore.green, TextStyle.Mode.normal)
+        sut = LayoutRenderer(
+            FormatOptions(compact=True, width=100, text_style=text_style, style_entire_text=True)
+        )
+
+        assert sut.render(gen_group(2)) == text_style.apply_to("[0, 1]")
+
+    def test_render_flat_beyond_recursion_limit(self):
+        depth = sys.getrecursionlimit() * 2
+
+        doc = Text.new("0")
+        for _ in range(depth):
+            doc = Group("[", "]", [doc])
+
+        sut = LayoutRenderer(FormatOptions(compact=True, width=depth * 2 + 1))
+        assert sut.render(doc) == f"{'[' * depth}0{']' * depth}"
+
+    def test_render_broken_with_map_func(self):
+        sut = LayoutRenderer(
+            FormatOptions(compact=True, width=100, indent_type=IndentType.DOTS(width=2))
+        )
+        group = Group("{", "}", [Entry(Text.new("'key'"), gen_group(2)), Text.new("0")])
+
+        rendered_items = list()
+
+        def map_func(func, items):
+            rendered_items.extend(func(item) for item in items)
+            return rendered_items
+
+        assert sut.render_broken(group, map_func=map_func) == "\n".join(
+            ["{", "··'key': [0, 1],", "··0,", "}"]
+        )
+        assert rendered_items == ["··'key': [0, 1],", "··0,"]
+
+    def test_render_broken(self):
+        indent_type = IndentType.DOTS(width=2)
+        sut = LayoutRenderer(FormatOptions(compact=True, width=12, indent_type=indent_type))
+        group = Group("{", "}", [Entry(Text.new("'key'"), gen_group(3))])
+
+        assert sut.render(group) == "\n".join(["{", "··'key': [0, 1, 2],", "}"])
+
+    def test_render_broken_nested(self):
+        indent_type = IndentType.DOTS(width=2)
+        sut = LayoutRenderer(FormatOptions(indent_type=indent_type))
+        group = Group("{", "}", [Entry(Text.new("'key'"), gen_group(2))])
+
+        assert sut.render(group) == "\n".join(["{", "··'key': [", "····0,", "····1,", "··],", "}"])
+
+    def test_render_block(self):
+        sut = LayoutRenderer(
+            FormatOptions(compact=True, width=100, indent_type=IndentType.DOTS(width=2))
+        )
+        group = Group("[", "]", [Block("<", ">", ["a", "b"]), Text.new("0")])
+
+        assert sut.render(group) == "\n".join(["[", "··<", "····a", "····b", "··>,", "··0,", "]"])
+
+
+class TestLayoutRendererStreaming:
+    @pytest.fixture
+    def sut(self) -> LayoutRenderer:
+        return LayoutRenderer(FormatOptions(indent_type=IndentType.DOTS(width=2)))
+
+    def test_iter_lines(self, sut: LayoutRenderer):
+        group = Group("{", "}", [Entry(Text.new("'key'"), gen_group(2))])
+        assert list(sut.iter_lines(group)) == ["{", "··'key': [", "····0,", "····1,", "··],", "}"]
+
+    def test_iter_lines_consumes_items_lazily(self, sut: LayoutRenderer):
+        consumed = list()
+
+        def gen_items():
+            for i in range(3):
+                consumed.append(i)
+                yield Text.new(str(i))
+
+        lines = sut.iter_lines(Group("[", "]", gen_items()))
+        assert next(lines) == "["
+        assert next(lines) == "··0,"
+        assert consumed == [0]
+
+    def test_iter_lines_consumes_block_lines_lazily(self, sut: LayoutRenderer):
+        consumed = list()
+
+        def gen_lines():
+            for i in range(3):
+                consumed.append(i)
+                yield str(i)
+
+        lines = sut.iter_lines(Block("<", ">", gen_lines()))
+        assert next(lines) == "<"
+        assert next(lines) == "··0"
+        assert consumed == [0]
+
+    @pytest.mark.parametrize("chunk_size", [1, 10, 100])
+    def test_iter_chunks(self, sut: LayoutRenderer, chunk_size: int):
+        group = gen_group(20)
+        chunks = list(sut.iter_chunks(group, chunk_size=chunk_size))
+
+        assert "".join(chunks) == sut.render(gen_group(20))
+        max_line_len = max(len(line) for line in sut.iter_lines(gen_group(20))) + 1
+        assert all(len(chunk) < chunk_size + max_line_len for chunk in chunks)
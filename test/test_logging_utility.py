@@ -0,0 +1,183 @@
+import logging
+import threading
+
+import pytest
+
+from pformat.logging_utility import (
+    BackgroundFormattingHandler,
+    LazyFormat,
+    PrettyLogFormatter,
+    lazy,
+)
+from pformat.pretty_formatter import PrettyFormatter
+
+from .conftest import assert_does_not_throw
+
+DATA = {"key": [1, 2, 3], "values": {"a": 1, "b": 2}}
+
+
+class CountingFormatter(PrettyFormatter):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.n_calls = 0
+        self.threads = list()
+
+    def __call__(self, obj, depth=0):
+        self.n_calls += 1
+        self.threads.append(threading.current_thread())
+        return super().__call__(obj, depth)
+
+
+class ListHandler(logging.Handler):
+    def __init__(self, formatter: logging.Formatter):
+        super().__init__()
+        self.setFormatter(formatter)
+        self.messages = list()
+
+    def emit(self, record: logging.LogRecord):
+        self.messages.append(self.format(record))
+
+
+@pytest.fixture
+def logger() -> logging.Logger:
+    # a logger detached from the logger hierarchy (the records are not propagated)
+    return logging.Logger("pformat.test", level=logging.INFO)
+
+
+class TestLazy:
+    def test_lazy_is_formatted_on_demand(self):
+        formatter = CountingFormatter()
+        sut = lazy(DATA, formatter)
+
+        assert isinstance(sut, LazyFormat)
+        assert formatter.n_calls == 0
+
+        assert str(sut) == formatter(DATA)
+        assert repr(sut) == str(sut)
+        assert f"{sut}" == str(sut)
+        assert formatter.n_calls == 2  # the formatted string is cached
+
+    def test_lazy_with_depth(self):
+        formatter = PrettyFormatter.new(width=10)
+        assert str(lazy(DATA, formatter, depth=1)) == formatter(DATA, depth=1)
+
+    def test_lazy_with_default_formatter(self):
+        assert str(lazy(DATA)) == PrettyFormatter()(DATA)
+
+    def test_lazy_is_not_formatted_for_suppressed_records(self, logger: logging.Logger):
+        formatter = CountingFormatter()
+        handler = ListHandler(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+
+        logger.debug("data: %s", lazy(DATA, formatter))
+        assert formatter.n_calls == 0
+
+        logger.info("data: %s", lazy(DATA, formatter))
+        assert formatter.n_calls == 1
+        assert handler.messages == [f"data: {formatter(DATA)}"]
+
+
+class TestPrettyLogFormatter:
+    def test_format_args(self, logger: logging.Logger):
+        formatter = PrettyFormatter.new(width=20)
+        handler = ListHandler(PrettyLogFormatter("%(levelname)s %(message)s", formatter=formatter))
+        logger.addHandler(handler)
+
+        logger.info("%s | %d | %s | %s", DATA, 5, "str", None)
+        logger.info("%(data)s", {"data": DATA})
+
+        assert handler.messages == [
+            f"INFO {formatter(DATA)} | 5 | str | None",
+            f"INFO {formatter(DATA)}",
+        ]
+
+    def test_format_does_not_modify_the_record(self):
+        sut = PrettyLogFormatter("%(message)s", formatter=PrettyFormatter.new(width=10))
+        data = list(DATA.items())
+        record = logging.LogRecord("name", logging.INFO, __file__, 0, "%s", (data,), None)
+
+        assert sut.format(record) == sut.pretty_formatter(data)
+        assert record.args == (data,)
+        assert record.getMessage() == str(data)
+
+
+class TestBackgroundFormattingHandler:
+    def test_records_are_formatted_in_a_background_thread(self, logger: logging.Logger):
+        formatter = CountingFormatter(PrettyFormatter.new(width=20).options)
+        handler = ListHandler(PrettyLogFormatter("%(message)s", formatter=formatter))
+        sut = BackgroundFormattingHandler(handler)
+        logger.addHandler(sut)
+
+        logger.info("%s", DATA)
+        logger.info("lazy: %s", lazy(DATA, formatter))
+        sut.flush()
+
+        assert handler.messages == [formatter(DATA), f"lazy: {formatter(DATA)}"]
+        assert all(thread is not threading.current_thread() for thread in formatter.threads[:2])
+        assert formatter.n_calls == 4
+
+        sut.close()
+
+    def test_close_handles_the_queued_records(self, logger: logging.Logger):
+        handler = ListHandler(logging.Formatter("%(message)s"))
+        sut = BackgroundFormattingHandler(handler)
+        logger.addHandler(sut)
+
+        for i in range(100):
+            logger.info("%d", i)
+        sut.close()
+
+        assert handler.messages == [str(i) for i in range(100)]
+
+    def test_close_with_a_full_queue(self, logger: logging.Logger):
+        started, released = threading.Event(), threading.Event()
+
+        class BlockingHandler(ListHandler):
+            def emit(self, record: logging.LogRecord):
+                started.set()
+                released.wait()
+                super().emit(record)
+
+        handler = BlockingHandler(logging.Formatter("%(message)s"))
+        sut = BackgroundFormattingHandler(handler, queue_size=1)
+        logger.addHandler(sut)
+
+        logger.info("first")
+        started.wait()
+        logger.info("second")  # fills the queue while the first record is being handled
+
+        errors = list()
+
+        def close():
+            try:
+                sut.close()
+            except Exception as err:
+                errors.append(err)
+
+        closing_thread = threading.Thread(target=close)
+        closing_thread.start()
+        released.set()
+        closing_thread.join(timeout=5)
+
+        assert not closing_thread.is_alive()
+        assert errors == []
+        assert handler.messages == ["first", "second"]
+
+    def test_close_repeatedly(self, logger: logging.Logger):
+        sut = BackgroundFormattingHandler(ListHandler(logging.Formatter("%(message)s")))
+        logger.addHandler(sut)
+
+        sut.close()
+        assert_does_not_throw(sut.close)
+
+    def test_target_handler_levels_are_respected(self, logger: logging.Logger):
+        handler = ListHandler(logging.Formatter("%(message)s"))
+        handler.setLevel(logging.WARNING)
+        sut = BackgroundFormattingHandler(handler)
+        logger.addHandler(sut)
+
+        logger.info("info")
+        logger.warning("warning")
+        sut.close()
+
+        assert handler.messages == ["warning"]
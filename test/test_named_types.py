@@ -0,0 +1,25 @@
+from dataclasses import FrozenInstanceError
+
+import pytest
+
+from pformat.named_types import NamedIterable, NamedMapping
+
+
+class TestNamedTypes:
+    def test_named_iterable(self):
+        sut = NamedIterable("name", [1, 2])
+
+        assert list(sut) == [1, 2]
+        assert sut.get_parens() == ("name([", "])")
+        assert not hasattr(sut, "__dict__")
+        with pytest.raises(FrozenInstanceError):
+            sut.name = "other"
+
+    def test_named_mapping(self):
+        sut = NamedMapping("name", {"a": 1}, parens=("<", ">"))
+
+        assert dict(sut) == {"a": 1}
+        assert sut.get_parens() == ("<", ">")
+        assert not hasattr(sut, "__dict__")
+        with pytest.raises(FrozenInstanceError):
+            sut.mapping = dict()
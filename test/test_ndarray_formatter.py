@@ -0,0 +1,123 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from colored import Fore, Style
+
+from pformat.layout import LayoutEngine
+from pformat.ndarray_formatter import NDArrayFormatter
+from pformat.pretty_formatter import PrettyFormatter
+from pformat.type_formatter import make_formatter
+
+from .conftest import CountingFormatFunc, run_python
+
+np = pytest.importorskip("numpy")
+
+
+def test_ndarray_formatter_is_registered_after_importing_numpy():
+    sut_formatter = run_python(
+        "import pformat\n"
+        "sut = pformat.PrettyFormatter.new(compact=True)\n"
+        "sut([1, 2, 3])\n"
+        "import numpy\n"
+        "print(sut(numpy.arange(3)))"
+    )
+    assert sut_formatter.strip() == "ndarray([0, 1, 2])"
+
+
+class TestNDArrayFormatter:
+    def test_ndarray_formatter_is_predefined(self):
+        sut = PrettyFormatter()
+        assert isinstance(sut._dispatch_plan(np.zeros(1)).formatter, NDArrayFormatter)
+
+    def test_format_1d_array(self, layout_engine: LayoutEngine):
+        sut = PrettyFormatter.new(compact=True, layout_engine=layout_engine)
+
+        assert sut(np.array([], dtype=int)) == "ndarray([])"
+        assert sut(np.array([1, 2, 3])) == "ndarray([1, 2, 3])"
+        assert sut(np.array([0.5, 0.1, 1e-10])) == f"ndarray([0.5, 0.1, {str(np.float64(1e-10))}])"
+        assert sut(np.array([True, False])) == "ndarray([True, False])"
+
+    def test_format_0d_array(self, layout_engine: LayoutEngine):
+        sut = PrettyFormatter.new(layout_engine=layout_engine)
+        assert sut(np.array(1.5)) == "ndarray(1.5)"
+
+    def test_format_nd_array(self, layout_engine: LayoutEngine):
+        array = np.arange(6).reshape(2, 3)
+
+        sut = PrettyFormatter.new(compact=True, layout_engine=layout_engine)
+        assert sut(array) == "ndarray([[0, 1, 2], [3, 4, 5]])"
+
+        sut = PrettyFormatter.new(compact=True, width=16, layout_engine=layout_engine)
+        assert sut(array) == "\n".join(["ndarray([", "    [0, 1, 2],", "    [3, 4, 5],", "])"])
+
+    def test_format_nd_array_expanded(self):
+        sut = PrettyFormatter()
+        assert sut(np.arange(2).reshape(1, 2)) == "\n".join(
+            ["ndarray([", "    [", "        0,", "        1,", "    ],", "])"]
+        )
+
+    def test_format_object_array(self, layout_engine: LayoutEngine):
+        sut = PrettyFormatter.new(compact=True, layout_engine=layout_engine)
+        assert sut(np.array(["a", None, [1]], dtype=object)) == "ndarray(['a', None, [1]])"
+
+    def test_format_str_array(self, layout_engine: LayoutEngine):
+        sut = PrettyFormatter.new(compact=True, layout_engine=layout_engine)
+        assert sut(np.array(["a", "b"])) == "ndarray(['a', 'b'])"
+
+    def test_text_style(self):
+        sut = PrettyFormatter.new(compact=True, width=100, text_style=Fore.red)
+        assert sut(np.array([1])) == f"ndarray([{Style.reset}{Fore.red}1{Style.reset}])"
+
+    def test_max_items(self, layout_engine: LayoutEngine):
+        sut = PrettyFormatter.new(compact=True, width=100, max_items=2, layout_engine=layout_engine)
+
+        assert sut(np.arange(1_000_000)) == "ndarray([0, 1, ... 999998 more items])"
+        assert sut(np.arange(9).reshape(3, 3)) == (
+            "ndarray([[0, 1, ... 1 more item], [3, 4, ... 1 more item], ... 1 more item])"
+        )
+
+    def test_max_depth(self, layout_engine: LayoutEngine):
+        sut = PrettyFormatter.new(compact=True, max_depth=2, layout_engine=layout_engine)
+        assert sut([np.arange(4).reshape(2, 2)]) == "[ndarray([[...], [...]])]"
+
+    def test_elements_are_not_dispatched(self):
+        count_calls = CountingFormatFunc()
+
+        sut = PrettyFormatter.new(formatters=[make_formatter(int, count_calls)])
+        sut(np.arange(100))
+
+        assert count_calls.n_calls == 0
+
+    def test_format_masked_array(self, layout_engine: LayoutEngine):
+        sut = PrettyFormatter.new(compact=True, layout_engine=layout_engine)
+
+        assert sut(np.ma.masked_array([1, 2, 3], mask=[0, 1, 0])) == "MaskedArray([1, --, 3])"
+        assert sut(np.ma.masked_array([1, 2])) == "MaskedArray([1, 2])"
+        assert sut(np.ma.masked_array(1, mask=True)) == "MaskedArray(--)"
+        assert (
+            sut(np.ma.masked_array([[1, 2], [3, 4]], mask=[[0, 1], [1, 0]]))
+            == "MaskedArray([[1, --], [--, 4]])"
+        )
+        assert (
+            sut(np.ma.masked_array(["a", None], dtype=object, mask=[1, 0]))
+            == "MaskedArray([--, None])"
+        )
+
+    def test_format_masked_array_with_max_items(self):
+        sut = PrettyFormatter.new(compact=True, width=100, max_items=2)
+        assert sut(np.ma.masked_array(np.arange(9).reshape(3, 3), mask=np.eye(3))) == (
+            "MaskedArray([[--, 1, ... 1 more item], [3, --, ... 1 more item], ... 1 more item])"
+        )
+
+    @pytest.mark.filterwarnings("ignore::PendingDeprecationWarning")
+    def test_format_matrix(self, layout_engine: LayoutEngine):
+        sut = PrettyFormatter.new(compact=True, layout_engine=layout_engine)
+        assert sut(np.matrix([[1, 2], [3, 4]])) == "matrix([[1, 2], [3, 4]])"
+
+    def test_concurrent_registration(self):
+        sut = PrettyFormatter.new(compact=True)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            outputs = list(executor.map(lambda i: sut(np.arange(i % 3)), range(64)))
+
+        assert outputs == [f"ndarray({list(range(i % 3))})" for i in range(64)]
+        assert isinstance(sut._dispatch_plan(np.zeros(1)).formatter, NDArrayFormatter)
@@ -0,0 +1,53 @@
+import pytest
+
+import pformat
+import pformat.logging_utility
+import pformat.pretty_formatter
+
+from .conftest import run_python
+
+# the maximum time of importing the package and its core modules (in seconds)
+IMPORT_TIME_BUDGET = 0.1
+# the modules which should not be imported unless the functionalities using them are used
+LAZILY_IMPORTED_MODULES = [
+    "colored",
+    "logging",
+    "asyncio",
+    "concurrent.futures",
+    "pickle",
+    "numpy",
+]
+
+
+class TestPackageImport:
+    def test_lazy_attributes(self):
+        assert pformat.PrettyFormatter is pformat.pretty_formatter.PrettyFormatter
+        assert pformat.lazy is pformat.logging_utility.lazy
+        assert set(pformat.__all__) <= set(dir(pformat))
+
+    def test_unknown_attribute(self):
+        with pytest.raises(AttributeError):
+            pformat.unknown_attribute
+
+    def test_unused_modules_are_not_imported(self):
+        imported_modules = run_python(
+            "import sys, pformat\n"
+            "pformat.PrettyFormatter.new(text_style='\\x1b[31m')([1, {'a': 2}])\n"
+            f"print(*[module for module in {LAZILY_IMPORTED_MODULES} if module in sys.modules])"
+        )
+        assert imported_modules.split() == []
+
+    def test_import_time(self):
+        import_times = [
+            float(
+                run_python(
+                    "from time import perf_counter\n"
+                    "start = perf_counter()\n"
+                    "import pformat\n"
+                    "pformat.PrettyFormatter\n"
+                    "print(perf_counter() - start)"
+                )
+            )
+            for _ in range(3)
+        ]
+        assert min(import_times) < IMPORT_TIME_BUDGET
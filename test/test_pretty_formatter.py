@@ -1,13 +1,19 @@
+import io
+import pickle
+import sys
 from collections import OrderedDict, UserList, UserString, defaultdict, deque
 from collections.abc import Iterable, Mapping
-from itertools import product
-from types import MappingProxyType
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count, product
+from types import MappingProxyType, SimpleNamespace
+from typing import Optional
 
 import pytest
 from colored import Back, Fore, Style
 
 from pformat.format_options import FormatOptions
 from pformat.indentation_utility import IndentType
+from pformat.layout import LayoutEngine
 from pformat.named_types import NamedIterable, NamedMapping
 from pformat.pretty_formatter import (
     IterableFormatter,
@@ -16,8 +22,11 @@ from pformat.pretty_formatter import (
     PrettyFormatter,
 )
 from pformat.text_style import TextStyle
-from pformat.type_formatter import make_formatter
-from pformat.type_projection import make_projection
+from pformat.type_formatter import TypeFormatter, make_formatter
+from pformat.type_projection import TypeProjection, make_projection
+from pformat.typing_utility import Ordering
+
+from .conftest import LAYOUT_ENGINE_VALS, CountingFormatFunc, render_in_terminal
 
 # TODO: figure out how to set the width parameter value dynamically for compact tests
 
@@ -41,6 +50,62 @@ class TestPrettyFormatterInitialization:
         sut_new = PrettyFormatter.new(**custom_options.asdict())
         assert sut_new._options == custom_options
 
+    def test_custom_formatters_are_shared(self):
+        formatters = [
+            make_formatter(int, lambda i, _: "int"),
+            make_formatter(str, lambda s, _: "str"),
+        ]
+        sut = PrettyFormatter.new(formatters=formatters)
+
+        assert all(any(fmt is sut_fmt for sut_fmt in sut._formatters) for fmt in formatters)
+
+    def test_default_formatters_are_shared(self):
+        options = FormatOptions(text_style=Fore.red)
+
+        sut = PrettyFormatter(options)
+        assert PrettyFormatter(options)._default_formatter is sut._default_formatter
+        assert (
+            PrettyFormatter(options.replace(width=10))._default_formatter is sut._default_formatter
+        )
+        assert (
+            PrettyFormatter(options.replace(text_style=Fore.green))._default_formatter
+            is not sut._default_formatter
+        )
+
+    @pytest.mark.parametrize(
+        "exact_type_matching", [True, False], ids=["exact_matching", "isinstance_matching"]
+    )
+    @pytest.mark.parametrize(
+        "custom_types",
+        [[], [int], [str, list], [Iterable, bytes], [Mapping, Iterable, object]],
+        ids=["no_custom", "int", "str_list", "iterable_bytes", "mapping_iterable_object"],
+    )
+    def test_formatters_order(self, custom_types: list[type], exact_type_matching: bool):
+        formatters = [make_formatter(t, lambda x, _: str(x)) for t in custom_types]
+        sut = PrettyFormatter.new(formatters=formatters, exact_type_matching=exact_type_matching)
+
+        predefined_formatters = PrettyFormatter.new(
+            exact_type_matching=exact_type_matching
+        )._formatters
+        expected_formatters = [
+            *sut.options.formatters,
+            *[
+                pre_fmt
+                for pre_fmt in predefined_formatters
+                if not any(fmt.covers(pre_fmt, exact_type_matching) for fmt in formatters)
+            ],
+        ]
+        assert sorted(repr(fmt) for fmt in sut._formatters) == sorted(
+            repr(fmt) for fmt in expected_formatters
+        )
+
+        # `type_cmp` is a partial order, so only the order of the related types is checked
+        for i, fmt in enumerate(sut._formatters):
+            assert all(
+                TypeFormatter.cmp(next_fmt, fmt) != Ordering.LT
+                for next_fmt in sut._formatters[i + 1 :]
+            )
+
 
 SIMPLE_DATA = [123, 3.14, "string", UserString("user_string"), b"bytes", bytearray([1, 2, 3])]
 SIMPLE_HASHABLE_DATA = [data for data in SIMPLE_DATA if data.__hash__ is not None]
@@ -459,3 +524,697 @@ class TestPFMagicMethodsUsage:
             == f"The `{PFMagicMethod.FORMAT}` method of an object `{repr(p)}` of type `{type(p)}` returned "
             f"an object of type `{type(p.__pf_format__(self.sut._options))}` - expected `str`"
         )
+
+
+class TestPrettyFormatterDispatchPlans:
+    @pytest.fixture
+    def counting_projection(self):
+        self.projection_checks = 0
+
+        projection = make_projection(float, lambda f: int(f))
+        has_valid_type_for = projection.has_valid_type_for
+
+        def counting_has_valid_type_for(*args, **kwargs):
+            self.projection_checks += 1
+            return has_valid_type_for(*args, **kwargs)
+
+        projection.has_valid_type_for = counting_has_valid_type_for
+        return projection
+
+    def test_plans_are_resolved_once_per_type(self, counting_projection):
+        sut = PrettyFormatter.new(projections=[counting_projection])
+
+        assert sut([1.5, 2.5, 3.5]) == sut([1, 2, 3])
+        assert sut._dispatch_plans[float].projection is counting_projection
+        assert sut._dispatch_plans[int].projection is None
+        assert self.projection_checks == 3  # list, float and int
+
+    def test_warm_up(self):
+        sut = PrettyFormatter.new()
+        sut.warm_up(int, list, dict)
+
+        assert set(sut._dispatch_plans) == {int, list, dict}
+        assert isinstance(sut._dispatch_plans[list].formatter, IterableFormatter)
+        assert isinstance(sut._dispatch_plans[dict].formatter, MappingFormatter)
+        assert sut._dispatch_plans[int].formatter is sut._default_formatter
+
+    def test_clear_cache(self):
+        sut = PrettyFormatter.new()
+        sut([1, 2, 3])
+        assert len(sut._dispatch_plans) > 0
+
+        sut.clear_cache()
+        assert len(sut._dispatch_plans) == 0
+
+    def test_options_change_invalidates_plans(self):
+        sut = PrettyFormatter.new()
+        assert sut(3.14) == repr(3.14)
+
+        sut.options = FormatOptions(projections=[make_projection(float, lambda f: int(f))])
+        assert sut(3.14) == repr(3)
+
+        sut.options = FormatOptions(formatters=[make_formatter(float, lambda f, _: f"{f:.1f}")])
+        assert sut(3.14) == "3.1"
+
+    def test_dynamic_attribute_types_are_resolved_per_instance(self):
+        class DynamicType:
+            def __init__(self, formattable: bool):
+                self.formattable = formattable
+
+            def __getattr__(self, name: str):
+                if name == PFMagicMethod.FORMAT and self.formattable:
+                    return lambda options: "formatted"
+                raise AttributeError(name)
+
+            def __repr__(self) -> str:
+                return "DynamicType()"
+
+        sut = PrettyFormatter.new()
+
+        assert sut(DynamicType(formattable=True)) == "formatted"
+        assert sut(DynamicType(formattable=False)) == "DynamicType()"
+        assert DynamicType not in sut._dispatch_plans
+
+    def test_instance_magic_methods(self):
+        class Record:
+            def __init__(self, value: int, projected: bool = False):
+                self.value = value
+                if projected:
+                    self.__pf_project__ = lambda: [value]
+
+            def __repr__(self) -> str:
+                return f"Record({self.value})"
+
+        sut = PrettyFormatter.new(compact=True)
+
+        assert sut(Record(1)) == "Record(1)"
+        assert sut(Record(2, projected=True)) == "[2]"
+        assert sut(SimpleNamespace(__pf_format__=lambda options: "namespace")) == "namespace"
+        assert sut(SimpleNamespace(value=1)) == "namespace(value=1)"
+        assert sut(Record(3)) == "Record(3)"
+
+    def test_conditional_magic_method_properties(self):
+        class Record:
+            def __init__(self, value: int):
+                self.value = value
+
+            @property
+            def __pf_project__(self):
+                if self.value < 0:
+                    raise AttributeError(PFMagicMethod.PROJECT)
+                return lambda: [self.value]
+
+            def __repr__(self) -> str:
+                return f"Record({self.value})"
+
+        sut = PrettyFormatter.new(compact=True)
+
+        assert sut(Record(1)) == "[1]"
+        assert sut(Record(-1)) == "Record(-1)"
+        assert Record not in sut._dispatch_plans
+
+    @pytest.mark.parametrize("layout_engine", LAYOUT_ENGINE_VALS)
+    def test_custom_has_valid_type_is_resolved_per_instance(self, layout_engine: LayoutEngine):
+        class BigIntFormatter(TypeFormatter):
+            def __call__(self, obj: int, depth: int = 0) -> str:
+                return "BIG"
+
+            def has_valid_type(self, obj, exact_match: bool = False) -> bool:
+                return super().has_valid_type(obj, exact_match) and obj > 10
+
+        class NegativeIntProjection(TypeProjection):
+            def has_valid_type(self, obj, exact_match: bool = False) -> bool:
+                return super().has_valid_type(obj, exact_match) and obj < 0
+
+        sut = PrettyFormatter.new(
+            compact=True,
+            layout_engine=layout_engine,
+            formatters=[BigIntFormatter(int)],
+            projections=[NegativeIntProjection(int, lambda i: -i)],
+        )
+
+        assert sut([1, 100, -3, -20]) == "[1, BIG, 3, BIG]"
+        assert int not in sut._dispatch_plans
+
+        sut.warm_up(int)
+        assert int not in sut._dispatch_plans
+
+
+def gen_nested_data(depth: int):
+    data = [1, "string", (2.5, b"bytes")]
+    for i in range(depth):
+        data = {f"key{i}": data, "values": [i, [i, i + 1]], "tag": frozenset({i})}
+    return data
+
+
+class TestPrettyFormatterLayoutEngines:
+    WIDTH_VALS = [10, 40, 80]
+    MODE_VALS = [TextStyle.Mode.normal, TextStyle.Mode.override, TextStyle.Mode.preserve]
+    STYLE_PARAMS = [(None, False), *[(TextStyle(Fore.green, mode), True) for mode in MODE_VALS]]
+
+    # a custom formatter with a depth-dependent output
+    FORMATTERS_VALS = [None, [make_formatter(int, lambda i, depth: f"{i}@{depth}")]]
+
+    PARAMS = list(
+        product([True, False], WIDTH_VALS, INDENT_TYPE_VALS, STYLE_PARAMS, FORMATTERS_VALS)
+    )
+    IDS = [
+        f"{compact=},{width=},{indent_type=},{text_style=},{style_entire_text=},"
+        f"depth_formatter={formatters is not None}"
+        for compact, width, indent_type, (text_style, style_entire_text), formatters in PARAMS
+    ]
+
+    @pytest.mark.parametrize("compact,width,indent_type,style_params,formatters", PARAMS, ids=IDS)
+    def test_engines_produce_identical_output(
+        self,
+        compact: bool,
+        width: int,
+        indent_type: IndentType,
+        style_params: tuple,
+        formatters: Optional[list[TypeFormatter]],
+    ):
+        text_style, style_entire_text = style_params
+        options = dict(
+            compact=compact,
+            width=width,
+            indent_type=indent_type,
+            text_style=text_style,
+            style_entire_text=style_entire_text,
+            formatters=formatters,
+        )
+        suts = [
+            PrettyFormatter.new(**options, layout_engine=engine) for engine in LAYOUT_ENGINE_VALS
+        ]
+
+        data = gen_nested_data(depth=3)
+        for depth in [0, 1, 2]:
+            outputs = [sut(data, depth) for sut in suts]
+            assert all(output == outputs[0] for output in outputs)
+
+    def test_compact_formatting_calls(self, layout_engine: LayoutEngine):
+        depth = 8
+        count_calls = CountingFormatFunc()
+
+        data = 0
+        for i in range(1, depth + 1):
+            data = [i, data]
+
+        sut = PrettyFormatter.new(
+            compact=True,
+            width=20,
+            formatters=[make_formatter(int, count_calls)],
+            layout_engine=layout_engine,
+        )
+        sut(data)
+
+        n_leaves = depth + 1
+        if layout_engine is LayoutEngine.recursive:
+            assert count_calls.n_calls > n_leaves  # the subtrees are rendered repeatedly
+        else:
+            assert count_calls.n_calls == n_leaves
+
+    def test_compact_trial_stops_when_width_is_exceeded(self, layout_engine: LayoutEngine):
+        n_items, width = 1000, 20
+        count_calls = CountingFormatFunc()
+
+        sut = PrettyFormatter.new(
+            compact=True,
+            width=width,
+            formatters=[make_formatter(int, count_calls)],
+            layout_engine=layout_engine,
+        )
+        sut(list(range(n_items)))
+
+        if layout_engine is LayoutEngine.recursive:
+            assert (
+                count_calls.n_calls < n_items + width
+            )  # only the items fitting within the width are retried
+        else:
+            assert count_calls.n_calls == n_items
+
+
+class TestPrettyFormatterStreaming:
+    COMPACT_VALS = [True, False]
+
+    @pytest.fixture(params=COMPACT_VALS, ids=[f"compact={compact}" for compact in COMPACT_VALS])
+    def sut(self, request: pytest.FixtureRequest) -> PrettyFormatter:
+        return PrettyFormatter.new(compact=request.param, width=30, indent_type=IndentType.DOTS())
+
+    @pytest.mark.parametrize("chunk_size", [1, 64, 4096])
+    def test_iter_chunks(self, sut: PrettyFormatter, chunk_size: int):
+        data = gen_nested_data(depth=3)
+        assert "".join(sut.iter_chunks(data, chunk_size=chunk_size)) == sut(data)
+
+    def test_iter_chunks_recursive_engine(self):
+        sut = PrettyFormatter.new(layout_engine=LayoutEngine.recursive)
+        data = gen_nested_data(depth=3)
+        assert list(sut.iter_chunks(data)) == [sut(data)]
+
+    def test_write_text_stream(self, sut: PrettyFormatter):
+        data = gen_nested_data(depth=3)
+        stream = io.StringIO()
+        sut.write(data, stream, chunk_size=16)
+
+        assert stream.getvalue() == sut(data)
+
+    def test_write_binary_stream(self, sut: PrettyFormatter):
+        data = [*gen_nested_data(depth=2), "żółw"]
+        stream = io.BytesIO()
+        sut.write(data, stream, chunk_size=16)
+
+        assert stream.getvalue() == sut(data).encode("utf-8")
+
+    @pytest.mark.parametrize("mode", [None, 0o644, "wb"], ids=["none", "int", "binary_str"])
+    def test_write_stream_like_object_with_mode(self, sut: PrettyFormatter, mode):
+        class Stream:
+            def __init__(self):
+                self.mode = mode
+                self.chunks = list()
+
+            def write(self, chunk):
+                self.chunks.append(chunk)
+
+        data = [*gen_nested_data(depth=2), "żółw"]
+        stream = Stream()
+        sut.write(data, stream, chunk_size=16)
+
+        expected_output = sut(data)
+        if mode == "wb":
+            expected_output = expected_output.encode("utf-8")
+        assert type(expected_output)().join(stream.chunks) == expected_output
+
+    def test_iter_chunks_is_lazy(self):
+        sut = PrettyFormatter.new(indent_type=IndentType.DOTS())
+        chunks = sut.iter_chunks(count(), chunk_size=1)
+
+        assert [next(chunks) for _ in range(3)] == ["count([", "\n····0,", "\n····1,"]
+
+    def test_iter_chunks_compact_is_lazy(self):
+        sut = PrettyFormatter.new(compact=True, width=10, indent_type=IndentType.DOTS())
+        chunks = sut.iter_chunks(count(), chunk_size=1)
+
+        assert [next(chunks) for _ in range(3)] == ["count([", "\n····0,", "\n····1,"]
+
+
+class TestPrettyFormatterLimits:
+    def test_max_items(self, layout_engine: LayoutEngine):
+        sut = PrettyFormatter.new(compact=True, max_items=3, layout_engine=layout_engine)
+
+        assert sut(list(range(3))) == "[0, 1, 2]"
+        assert sut(list(range(4))) == "[0, 1, 2, ... 1 more item]"
+        assert sut(list(range(5_000_000))) == "[0, 1, 2, ... 4999997 more items]"
+        assert sut({i: i for i in range(5)}) == "{0: 0, 1: 1, 2: 2, ... 2 more items}"
+
+    def test_max_items_expanded(self, layout_engine: LayoutEngine):
+        sut = PrettyFormatter.new(max_items=1, layout_engine=layout_engine)
+        assert sut({"key": [1, 2], "other": 3}) == "\n".join(
+            [
+                "{",
+                "    'key': [",
+                "        1,",
+                "        ... 1 more item,",
+                "    ],",
+                "    ... 1 more item,",
+                "}",
+            ]
+        )
+
+    def test_max_items_for_unsized_iterable(self, layout_engine: LayoutEngine):
+        sut = PrettyFormatter.new(compact=True, max_items=2, layout_engine=layout_engine)
+
+        assert sut(count()) == "count([0, 1, ...])"
+        assert sut(iter(range(2))) == "range_iterator([0, 1])"
+
+    def test_max_items_consumes_items_lazily(self, layout_engine: LayoutEngine):
+        max_items = 10
+        consumed = count()
+
+        sut = PrettyFormatter.new(max_items=max_items, layout_engine=layout_engine)
+        sut(map(lambda x: next(consumed), range(5_000_000)))
+
+        assert next(consumed) <= max_items + 1
+
+    def test_max_depth(self, layout_engine: LayoutEngine):
+        data = [1, {"key": [2, [3]], "empty": []}]
+
+        assert (
+            PrettyFormatter.new(compact=True, max_depth=0, layout_engine=layout_engine)(data)
+            == "[...]"
+        )
+        assert (
+            PrettyFormatter.new(compact=True, max_depth=1, layout_engine=layout_engine)(data)
+            == "[1, {...}]"
+        )
+        assert (
+            PrettyFormatter.new(compact=True, max_depth=2, layout_engine=layout_engine)(data)
+            == "[1, {'key': [...], 'empty': []}]"
+        )
+
+    def test_max_string_length(self, layout_engine: LayoutEngine):
+        sut = PrettyFormatter.new(
+            compact=True, width=100, max_string_length=3, layout_engine=layout_engine
+        )
+
+        assert sut("abc") == "'abc'"
+        assert sut("abcd") == "'abc'... 1 more character"
+        assert sut(["abcdef", b"abcdef", bytearray(b"abcd")]) == (
+            "['abc'... 3 more characters, b'abc'... 3 more bytes, bytearray(b'abc')... 1 more byte]"
+        )
+
+
+class TestPrettyFormatterReferences:
+    def test_recursive_collections(self, layout_engine: LayoutEngine):
+        sut = PrettyFormatter.new(compact=True, layout_engine=layout_engine)
+
+        mapping = {"key": 1}
+        mapping["self"] = mapping
+        assert sut(mapping) == "{'key': 1, 'self': {...}}"
+
+        collection = [1]
+        collection.append([collection])
+        assert sut(collection) == "[1, [[...]]]"
+
+    def test_recursive_projections(self, layout_engine: LayoutEngine):
+        class Node:
+            def __init__(self, parent=None):
+                self.parent = parent
+                self.children = list()
+
+        root = Node()
+        root.children.append(Node(root))
+
+        sut = PrettyFormatter.new(
+            compact=True,
+            width=100,
+            projections=[
+                make_projection(
+                    Node, lambda node: {"parent": node.parent, "children": node.children}
+                )
+            ],
+            layout_engine=layout_engine,
+        )
+        assert sut(root) == "{'parent': None, 'children': [{'parent': {...}, 'children': []}]}"
+
+    def test_shared_references_are_repeated_by_default(self, layout_engine: LayoutEngine):
+        sut = PrettyFormatter.new(compact=True, layout_engine=layout_engine)
+        shared = [1, 2]
+
+        assert sut([shared, shared]) == "[[1, 2], [1, 2]]"
+
+    def test_anchor_shared_references(self):
+        sut = PrettyFormatter.new(compact=True, width=100, anchor_shared_references=True)
+
+        shared = [1, 2]
+        mapping = {"key": 1}
+        mapping["self"] = mapping
+
+        assert sut([shared, {"key": shared}, shared, mapping]) == (
+            "[&1 [1, 2], {'key': *1}, *1, &2 {'key': 1, 'self': *2}]"
+        )
+
+    def test_anchor_shared_references_skips_empty_collections(self):
+        sut = PrettyFormatter.new(compact=True, width=100, anchor_shared_references=True)
+        empty = list()
+
+        assert (
+            sut([(), (), "", frozenset(), frozenset()])
+            == "[(), (), '', frozenset({}), frozenset({})]"
+        )
+        assert sut([empty, {"key": empty}]) == "[[], {'key': []}]"
+
+    def test_anchor_shared_references_expanded(self):
+        sut = PrettyFormatter.new(anchor_shared_references=True)
+        shared = [1]
+
+        assert sut([shared, shared]) == "\n".join(
+            ["[", "    &1 [", "        1,", "    ],", "    *1,", "]"]
+        )
+
+    def test_anchor_shared_references_formats_shared_objects_once(self):
+        count_calls = CountingFormatFunc()
+
+        shared = list(range(100))
+        sut = PrettyFormatter.new(
+            formatters=[make_formatter(int, count_calls)], anchor_shared_references=True
+        )
+        sut([shared for _ in range(1000)])
+
+        assert count_calls.n_calls == len(shared)
+
+    def test_anchor_shared_references_projects_objects_once(self):
+        projected = list()
+
+        def project(f: float) -> int:
+            projected.append(f)
+            return int(f)
+
+        shared = [0.5, 1.5]
+        data = [shared, {"key": shared}, [2.5, 3.5]]
+        sut = PrettyFormatter.new(
+            compact=True,
+            width=100,
+            projections=[make_projection(float, project)],
+            anchor_shared_references=True,
+        )
+
+        assert sut(data) == "[&1 [0, 1], {'key': *1}, [2, 3]]"
+        assert sorted(projected) == [0.5, 1.5, 2.5, 3.5]
+
+
+class TestPrettyFormatterCoalesceStyles:
+    TEXT_STYLE_VALS = [
+        TextStyle(Fore.red, TextStyle.Mode.normal),
+        TextStyle(Fore.red, TextStyle.Mode.override),
+        TextStyle(Fore.red, TextStyle.Mode.preserve),
+    ]
+
+    @pytest.mark.parametrize(
+        "text_style", TEXT_STYLE_VALS, ids=[f"mode={style.mode}" for style in TEXT_STYLE_VALS]
+    )
+    def test_coalesce_styles(self, text_style: TextStyle, layout_engine: LayoutEngine):
+        data = gen_nested_data(depth=3)
+        options = dict(
+            indent_type=IndentType.LINE(style=Back.green),
+            text_style=text_style,
+            style_entire_text=True,
+            layout_engine=layout_engine,
+        )
+
+        expected_output = PrettyFormatter.new(**options)(data)
+        sut = PrettyFormatter.new(**options, coalesce_styles=True)
+        output = sut(data)
+
+        assert len(output) < len(expected_output)
+        assert render_in_terminal(output) == render_in_terminal(expected_output)
+        assert render_in_terminal("".join(sut.iter_chunks(data, chunk_size=16))) == (
+            render_in_terminal(expected_output)
+        )
+
+
+class TestPrettyFormatterDeepNesting:
+    STYLE_ENTIRE_TEXT_VALS = [True, False]
+
+    @pytest.mark.parametrize(
+        "style_entire_text",
+        STYLE_ENTIRE_TEXT_VALS,
+        ids=[f"{style_entire_text=}" for style_entire_text in STYLE_ENTIRE_TEXT_VALS],
+    )
+    def test_format_deeply_nested_data(self, style_entire_text: bool):
+        data = [1, "string"]
+        for i in range(50):
+            data = [i, {"key": data}] if i % 2 else [i, data]
+
+        options = dict(
+            indent_type=IndentType.LINE(style=Fore.green),
+            text_style=Fore.red,
+            style_entire_text=style_entire_text,
+        )
+        outputs = [
+            PrettyFormatter.new(**options, layout_engine=engine)(data)
+            for engine in LAYOUT_ENGINE_VALS
+        ]
+        assert all(output == outputs[0] for output in outputs)
+
+    COMPACT_VALS = [True, False]
+
+    @pytest.mark.parametrize(
+        "compact", COMPACT_VALS, ids=[f"{compact=}" for compact in COMPACT_VALS]
+    )
+    def test_format_data_nested_beyond_recursion_limit(self, compact: bool):
+        depth = sys.getrecursionlimit() * 2
+
+        data = [0]
+        for _ in range(depth):
+            data = [data]
+
+        sut = PrettyFormatter.new(
+            compact=compact, width=depth * 3, indent_type=IndentType.NONE(width=0)
+        )
+        expected_output = (
+            f"{'[' * depth}[0]{']' * depth}"
+            if compact
+            else "\n".join([*(["["] * (depth + 1)), "0,", *(["],"] * depth), "]"])
+        )
+        assert sut(data) == expected_output
+
+    def test_custom_formatters_beyond_recursion_limit(self):
+        depth = sys.getrecursionlimit() * 2
+
+        data = {"leaf": 0}
+        for _ in range(depth):
+            data = {"key": data}
+        data["self"] = data
+
+        sut = PrettyFormatter.new(
+            compact=True,
+            width=100,
+            indent_type=IndentType.NONE(width=0),
+            formatters=[make_formatter(int, lambda value, _depth: f"int({value})")],
+        )
+        output = sut(data)
+
+        assert "{'leaf': int(0)}" in output
+        assert output.endswith("'self': {...},\n}")
+
+
+def sorted_list_projection(collection: Iterable) -> list:
+    return sorted(collection)
+
+
+def hex_int_formatter(value: int, _depth: int) -> str:
+    return hex(value)
+
+
+class TestPrettyFormatterFormatMany:
+    WORKERS_VALS = [None, 1, 2]
+
+    @pytest.fixture
+    def sut(self) -> PrettyFormatter:
+        return PrettyFormatter.new(
+            compact=True,
+            width=100,
+            projections=[make_projection(set, sorted_list_projection)],
+            formatters=[make_formatter(int, hex_int_formatter)],
+        )
+
+    @pytest.mark.parametrize(
+        "workers", WORKERS_VALS, ids=[f"{workers=}" for workers in WORKERS_VALS]
+    )
+    def test_format_many(self, sut: PrettyFormatter, workers: Optional[int]):
+        objs = [{"id": i, "tags": {i + 2, i + 1}} for i in range(20)]
+
+        formatted_objs = sut.format_many(objs, workers=workers, batch_size=3)
+        assert list(formatted_objs) == [sut(obj) for obj in objs]
+
+    def test_format_many_consumes_input_lazily(self, sut: PrettyFormatter):
+        consumed = list()
+
+        def gen_objs():
+            for i in count():
+                consumed.append(i)
+                yield i
+
+        formatted_objs = sut.format_many(gen_objs(), workers=2, batch_size=2)
+        assert next(formatted_objs) == "0x0"
+        formatted_objs.close()
+
+        assert len(consumed) < 20
+
+    @pytest.mark.parametrize("workers", [0, -1])
+    def test_format_many_with_invalid_workers(self, sut: PrettyFormatter, workers: int):
+        with pytest.raises(ValueError):
+            sut.format_many([1], workers=workers)
+
+    def test_format_many_with_invalid_batch_size(self, sut: PrettyFormatter):
+        with pytest.raises(ValueError):
+            sut.format_many([1], batch_size=0)
+
+    def test_format_many_with_unpicklable_options(self):
+        sut = PrettyFormatter.new(formatters=[make_formatter(int, lambda value, _: str(value))])
+
+        assert list(sut.format_many([1, 2])) == ["1", "2"]
+        with pytest.raises(ValueError):
+            sut.format_many([1, 2], workers=2)
+
+    def test_pickle_formatter(self, sut: PrettyFormatter):
+        sut([1, {2}])  # fills the dispatch plans cache
+
+        unpickled_sut = pickle.loads(pickle.dumps(sut))
+        assert unpickled_sut.options == sut.options
+        assert unpickled_sut._dispatch_plans == dict()
+        assert unpickled_sut([1, {3, 2}]) == "[0x1, [0x2, 0x3]]"
+
+
+class TestPrettyFormatterThreadSafety:
+    N_THREADS = 8
+
+    @pytest.fixture(autouse=True)
+    def frequent_thread_switching(self):
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        yield
+        sys.setswitchinterval(switch_interval)
+
+    @staticmethod
+    def gen_objects() -> list:
+        objs = list()
+        for i in range(50):
+            objs.extend(
+                [
+                    gen_nested_data(i % 5),
+                    gen_mapping(range(i), OrderedDict, nested=True),
+                    gen_iterable(range(i), deque),
+                    {"set": set(range(i % 7)), "str": UserString("s" * i), "bytes": b"b" * i},
+                    MappingProxyType({"key": [i, (i, str(i))]}),
+                ]
+            )
+        return objs
+
+    @pytest.mark.parametrize("compact", [True, False], ids=["compact=True", "compact=False"])
+    def test_formatter_shared_across_threads(self, compact: bool):
+        options = dict(
+            compact=compact,
+            indent_type=IndentType.LINE(style=Fore.green),
+            text_style=Fore.red,
+            projections=[make_projection(set, sorted_list_projection)],
+        )
+        objs = self.gen_objects()
+        expected_outputs = [PrettyFormatter.new(**options)(obj) for obj in objs]
+
+        sut = PrettyFormatter.new(**options)
+        with ThreadPoolExecutor(max_workers=self.N_THREADS) as executor:
+            for _ in range(3):
+                assert list(executor.map(sut, objs)) == expected_outputs
+                sut.clear_cache()
+
+    PARALLEL_PARAMS = list(product([True, False], [True, False], [None, 5]))
+    PARALLEL_IDS = [
+        f"{compact=},{style_entire_text=},{max_items=}"
+        for compact, style_entire_text, max_items in PARALLEL_PARAMS
+    ]
+
+    @pytest.mark.parametrize(
+        "compact,style_entire_text,max_items", PARALLEL_PARAMS, ids=PARALLEL_IDS
+    )
+    def test_parallel_threads(self, compact: bool, style_entire_text: bool, max_items: int):
+        options = dict(
+            compact=compact,
+            indent_type=IndentType.DOTS(),
+            text_style=Fore.red,
+            style_entire_text=style_entire_text,
+            max_items=max_items,
+        )
+        sut = PrettyFormatter.new(**options, parallel_threads=self.N_THREADS)
+        expected_sut = PrettyFormatter.new(**options)
+
+        data = {f"key{i}": gen_nested_data(i % 4) for i in range(100)}
+        for obj in [data, list(data.values()), {"short": [1, 2]}, [], 1, "str"]:
+            assert sut(obj) == expected_sut(obj)
+
+    def test_parallel_threads_with_recursive_collection(self):
+        data = [[i] for i in range(50)]
+        data[10].append(data)
+
+        sut = PrettyFormatter.new(parallel_threads=2)
+        assert sut(data) == PrettyFormatter()(data)
+        assert "[...]" in sut(data)
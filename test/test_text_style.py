@@ -1,15 +1,21 @@
 import re
+from dataclasses import FrozenInstanceError
 
 import pytest
 from colored import Back, Fore, Style
 
 from pformat.text_style import (
+    ANSI_ESCAPE_PATTERN,
     ANSI_ESCAPE_RESET_PATTERN,
+    StyleCoalescer,
     TextStyle,
+    coalesce_style_modifiers,
     rm_style_modifiers,
     strlen_no_style,
 )
 
+from .conftest import render_in_terminal
+
 STYLE_VALS = [Fore.light_gray, Back.green, Style.bold]
 SIMPLE_STR = "string"
 STYLED_STR = SIMPLE_STR.join((STYLE_VALS + [Style.reset]) * 2)
@@ -23,6 +29,7 @@ def test_rm_style_modifiers():
 def test_strlen_no_style():
     s = SIMPLE_STR.join(STYLE_VALS)
     assert strlen_no_style(s) == len(SIMPLE_STR) * (len(STYLE_VALS) - 1)
+    assert strlen_no_style(SIMPLE_STR) == len(SIMPLE_STR)
 
 
 class TestTextStyle:
@@ -34,11 +41,11 @@ class TestTextStyle:
         return TextStyle(self.style)
 
     def test_apply_to_normal_mode(self, sut: TextStyle):
-        sut.mode = TextStyle.Mode.normal
+        sut = sut.replace(mode=TextStyle.Mode.normal)
         assert sut.apply_to(SIMPLE_STR) == f"{Style.reset}{self.style}{SIMPLE_STR}{Style.reset}"
 
     def test_apply_to_override_mode(self, sut: TextStyle):
-        sut.mode = TextStyle.Mode.override
+        sut = sut.replace(mode=TextStyle.Mode.override)
         styled_str = SIMPLE_STR.join(STYLE_VALS)
 
         assert (
@@ -47,7 +54,7 @@ class TestTextStyle:
         )
 
     def test_apply_to_preserve_mode(self, sut: TextStyle):
-        sut.mode = TextStyle.Mode.preserve
+        sut = sut.replace(mode=TextStyle.Mode.preserve)
 
         expected_styled_str = re.sub(
             ANSI_ESCAPE_RESET_PATTERN, f"{Style.reset}{self.style}", STYLED_STR
@@ -56,6 +63,52 @@ class TestTextStyle:
 
         assert sut.apply_to(STYLED_STR) == expected_styled_str
 
+    @staticmethod
+    def apply_repeatedly(sut: TextStyle, s: str, indent: str, depth: int) -> str:
+        for _ in range(depth):
+            s = sut.apply_to(f"{indent}{s}")
+        return s
+
+    @pytest.mark.parametrize("mode", MODE_VALS, ids=[f"{mode=}" for mode in MODE_VALS])
+    @pytest.mark.parametrize(
+        "indent", ["  ", f"{Fore.green}|{Style.reset} "], ids=["plain", "styled"]
+    )
+    def test_apply_to_nested(self, sut: TextStyle, mode: TextStyle.Mode, indent: str):
+        sut = sut.replace(mode=mode)
+        for depth in range(5):
+            assert sut.apply_to_nested(STYLED_STR, indent, depth) == self.apply_repeatedly(
+                sut, STYLED_STR, indent, depth
+            )
+
+    @pytest.mark.parametrize("mode", MODE_VALS, ids=[f"{mode=}" for mode in MODE_VALS])
+    @pytest.mark.parametrize(
+        "style", [f"{Style.reset}{Fore.red}", f"{Fore.red}>"], ids=["with_reset", "visible"]
+    )
+    def test_apply_to_nested_irregular_styles(self, mode: TextStyle.Mode, style: str):
+        sut = TextStyle(style, mode)
+        for depth in range(5):
+            assert sut.apply_to_nested(STYLED_STR, "  ", depth) == self.apply_repeatedly(
+                sut, STYLED_STR, "  ", depth
+            )
+
+    def test_apply_to_nested_no_style(self):
+        assert TextStyle().apply_to_nested(SIMPLE_STR, "  ", 3) == f"{'  ' * 3}{SIMPLE_STR}"
+
+    @pytest.mark.parametrize("mode", MODE_VALS, ids=[f"{mode=}" for mode in MODE_VALS])
+    def test_apply_to_with_width(self, sut: TextStyle, mode: TextStyle.Mode):
+        sut = sut.replace(mode=mode)
+        styled_str, width = sut.apply_to_with_width(STYLED_STR)
+
+        assert styled_str == sut.apply_to(STYLED_STR)
+        assert width == strlen_no_style(styled_str)
+
+    def test_apply_to_with_width_with_visible_style(self):
+        sut = TextStyle(SIMPLE_STR)
+        styled_str, width = sut.apply_to_with_width(SIMPLE_STR)
+
+        assert styled_str == sut.apply_to(SIMPLE_STR)
+        assert width == len(styled_str) - 2 * len(Style.reset)
+
     @pytest.mark.parametrize("mode", MODE_VALS, ids=[f"{mode=}" for mode in MODE_VALS])
     def test_apply_to_each(self, sut: TextStyle, mode: TextStyle.Mode):
         empty_collection = list()
@@ -78,3 +131,49 @@ class TestTextStyle:
         style = TextStyle(style_value, mode)
 
         assert TextStyle.new(style) == style
+
+
+class TestStyleCoalescer:
+    STYLED_STR_VALS = [
+        SIMPLE_STR,
+        STYLED_STR,
+        f"{SIMPLE_STR}{Style.reset}{Fore.red}{SIMPLE_STR}",
+        f"{Fore.red}{Fore.green}{Fore.red}{SIMPLE_STR}{Style.reset}",
+        f"{Style.reset}{Fore.red}{Style.reset}{Back.green}\n{Style.bold}{SIMPLE_STR}",
+        f"{Fore.red}{SIMPLE_STR}\x1b[2K{Style.reset}{Fore.red}{SIMPLE_STR}{Style.reset}",
+        TextStyle(Fore.red, TextStyle.Mode.preserve).apply_to_nested(STYLED_STR, "  ", 3),
+        TextStyle(Back.green, TextStyle.Mode.normal).apply_to_nested(STYLED_STR, "  ", 3),
+    ]
+
+    @pytest.mark.parametrize("s", STYLED_STR_VALS)
+    def test_coalesce_preserves_appearance(self, s: str):
+        assert render_in_terminal(coalesce_style_modifiers(s)) == render_in_terminal(s)
+
+    def test_coalesce_removes_redundant_modifiers(self):
+        styled_str = f"{Style.reset}{Fore.red}{SIMPLE_STR}{Style.reset}"
+        assert (
+            coalesce_style_modifiers(styled_str * 3)
+            == f"{Style.reset}{Fore.red}{SIMPLE_STR * 3}{Style.reset}"
+        )
+
+    def test_coalesce_keeps_unstyled_str(self):
+        assert coalesce_style_modifiers(SIMPLE_STR) == SIMPLE_STR
+
+    @pytest.mark.parametrize("s", STYLED_STR_VALS)
+    def test_coalesce_pieces(self, s: str):
+        sut = StyleCoalescer()
+        pieces = re.split(f"({ANSI_ESCAPE_PATTERN})", s)
+        assert render_in_terminal("".join(map(sut, pieces))) == render_in_terminal(s)
+
+
+def test_text_style_is_frozen_and_hashable():
+    sut = TextStyle(Fore.red)
+    with pytest.raises(FrozenInstanceError):
+        sut.mode = TextStyle.Mode.normal
+    with pytest.raises(FrozenInstanceError):
+        sut.unknown_attribute = 1
+
+    replaced_sut = sut.replace(mode=TextStyle.Mode.normal)
+    assert replaced_sut == TextStyle(Fore.red, TextStyle.Mode.normal)
+    assert sut.mode is TextStyle.Mode.preserve
+    assert len({sut, TextStyle(Fore.red), replaced_sut}) == 2
@@ -12,11 +12,18 @@ from collections.abc import Iterable, Mapping
 from functools import cmp_to_key
 from itertools import product
 from types import GenericAlias
-from typing import Any, Union
+from typing import Any, Optional, Union
 
 import pytest
 
-from pformat.typing_utility import Ordering, has_valid_type, is_union, type_cmp
+from pformat.typing_utility import (
+    Ordering,
+    has_valid_type,
+    is_union,
+    is_valid_type,
+    type_cmp,
+    type_name,
+)
 
 from .conftest import gen_derived_type
 
@@ -32,6 +39,18 @@ def test_is_union():
     assert not is_union(int)
 
 
+def test_type_name():
+    assert type_name(int) == "int"
+    assert type_name(Iterable) == "Iterable"
+    assert type_name(Any) == "Any"
+    assert type_name(Union[str, UserList]) == "Union[str, UserList]"
+    assert type_name(Optional[int]) == "Union[int, NoneType]"
+    assert type_name(list[Union[int, str]]) == "list[Union[int, str]]"
+
+    if sys.version_info >= (3, 10):
+        assert type_name(str | UserList) == type_name(Union[str, UserList])
+
+
 SIMPLE_TYPES = (int, float, str, bytes, list, dict)
 SIMPLE_TYPE_IDS = [f"t={t.__name__}" for t in SIMPLE_TYPES]
 
@@ -129,6 +148,29 @@ class TestHasValidType:
         assert all(has_valid_type(t, GenericAlias) for t in generic_aliases)
 
 
+class TestIsValidType:
+    EXACT_MATCH_VALS = [True, False]
+
+    @pytest.mark.parametrize(
+        "exact_match",
+        EXACT_MATCH_VALS,
+        ids=[f"exact_match={exact_match}" for exact_match in EXACT_MATCH_VALS],
+    )
+    def test_consistent_with_has_valid_type(self, exact_match: bool):
+        values = [
+            *[t() for t in SIMPLE_TYPES],
+            *[gen_derived_type(t)() for t in SIMPLE_TYPES],
+            DummyType1(),
+            list[int],
+        ]
+        target_types = [*SIMPLE_TYPES, UNION_TYPE, Any, Iterable, GenericAlias, DummyType1]
+
+        for value, t in product(values, target_types):
+            assert is_valid_type(type(value), t, exact_match) == has_valid_type(
+                value, t, exact_match
+            )
+
+
 class TestTypeCmp:
     @pytest.fixture(params=SIMPLE_TYPES, ids=SIMPLE_TYPE_IDS)
     def set_type(self, request: pytest.FixtureRequest):